@@ -0,0 +1,382 @@
+import asyncio
+import inspect
+import json
+import os
+import threading
+import traceback
+from typing import Dict, Optional
+from config import Config
+from http_pool import http_pools
+from metrics import metrics
+
+# Phrases in provider errors meaning the provider can't serve requests right now, so the next one is tried
+PROVIDER_ERROR_KEYWORDS = ('quota', 'rate limit', 'authentication', 'invalid_api_key', 'invalid api key', 'api_key')
+
+# name -> AIProvider subclass; registration order is the preference order for AI_PROVIDER=auto
+PROVIDERS = {}
+
+
+def register_provider(provider_class):
+    """Class decorator that makes a provider available to every MoodAnalyzer"""
+    PROVIDERS[provider_class.name] = provider_class
+    return provider_class
+
+
+def is_provider_error(error: Exception) -> bool:
+    """Quota, rate limit and credential errors, as opposed to a bad reply"""
+    message = str(error).lower()
+    return any(keyword in message for keyword in PROVIDER_ERROR_KEYWORDS)
+
+
+def parse_json_reply(content: str):
+    """Parse a model's JSON reply, removing markdown code blocks if present"""
+    content = content.strip()
+    if content.startswith('```json'):
+        content = content[7:]
+    if content.endswith('```'):
+        content = content[:-3]
+    return json.loads(content.strip())
+
+
+async def call_maybe_async(func, *args, **kwargs):
+    """Await func if it is a coroutine function, otherwise run it in a worker thread"""
+    # SDK methods are often wrapped by sync-looking decorators (openai's required_args)
+    if inspect.iscoroutinefunction(inspect.unwrap(func)):
+        return await func(*args, **kwargs)
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+class ProviderLoop:
+    """One asyncio event loop on a daemon thread that runs every AI provider call in the process.
+
+    Request threads hand it coroutines and wait for the result, so concurrent
+    analyses share one loop and one connection pool instead of each holding a
+    thread for the length of an LLM call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        if hasattr(os, 'register_at_fork'):
+            # The loop thread does not survive fork(); a forked worker starts its own
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='ai-provider-loop', daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coroutine):
+        """Run a coroutine on the provider loop and wait for its result"""
+        loop = self.loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coroutine.close()
+            raise RuntimeError("ProviderLoop.run() called from the provider loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+# Shared by every MoodAnalyzer in the process
+provider_loop = ProviderLoop()
+
+
+class AIProvider:
+    """A backend that suggests moods for a playlist.
+
+    Subclasses set name and label and implement is_configured() and
+    acomplete(); suggest() turns a reply into mood suggestions. Providers with
+    fallback = True always answer and are only used once every other provider
+    has failed.
+    """
+    name = None
+    label = None
+    fallback = False
+
+    def __init__(self):
+        self.available = self.is_configured()
+        self._lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        return False
+
+    @property
+    def model_name(self) -> str:
+        return ''
+
+    def load(self) -> bool:
+        """Import the SDK and build the client now rather than on first use; False if unavailable"""
+        return self.available
+
+    def record_token_usage(self, prompt_tokens, completion_tokens):
+        """Count the tokens the provider reports for one call"""
+        if prompt_tokens is None and completion_tokens is None:
+            return
+        print(f"🧮 {self.name.upper()} tokens: {prompt_tokens} prompt, {completion_tokens} completion")
+        metrics.inc('ai_tokens_total', prompt_tokens or 0, provider=self.name, kind='prompt')
+        metrics.inc('ai_tokens_total', completion_tokens or 0, provider=self.name, kind='completion')
+
+    async def acomplete(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """Send a prompt and return the text of the reply"""
+        raise NotImplementedError(f"{self.label} does not take free-form prompts")
+
+    async def suggest(self, playlist_data: Dict, prompt: str) -> Dict:
+        """Mood suggestions for one playlist.
+
+        Quota, rate limit and credential errors are raised so the caller can
+        move on to the next provider; any other failure comes back as a result
+        with an 'error' key.
+        """
+        try:
+            if not self.available:
+                raise RuntimeError(f"{self.label} API not available")
+
+            print(f"🤖 Sending request to {self.label}...")
+            print(f"📝 Prompt length: {len(prompt)} characters")
+
+            content = await self.acomplete(prompt)
+            if not content:
+                raise ValueError(f"No content in {self.label} response")
+            print(f"✅ {self.label} response received: {len(content)} characters")
+            print(f"📄 Raw response: {content[:200]}...")
+
+            result = parse_json_reply(content)
+            print(f"📊 {self.label} suggested {len(result.get('suggestions', []))} moods")
+            return result
+
+        except Exception as e:
+            print(f"❌ {self.label} Error: {type(e).__name__}: {str(e)}")
+            if is_provider_error(e):
+                raise
+
+            print(f"🔍 Full traceback: {traceback.format_exc()}")
+            return {
+                "suggestions": [],
+                "overall_assessment": f"Unable to generate {self.label} suggestions",
+                "error": str(e)
+            }
+
+
+@register_provider
+class OpenAIProvider(AIProvider):
+    """OpenAI chat completions through the async SDK and the shared httpx connection pool"""
+    name = 'openai'
+    label = 'OpenAI'
+
+    def __init__(self):
+        super().__init__()
+        self._client = None
+
+    def is_configured(self) -> bool:
+        return bool(Config.OPENAI_API_KEY and Config.OPENAI_API_KEY != 'your_openai_api_key')
+
+    @property
+    def model_name(self) -> str:
+        return Config.OPENAI_MODEL
+
+    def client_options(self) -> Dict:
+        return {'api_key': Config.OPENAI_API_KEY}
+
+    @property
+    def client(self):
+        """AsyncOpenAI client, created on first use; None if not configured or it failed to initialize"""
+        if self._client is None and self.available:
+            with self._lock:
+                if self._client is None and self.available:
+                    try:
+                        with metrics.time_stage('sdk_import', provider=self.name):
+                            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+                        self._client = AsyncOpenAI(
+                            http_client=http_pools.async_httpx_client(self.name, DefaultAsyncHttpxClient),
+                            **self.client_options()
+                        )
+                    except Exception as e:
+                        print(f"{self.label} initialization failed: {e}")
+                        self.available = False
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def load(self) -> bool:
+        return self.client is not None
+
+    async def acomplete(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        client = self.client
+        if client is None:
+            raise RuntimeError(f"{self.label} client unavailable")
+        # Synchronous clients (tests, custom SDK wrappers) run in a worker thread
+        response = await call_maybe_async(
+            client.chat.completions.create,
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=max_tokens or Config.AI_MAX_TOKENS
+        )
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            self.record_token_usage(usage.prompt_tokens, usage.completion_tokens)
+        return response.choices[0].message.content or ''
+
+
+@register_provider
+class GeminiProvider(AIProvider):
+    """Google Gemini through generate_content_async"""
+    name = 'gemini'
+    label = 'Gemini'
+
+    def __init__(self):
+        super().__init__()
+        self._model = None
+
+    def is_configured(self) -> bool:
+        return bool(Config.GEMINI_API_KEY and Config.GEMINI_API_KEY != 'your_gemini_api_key_here')
+
+    @property
+    def model_name(self) -> str:
+        return Config.GEMINI_MODEL
+
+    @property
+    def model(self):
+        """Gemini model, created on first use; None if not configured or it failed to initialize"""
+        if self._model is None and self.available:
+            with self._lock:
+                if self._model is None and self.available:
+                    try:
+                        with metrics.time_stage('sdk_import', provider=self.name):
+                            import google.generativeai as genai
+                        genai.configure(api_key=Config.GEMINI_API_KEY)
+                        self._model = genai.GenerativeModel(
+                            Config.GEMINI_MODEL,
+                            generation_config={'max_output_tokens': Config.AI_MAX_TOKENS}
+                        )
+                    except Exception as e:
+                        print(f"{self.label} initialization failed: {e}")
+                        self.available = False
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def load(self) -> bool:
+        return self.model is not None
+
+    async def acomplete(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        model = self.model
+        if model is None:
+            raise RuntimeError(f"{self.label} model unavailable")
+        # Without max_tokens the model's own generation_config (AI_MAX_TOKENS) applies
+        kwargs = {'generation_config': {'max_output_tokens': max_tokens}} if max_tokens else {}
+        generate_async = getattr(model, 'generate_content_async', None)
+        if generate_async is not None:
+            response = await generate_async(prompt, **kwargs)
+        else:
+            response = await asyncio.to_thread(model.generate_content, prompt, **kwargs)
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is not None:
+            self.record_token_usage(usage.prompt_token_count, usage.candidates_token_count)
+        return response.text
+
+
+@register_provider
+class LocalProvider(OpenAIProvider):
+    """A local OpenAI-compatible server (llama.cpp, Ollama, vLLM or the benchmark stand-in) at LOCAL_LLM_URL"""
+    name = 'local'
+    label = 'Local LLM'
+
+    def __init__(self):
+        self.base_url = Config.LOCAL_LLM_URL
+        super().__init__()
+
+    def is_configured(self) -> bool:
+        return bool(self.base_url)
+
+    @property
+    def model_name(self) -> str:
+        return Config.LOCAL_LLM_MODEL
+
+    def client_options(self) -> Dict:
+        return {'api_key': Config.LOCAL_LLM_API_KEY or 'local', 'base_url': self.base_url}
+
+
+def demo_suggestions(playlist_data: Dict) -> Dict:
+    """Keyword-based suggestions from track names and playlist context, needing no AI service"""
+    tracks = playlist_data.get('tracks', [])
+    playlist_name = playlist_data.get('playlist_info', {}).get('name', '').lower()
+
+    # Analyze track names and artists for mood hints
+    all_text = ' '.join([
+        playlist_name,
+        ' '.join([track.get('name', '') for track in tracks[:10]]),
+        ' '.join([' '.join(track.get('artists', [])) for track in tracks[:10]])
+    ]).lower()
+
+    # Simple keyword-based mood detection
+    mood_scores = {}
+    for mood, keywords in {
+        'energetic': ['pump', 'energy', 'power', 'rock', 'metal', 'dance', 'electronic'],
+        'relaxed': ['chill', 'relax', 'calm', 'peaceful', 'soft', 'acoustic'],
+        'happy': ['happy', 'joy', 'fun', 'party', 'celebration', 'upbeat'],
+        'melancholic': ['sad', 'blue', 'melancholy', 'sorrow', 'lonely'],
+        'ambient': ['ambient', 'atmospheric', 'drone', 'soundscape', 'space'],
+        'romantic': ['love', 'romantic', 'tender', 'sweet', 'intimate'],
+        'meditative': ['meditation', 'zen', 'spiritual', 'therapy', 'healing'],
+        'aggressive': ['aggressive', 'heavy', 'intense', 'brutal', 'hardcore'],
+        'nostalgic': ['retro', 'vintage', 'classic', 'old', 'memories'],
+        'focus': ['study', 'focus', 'concentration', 'work', 'productivity'],
+        'party': ['party', 'club', 'dance', 'festival', 'celebration'],
+        'downtempo': ['downtempo', 'slow', 'laid-back', 'lounge']
+    }.items():
+        score = sum(1 for keyword in keywords if keyword in all_text)
+        if score > 0:
+            mood_scores[mood] = score
+
+    # Generate suggestions based on scores
+    sorted_moods = sorted(mood_scores.items(), key=lambda x: x[1], reverse=True)[:3]
+
+    suggestions = []
+    for i, (mood, score) in enumerate(sorted_moods):
+        confidence = min(0.95, 0.6 + (score * 0.1))
+        suggestions.append({
+            'mood': mood,
+            'confidence': confidence,
+            'reasoning': f"Analysis of track names and playlist context suggests {mood} characteristics."
+        })
+
+    # Fallback if no matches
+    if not suggestions:
+        suggestions = [{
+            'mood': 'ambient',
+            'confidence': 0.7,
+            'reasoning': "Default mood suggestion based on general music analysis patterns."
+        }]
+
+    return {
+        'suggestions': suggestions,
+        'overall_assessment': f"Demo analysis of playlist based on track names and context. {len(tracks)} tracks analyzed."
+    }
+
+
+@register_provider
+class DemoProvider(AIProvider):
+    """Keyword-based stand-in used when every AI provider has failed or none is configured"""
+    name = 'demo'
+    label = 'Demo'
+    fallback = True
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def suggest(self, playlist_data: Dict, prompt: str = None) -> Dict:
+        return demo_suggestions(playlist_data)
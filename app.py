@@ -1,19 +1,74 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
-import json
 import os
+import time
 from config import Config
 from spotify_client import SpotifyClient
 from mood_analyzer import MoodAnalyzer
+from batch_executor import BatchExecutor, MicroBatcher
+from jobs import JobQueue, QueueFullError
+from singleflight import SingleFlight
+from incremental import IncrementalAnalyzer
+from metrics import metrics
+from http_pool import http_pools
+from response_fields import requested_fields, select_fields
+from json_provider import json_provider_class
+from compression import choose_encoding, compress, should_compress
 
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = json_provider_class(Config.JSON_ENCODER)(app)
 CORS(app)
 
 # Initialize clients
 spotify_client = SpotifyClient()
 mood_analyzer = MoodAnalyzer()
 
+# Re-analyses only process tracks added or removed since the last run (INCREMENTAL_ANALYSIS)
+incremental_analyzer = IncrementalAnalyzer(spotify_client, mood_analyzer)
+
+# Background analysis jobs submitted with "async": true
+job_queue = JobQueue()
+
+# Concurrent analyses of the same playlist share one execution
+analysis_flight = SingleFlight()
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count every API response and time it per endpoint"""
+    # Use the route pattern so job ids and mood names don't explode label cardinality
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.inc('http_requests_total', endpoint=endpoint, method=request.method, status=str(response.status_code))
+    if 'request_start' in g:
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - g.request_start,
+                        endpoint=endpoint, method=request.method)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON and page responses with the best encoding the client accepts"""
+    if not Config.COMPRESS_MIN_SIZE or not should_compress(response, Config.COMPRESS_MIN_SIZE):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings, Config.COMPRESS_ENCODINGS)
+    if encoding is None:
+        return response
+
+    level = Config.COMPRESS_BROTLI_QUALITY if encoding == 'br' else Config.COMPRESS_GZIP_LEVEL
+    with metrics.time_stage('compress_response', encoding=encoding):
+        body = compress(response.get_data(), encoding, level)
+    saved = response.content_length - len(body)
+    if saved <= 0:
+        return response  # incompressible; send it as it is (and keep the counter monotonic)
+    metrics.inc('http_response_bytes_saved_total', saved, encoding=encoding)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
 @app.route('/')
 def index():
     """Main demo page"""
@@ -29,23 +84,63 @@ def analyze_playlist():
         if not playlist_url:
             return jsonify({'error': 'Playlist URL is required'}), 400
         
-        # Analyze playlist with Spotify API
-        playlist_data = spotify_client.analyze_playlist(playlist_url)
+        # ?fields=final_recommendations or ?compact=1 trims the analysis to what the client uses
+        try:
+            fields = requested_fields(request.args, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if not playlist_data:
-            return jsonify({'error': 'Could not analyze playlist. Check the URL and try again.'}), 400
+        if data.get('async'):
+            return submit_job('analyze', analyze_playlist_job, playlist_url, fields)
         
-        # Get mood analysis
-        mood_analysis = mood_analyzer.combine_analysis(playlist_data)
+        # Analyze playlist with Spotify API and get mood analysis
+        mood_analysis = analyze_single_playlist(playlist_url)
+        
+        if not mood_analysis:
+            return jsonify({'error': 'Could not analyze playlist. Check the URL and try again.'}), 400
         
         return jsonify({
             'success': True,
-            'analysis': mood_analysis
+            'analysis': select_fields(mood_analysis, fields)
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def analyze_playlist_job(playlist_url, fields=None):
+    """Background version of /api/analyze that raises instead of returning 400"""
+    mood_analysis = analyze_single_playlist(playlist_url)
+    if not mood_analysis:
+        raise ValueError('Could not analyze playlist. Check the URL and try again.')
+    return select_fields(mood_analysis, fields)
+
+def submit_job(kind, func, *args):
+    """Queue a background job and return its id, or 503 when the queue is full"""
+    try:
+        job = job_queue.submit(kind, func, *args)
+    except QueueFullError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/jobs/{job.id}'
+    }), 202
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Poll the status of a background job and fetch its result when finished"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({
+        'success': True,
+        'job': job.to_dict()
+    })
+
 @app.route('/api/sample-playlists')
 def get_sample_playlists():
     """Get sample playlists for demo"""
@@ -53,6 +148,144 @@ def get_sample_playlists():
         'playlists': spotify_client.get_sample_playlists()
     })
 
+def run_playlist_analysis(url, suggest=None):
+    """Fetch and analyze one playlist, returning None if it could not be fetched.
+
+    suggest(playlist_data) supplies the AI suggestions instead of one model call per playlist.
+    """
+    if Config.INCREMENTAL_ANALYSIS:
+        return incremental_analyzer.analyze(url, suggest)
+    
+    playlist_data = spotify_client.analyze_playlist(url)
+    if not playlist_data:
+        return None
+    return mood_analyzer.combine_analysis(playlist_data, ai_suggestions=suggest(playlist_data) if suggest else None)
+
+def analyze_single_playlist(url, suggest=None):
+    """Analyze a playlist, joining any identical analysis already in progress"""
+    playlist_id = spotify_client.extract_playlist_id(url)
+    return analysis_flight.do(playlist_id, run_playlist_analysis, url, suggest)
+
+def batch_result(url, mood_analysis, error, fields=None):
+    """Build the per-playlist entry reported by /api/analyze-batch"""
+    if error is not None:
+        return {
+            'url': url,
+            'success': False,
+            'error': str(error)
+        }
+    if mood_analysis:
+        return {
+            'url': url,
+            'success': True,
+            'analysis': select_fields(mood_analysis, fields)
+        }
+    return {
+        'url': url,
+        'success': False,
+        'error': 'Could not analyze playlist'
+    }
+
+def wants_stream(data):
+    """Streaming is opt-in via a 'stream' flag or an NDJSON Accept header"""
+    return bool(data.get('stream')) or request.accept_mimetypes.best == 'application/x-ndjson'
+
+def stream_batch(executor, playlist_urls, fields=None):
+    """Yield one NDJSON line per playlist as it completes, then a summary line"""
+    total_processed = 0
+    successful = 0
+    
+    try:
+        for index, url, mood_analysis, error in executor.as_completed(analyze_single_playlist, playlist_urls):
+            result = batch_result(url, mood_analysis, error, fields)
+            result['index'] = index
+            total_processed += 1
+            successful += 1 if result['success'] else 0
+            yield app.json.dumps(result) + '\n'
+    except Exception as e:
+        yield app.json.dumps({'done': True, 'success': False, 'error': str(e)}) + '\n'
+        return
+    
+    yield app.json.dumps({
+        'done': True,
+        'success': True,
+        'total_processed': total_processed,
+        'successful': successful
+    }) + '\n'
+
+def analyze_with_batched_ai(executor, playlist_urls, ai_batch_size):
+    """Analyze playlists as analyze_single_playlist does, asking the AI provider about several per model call.
+
+    Each worker fetches its playlist (through SingleFlight and incremental
+    state) and hands it to a shared MicroBatcher, so the per-playlist timeout
+    covers the batched AI call too. Groups are capped at the number of
+    playlists that can be in flight at once.
+    """
+    batcher = MicroBatcher(
+        lambda batch: mood_analyzer.get_batched_ai_suggestions(batch, len(batch)),
+        max_size=min(ai_batch_size, executor.workers_for(len(playlist_urls))),
+        expected=len(playlist_urls)
+    )
+    
+    def analyze(url):
+        submitted = []
+        
+        def suggest(playlist_data):
+            submitted.append(url)
+            return batcher.submit(playlist_data)
+        
+        try:
+            return analyze_single_playlist(url, suggest)
+        finally:
+            if not submitted:
+                batcher.skip()  # unchanged, joined an in-flight analysis, or failed before the AI step
+    
+    return executor.map(analyze, playlist_urls)
+
+def run_batch(executor, playlist_urls, ai_batch_size=1, fields=None):
+    """Analyze every playlist and build the /api/analyze-batch response body"""
+    if ai_batch_size > 1:
+        analyses = analyze_with_batched_ai(executor, playlist_urls, ai_batch_size)
+    else:
+        analyses = executor.map(analyze_single_playlist, playlist_urls)
+    
+    results = [batch_result(url, mood_analysis, error, fields) for url, mood_analysis, error in analyses]
+    
+    return {
+        'success': True,
+        'results': results,
+        'total_processed': len(results),
+        'successful': len([r for r in results if r['success']])
+    }
+
+def batch_executor_for(data):
+    """BatchExecutor for a batch request's max_workers, timeout and mode; ValueError for invalid values"""
+    try:
+        max_workers = int(data.get('max_workers', Config.BATCH_MAX_WORKERS))
+        timeout = float(data.get('timeout', Config.BATCH_ITEM_TIMEOUT))
+    except (TypeError, ValueError):
+        raise ValueError('max_workers must be an integer and timeout a number of seconds')
+    if isinstance(data.get('max_workers'), bool) or max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+    if not timeout >= 0:  # also rejects NaN
+        raise ValueError('timeout must be 0 (no timeout) or a positive number of seconds')
+    mode = str(data.get('mode', Config.BATCH_EXECUTION_MODE)).lower()
+    if mode not in ('threaded', 'sequential'):
+        raise ValueError("mode must be 'threaded' or 'sequential'")
+    
+    # Cap requested concurrency at the configured pool size
+    return BatchExecutor(max_workers=min(max_workers, Config.BATCH_MAX_WORKERS), item_timeout=timeout, mode=mode)
+
+def ai_batch_size_for(data, executor):
+    """Playlists per AI call for a batch request, capped at the executor's workers; ValueError for invalid values"""
+    try:
+        ai_batch_size = int(data.get('ai_batch_size', Config.AI_BATCH_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('ai_batch_size must be an integer')
+    if isinstance(data.get('ai_batch_size'), bool) or ai_batch_size < 1:
+        raise ValueError('ai_batch_size must be at least 1')
+    return min(ai_batch_size, executor.max_workers)
+
 @app.route('/api/analyze-batch', methods=['POST'])
 def analyze_batch():
     """Analyze multiple playlists (for bulk operations)"""
@@ -63,37 +296,26 @@ def analyze_batch():
         if not playlist_urls:
             return jsonify({'error': 'Playlist URLs are required'}), 400
         
-        results = []
-        
-        for url in playlist_urls:
-            try:
-                playlist_data = spotify_client.analyze_playlist(url)
-                if playlist_data:
-                    mood_analysis = mood_analyzer.combine_analysis(playlist_data)
-                    results.append({
-                        'url': url,
-                        'success': True,
-                        'analysis': mood_analysis
-                    })
-                else:
-                    results.append({
-                        'url': url,
-                        'success': False,
-                        'error': 'Could not analyze playlist'
-                    })
-            except Exception as e:
-                results.append({
-                    'url': url,
-                    'success': False,
-                    'error': str(e)
-                })
+        try:
+            fields = requested_fields(request.args, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify({
-            'success': True,
-            'results': results,
-            'total_processed': len(results),
-            'successful': len([r for r in results if r['success']])
-        })
+        # Playlists per AI call; streaming keeps one call per playlist so results can arrive one by one
+        try:
+            executor = batch_executor_for(data)
+            ai_batch_size = ai_batch_size_for(data, executor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if data.get('async'):
+            return submit_job('analyze-batch', run_batch, executor, playlist_urls, ai_batch_size, fields)
+        
+        if wants_stream(data):
+            return Response(stream_with_context(stream_batch(executor, playlist_urls, fields)),
+                            mimetype='application/x-ndjson')
+        
+        return jsonify(run_batch(executor, playlist_urls, ai_batch_size, fields))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -155,19 +377,34 @@ def health_check():
         'spotify_configured': bool(Config.SPOTIFY_CLIENT_ID != 'your_spotify_client_id'),
         'openai_configured': bool(Config.OPENAI_API_KEY != 'your_openai_api_key'),
         'gemini_configured': bool(Config.GEMINI_API_KEY != 'your_gemini_api_key_here'),
-        'ai_provider': Config.AI_PROVIDER
+        'ai_provider': Config.AI_PROVIDER,
+        'ai_providers': mood_analyzer.configured_providers(),
+        'feature_cache': spotify_client.feature_cache.stats(),
+        'spotify_rate_limit': spotify_client.rate_limiter.stats(),
+        'http_pools': http_pools.stats(),
+        'ai_cache': mood_analyzer.suggestion_cache.stats(),
+        'ai_circuit_breakers': {provider: breaker.stats() for provider, breaker in mood_analyzer.breakers.items()},
+        'jobs': job_queue.stats(),
+        'coalescing': analysis_flight.stats(),
+        'incremental': incremental_analyzer.stats()
     })
 
+@app.route('/api/metrics')
+def get_metrics():
+    """Latency histograms and counters in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
-    # Check if SSL certificate files exist
-    import os
-    if os.path.exists('localhost.crt') and os.path.exists('localhost.key'):
+    # Flask's development server (debugger and reloader when FLASK_ENV=development); use serve.py in production
+    from serve import ssl_files
+    ssl = ssl_files()
+    debug = Config.FLASK_ENV == 'development'
+    if ssl:
         print("🔒 Starting HTTPS server...")
-        print("📱 Demo will be available at: https://localhost:5000")
+        print(f"📱 Demo will be available at: https://localhost:{Config.SERVER_PORT}")
         print("⚠️  You may need to accept the security warning in your browser")
-        app.run(debug=True, host='0.0.0.0', port=5000, 
-                ssl_context=('localhost.crt', 'localhost.key'))
+        app.run(debug=debug, host=Config.SERVER_HOST, port=Config.SERVER_PORT, ssl_context=ssl)
     else:
         print("🌐 Starting HTTP server...")
-        print("📱 Demo will be available at: http://localhost:5000")
-        app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+        print(f"📱 Demo will be available at: http://localhost:{Config.SERVER_PORT}")
+        app.run(debug=debug, host=Config.SERVER_HOST, port=Config.SERVER_PORT)
@@ -0,0 +1,204 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, TimeoutError as FutureTimeoutError
+from config import Config
+
+
+class ItemTimeoutError(Exception):
+    """Raised when a single batch item runs longer than its allowed time"""
+    pass
+
+
+class BatchExecutor:
+    """Run a function over a list of items with a bounded thread pool"""
+
+    def __init__(self, max_workers=None, item_timeout=None, mode=None):
+        self.max_workers = max(1, int(max_workers or Config.BATCH_MAX_WORKERS))
+        self.item_timeout = float(item_timeout if item_timeout is not None else Config.BATCH_ITEM_TIMEOUT)
+        self.mode = (mode or Config.BATCH_EXECUTION_MODE).lower()
+
+    def workers_for(self, count):
+        """How many items run at the same time for a batch of count items"""
+        if self.mode == 'sequential' or count <= 1:
+            return 1
+        return min(self.max_workers, count)
+
+    def map(self, func, items):
+        """Yield (item, result, error) for every item, in input order"""
+        items = list(items)
+
+        if self.mode == 'sequential' or self.max_workers == 1 or len(items) <= 1:
+            for item in items:
+                try:
+                    yield item, func(item), None
+                except Exception as e:
+                    yield item, None, e
+            return
+
+        started = {}
+        lock = threading.Lock()
+
+        def run(index, item):
+            with lock:
+                started[index] = time.monotonic()
+            return func(item)
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)))
+        try:
+            futures = [pool.submit(run, i, item) for i, item in enumerate(items)]
+            for i, (item, future) in enumerate(zip(items, futures)):
+                try:
+                    yield item, self._wait(future, started, lock, i), None
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            # Timed-out calls cannot be interrupted; let them finish in the background
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def as_completed(self, func, items):
+        """Yield (index, item, result, error) for every item as soon as it finishes"""
+        items = list(items)
+
+        if self.mode == 'sequential' or self.max_workers == 1 or len(items) <= 1:
+            for index, (item, result, error) in enumerate(self.map(func, items)):
+                yield index, item, result, error
+            return
+
+        started = {}
+        lock = threading.Lock()
+
+        def run(index, item):
+            with lock:
+                started[index] = time.monotonic()
+            return func(item)
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)))
+        try:
+            pending = {pool.submit(run, i, item): i for i, item in enumerate(items)}
+            while pending:
+                done, _ = wait(pending, timeout=self._next_timeout(pending, started, lock), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        yield index, items[index], future.result(), None
+                    except Exception as e:
+                        yield index, items[index], None, e
+
+                # Report running items that have used up their time budget
+                if self.item_timeout:
+                    now = time.monotonic()
+                    with lock:
+                        expired = [f for f, i in pending.items() if i in started and now - started[i] >= self.item_timeout]
+                    for future in expired:
+                        index = pending.pop(future)
+                        future.cancel()
+                        yield index, items[index], None, ItemTimeoutError(f"Timed out after {self.item_timeout:g}s")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _next_timeout(self, pending, started, lock):
+        """Seconds until the earliest running item reaches its timeout"""
+        if not self.item_timeout:
+            return None
+        now = time.monotonic()
+        with lock:
+            remaining = [started[i] + self.item_timeout - now for i in pending.values() if i in started]
+        return max(0.0, min(remaining)) if remaining else self.item_timeout
+
+    def _wait(self, future, started, lock, index):
+        """Wait for a future, measuring the timeout from when the item actually started"""
+        if not self.item_timeout:
+            return future.result()
+
+        while True:
+            if future.done():
+                return future.result()
+
+            with lock:
+                start = started.get(index)
+
+            # Items still queued behind busy workers have not used any of their budget yet
+            remaining = self.item_timeout if start is None else start + self.item_timeout - time.monotonic()
+            if remaining <= 0:
+                future.cancel()
+                raise ItemTimeoutError(f"Timed out after {self.item_timeout:g}s")
+
+            try:
+                return future.result(timeout=remaining)
+            except FutureTimeoutError:
+                continue
+
+
+class _Slot:
+    """One submitted item waiting for its group's call"""
+
+    def __init__(self, item):
+        self.item = item
+        self.taken = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Group items submitted from several batch workers into one call of func(items) -> results.
+
+    A group is sent when it reaches max_size, when every expected item has
+    either been submitted or skipped, or when its oldest item has waited
+    max_wait seconds, so a slow or duplicate playlist never holds the others
+    back for long. The thread that completes a group makes the call.
+    """
+
+    def __init__(self, func, max_size, expected, max_wait=None):
+        self.func = func
+        self.max_size = max(1, int(max_size))
+        self.max_wait = Config.AI_BATCH_WAIT if max_wait is None else max_wait
+        self._remaining = expected  # items that have neither been submitted nor skipped
+        self._queue = []
+        self._cond = threading.Condition()
+        self.calls = 0
+
+    def submit(self, item):
+        """Block until item's group has been processed and return its result"""
+        slot = _Slot(item)
+        batch = None
+        with self._cond:
+            self._queue.append(slot)
+            self._remaining -= 1
+            self._cond.notify_all()
+            deadline = time.monotonic() + self.max_wait
+            while not slot.taken:
+                if len(self._queue) >= self.max_size or self._remaining <= 0 or time.monotonic() >= deadline:
+                    batch, self._queue = self._queue[:self.max_size], self._queue[self.max_size:]
+                    for taken in batch:
+                        taken.taken = True
+                    break
+                self._cond.wait(deadline - time.monotonic())
+
+        if batch is not None:
+            self._run(batch)
+        slot.done.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def skip(self):
+        """An expected item finished without submitting (cached, unchanged or failed)"""
+        with self._cond:
+            self._remaining -= 1
+            self._cond.notify_all()
+
+    def _run(self, batch):
+        with self._cond:
+            self.calls += 1
+        try:
+            results = self.func([slot.item for slot in batch])
+            for slot, result in zip(batch, results):
+                slot.result = result
+        except Exception as e:
+            for slot in batch:
+                slot.error = e
+        finally:
+            for slot in batch:
+                slot.done.set()
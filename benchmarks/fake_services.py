@@ -0,0 +1,270 @@
+"""
+Local stand-ins for Spotify, OpenAI (or a local OpenAI-compatible server) and Gemini so benchmarks and load tests need no network
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from spotipy.cache_handler import MemoryCacheHandler
+from benchmarks import synthetic
+from cache import LRUCache
+from http_pool import http_pools
+
+
+def mood_reply(prompt):
+    """A deterministic, well-formed model answer for a single or batch mood prompt"""
+    match = re.search(r'^Moods: (.+)$', prompt, re.MULTILINE)
+    moods = [mood.strip() for mood in match.group(1).split(',')] if match else ['calming']
+
+    def suggestions(key):
+        offset = sum(map(ord, key)) % len(moods)
+        picked = [moods[(offset + i) % len(moods)] for i in range(min(3, len(moods)))]
+        return [{'mood': mood, 'confidence': round(0.9 - 0.15 * i, 2), 'reasoning': 'Synthetic answer'}
+                for i, mood in enumerate(picked)]
+
+    batch_ids = re.findall(r'^#(\d+) (.+?) \(', prompt, re.MULTILINE)
+    if batch_ids:
+        return json.dumps({'playlists': [
+            {'id': int(number), 'suggestions': suggestions(name), 'overall_assessment': 'Synthetic'}
+            for number, name in batch_ids
+        ]})
+
+    name = re.search(r'^Playlist: (.+)$', prompt, re.MULTILINE)
+    return json.dumps({'suggestions': suggestions(name.group(1) if name else prompt), 'overall_assessment': 'Synthetic'})
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    """Serves the Spotify Web API, Spotify accounts and OpenAI endpoints the app calls"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, body, status=200, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def not_found(self):
+        self.send_json({'error': {'status': 404, 'message': 'Not found'}}, 404)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def do_POST(self):
+        upstream = self.server.upstream
+        body = self.read_body()
+        path = urlparse(self.path).path
+
+        if path == '/api/token':
+            upstream.record('spotify_token')
+            self.send_json({'access_token': 'benchmark', 'token_type': 'bearer', 'expires_in': 3600})
+        elif path == '/v1/chat/completions':
+            upstream.record('openai', upstream.llm_latency)
+            prompt = json.loads(body)['messages'][-1]['content']
+            content = mood_reply(prompt)
+            self.send_json({
+                'id': 'chatcmpl-benchmark',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': 'benchmark',
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4,
+                          'total_tokens': (len(prompt) + len(content)) // 4}
+            })
+        else:
+            self.not_found()
+
+    def do_GET(self):
+        upstream = self.server.upstream
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split('/') if part]
+
+        if parts[:1] != ['v1'] or len(parts) < 2:
+            return self.not_found()
+
+        status = upstream.take_failure()
+        if status is not None:
+            upstream.record('spotify_failed')
+            return self.send_json({'error': {'status': status, 'message': 'Service unavailable'}}, status)
+
+        retry_after = upstream.take_throttle()
+        if retry_after is not None:
+            upstream.record('spotify_throttled')
+            return self.send_json({'error': {'status': 429, 'message': 'API rate limit exceeded'}}, 429,
+                                  headers={'Retry-After': str(retry_after)})
+
+        if parts[1] in ('audio-features', 'tracks') and len(parts) == 2:
+            ids = query.get('ids', [''])[0].split(',')
+            if parts[1] == 'audio-features':
+                upstream.record('spotify_audio_features', upstream.spotify_latency)
+                return self.send_json({'audio_features': [synthetic.audio_features(track_id) for track_id in ids]})
+            upstream.record('spotify_tracks', upstream.spotify_latency)
+            return self.send_json({'tracks': [synthetic.track(track_id) for track_id in ids]})
+
+        if parts[1] == 'playlists' and len(parts) >= 3 and synthetic.parse_playlist_id(parts[2]):
+            playlist_id = parts[2]
+            if len(parts) == 3:
+                upstream.record('spotify_playlist', upstream.spotify_latency)
+                return self.send_json(synthetic.playlist(playlist_id))
+            if parts[3] in ('tracks', 'items'):
+                upstream.record('spotify_playlist_tracks', upstream.spotify_latency)
+                return self.send_json(upstream.track_page(playlist_id, query))
+
+        self.not_found()
+
+
+class FakeUpstream:
+    """A local HTTP server playing Spotify and OpenAI, with configurable per-call latency"""
+
+    def __init__(self, spotify_latency=0.0, llm_latency=0.0, host='127.0.0.1', port=0):
+        self.spotify_latency = spotify_latency
+        self.llm_latency = llm_latency
+        self.server = ThreadingHTTPServer((host, port), FakeUpstreamHandler)
+        self.server.daemon_threads = True
+        self.server.upstream = self
+        self.url = f'http://{host}:{self.server.server_address[1]}'
+        self.counts = {}
+        self._throttled = 0
+        self._retry_after = 0
+        self._failures = 0
+        self._failure_status = 503
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def throttle(self, count, retry_after=0):
+        """Answer the next count Spotify API requests with 429 and this Retry-After"""
+        with self._lock:
+            self._throttled = count
+            self._retry_after = retry_after
+
+    def take_throttle(self):
+        """Retry-After for a request that should be throttled, or None"""
+        with self._lock:
+            if not self._throttled:
+                return None
+            self._throttled -= 1
+            return self._retry_after
+
+    def fail(self, count, status=503):
+        """Answer the next count Spotify API requests with this server error"""
+        with self._lock:
+            self._failures = count
+            self._failure_status = status
+
+    def take_failure(self):
+        """Status for a request that should fail, or None"""
+        with self._lock:
+            if not self._failures:
+                return None
+            self._failures -= 1
+            return self._failure_status
+
+    def record(self, endpoint, latency=0.0):
+        with self._lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        if latency:
+            time.sleep(latency)
+
+    def track_page(self, playlist_id, query):
+        """One page of a playlist's tracks, with a next URL pointing back at this server"""
+        limit = int(query.get('limit', ['100'])[0])
+        offset = int(query.get('offset', ['0'])[0])
+        ids = synthetic.track_ids(playlist_id)
+        end = min(offset + limit, len(ids))
+        return {
+            'items': [{'track': synthetic.track(track_id)} for track_id in ids[offset:end]],
+            'limit': limit,
+            'offset': offset,
+            'total': len(ids),
+            'next': f'{self.url}/v1/playlists/{playlist_id}/tracks?offset={end}&limit={limit}' if end < len(ids) else None
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeGeminiModel:
+    """In-process stand-in for genai.GenerativeModel; the Gemini SDK talks gRPC, which the fake server does not"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def reply(self, prompt):
+        self.calls += 1
+
+        class FakeResponse:
+            usage_metadata = None
+        response = FakeResponse()
+        response.text = mood_reply(prompt)
+        return response
+
+    def generate_content(self, prompt, generation_config=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.reply(prompt)
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.reply(prompt)
+
+
+def memory_cache(cache):
+    """An empty in-memory LRUCache with the same limits as cache, which may be backed by SQLite"""
+    return LRUCache(maxsize=cache.maxsize, ttl=cache.ttl, table=cache.table)
+
+
+def connect(spotify_client, mood_analyzer, upstream, incremental_analyzer=None):
+    """Point existing SpotifyClient and MoodAnalyzer objects at the stand-ins.
+
+    The fake token and the synthetic features, suggestions and (given an
+    IncrementalAnalyzer) playlist states stay in memory: spotipy would
+    otherwise save the token to ./.cache for real clients to reuse, and
+    clearing or filling the caches would touch FEATURE_CACHE_DB, AI_CACHE_DB
+    and INCREMENTAL_STATE_DB.
+    """
+    spotify_client.sp.prefix = f'{upstream.url}/v1/'
+    spotify_client.client_credentials_manager.OAUTH_TOKEN_URL = f'{upstream.url}/api/token'
+    spotify_client.client_credentials_manager.cache_handler = MemoryCacheHandler()
+    spotify_client.feature_cache = memory_cache(spotify_client.feature_cache)
+    mood_analyzer.suggestion_cache = memory_cache(mood_analyzer.suggestion_cache)
+    if incremental_analyzer is not None:
+        incremental_analyzer.states = memory_cache(incremental_analyzer.states)
+
+    # The fake server speaks the OpenAI API, so it stands in for both OpenAI and a local LLM server
+    for name in ('openai', 'local'):
+        provider = mood_analyzer.providers[name]
+        provider.client = AsyncOpenAI(
+            api_key='benchmark',
+            base_url=f'{upstream.url}/v1',
+            http_client=http_pools.async_httpx_client(name, DefaultAsyncHttpxClient)
+        )
+        provider.available = True
+    mood_analyzer.gemini_model = FakeGeminiModel(upstream.llm_latency)
+    mood_analyzer.gemini_available = True
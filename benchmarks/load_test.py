@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Load test the Flask API at realistic concurrency against local Spotify and LLM stand-ins
+
+The app is served in-process by a threaded WSGI server and driven over real
+HTTP by concurrent clients sending a weighted mix of /api/analyze,
+/api/analyze-batch and /api/playlist-info requests for a deterministic pool
+of synthetic playlists. No network access or API keys are needed.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 16 --duration 30
+    python -m benchmarks.load_test --mix analyze=6,batch=1,info=3 --requests 500 --save load.json
+"""
+
+import os
+
+# Load the app, not Spotify's quota: no client-side rate limiting unless asked for
+os.environ.setdefault('SPOTIFY_RATE_LIMIT', '0')
+os.environ.setdefault('SPOTIFY_MAX_CONCURRENCY', '64')
+
+import argparse
+import contextlib
+import json
+import logging
+import platform
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+import requests
+from werkzeug.serving import make_server
+from benchmarks import synthetic
+from benchmarks.fake_services import FakeUpstream, connect
+from metrics import Histogram, LATENCY_BUCKETS, QUANTILES
+
+ENDPOINTS = {
+    'analyze': '/api/analyze',
+    'batch': '/api/analyze-batch',
+    'info': '/api/playlist-info'
+}
+
+DEFAULT_MIX = {'analyze': 6, 'batch': 1, 'info': 3}
+
+
+def parse_mix(text):
+    """'analyze=6,batch=1,info=3' -> {'analyze': 6, 'batch': 1, 'info': 3}"""
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown request kind '{kind}' (choose from {', '.join(ENDPOINTS)})")
+        mix[kind] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError('request mix needs at least one positive weight')
+    return mix
+
+
+class LoadStats:
+    """Latency histograms, status counts and errors per request kind, shared by all workers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.statuses = {}
+        self.errors = {}
+
+    def record(self, kind, elapsed, status=None, error=None):
+        with self._lock:
+            self.latency.setdefault(kind, Histogram()).observe(elapsed)
+            self.statuses.setdefault(kind, Counter())[status or 'error'] += 1
+            if error:
+                self.errors.setdefault(kind, Counter())[error] += 1
+
+    def report(self, elapsed):
+        kinds = {}
+        for kind, histogram in sorted(self.latency.items()):
+            failed = sum(self.errors.get(kind, Counter()).values())
+            buckets, previous = [], 0
+            for bound, cumulative in zip(LATENCY_BUCKETS, histogram.counts):
+                buckets.append({'le': bound, 'count': cumulative - previous})
+                previous = cumulative
+            buckets.append({'le': 'inf', 'count': histogram.count - previous})
+            kinds[kind] = {
+                'endpoint': ENDPOINTS[kind],
+                'requests': histogram.count,
+                'requests_per_sec': round(histogram.count / elapsed, 3),
+                'errors': failed,
+                'error_rate': round(failed / histogram.count, 4),
+                'mean_ms': round(histogram.sum / histogram.count * 1000, 3),
+                **{f'p{int(q * 100)}_ms': round(histogram.quantile(q) * 1000, 3) for q in QUANTILES},
+                'statuses': {str(status): count for status, count in self.statuses[kind].items()},
+                'error_reasons': dict(self.errors.get(kind, Counter()).most_common(5)),
+                'histogram': buckets
+            }
+
+        total = sum(k['requests'] for k in kinds.values())
+        errors = sum(k['errors'] for k in kinds.values())
+        return {
+            'duration_sec': round(elapsed, 3),
+            'requests': total,
+            'requests_per_sec': round(total / elapsed, 3) if elapsed else None,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else None,
+            'endpoints': kinds
+        }
+
+
+class LoadDriver:
+    """Concurrent clients sending a weighted request mix until a deadline or request count is reached"""
+
+    def __init__(self, base_url, playlists, mix, concurrency, batch_size=5, ai_batch_size=1, seed=0, timeout=60):
+        self.base_url = base_url
+        self.playlists = playlists
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.ai_batch_size = ai_batch_size
+        self.seed = seed
+        self.timeout = timeout
+        self.stats = LoadStats()
+        self._lock = threading.Lock()
+        self._remaining = None
+        self._deadline = None
+        self._record_after = 0.0
+
+    def payload(self, kind, rng):
+        if kind == 'batch':
+            urls = rng.sample(self.playlists, min(self.batch_size, len(self.playlists)))
+            return {'playlist_urls': urls, 'ai_batch_size': self.ai_batch_size}
+        return {'playlist_url': rng.choice(self.playlists)}
+
+    def _take(self):
+        """Claim the next request, or False when the run is over"""
+        if self._deadline and time.perf_counter() >= self._deadline:
+            return False
+        if self._remaining is None:
+            return True
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+    def _worker(self, number):
+        rng = random.Random(f'{self.seed}:{number}')
+        session = requests.Session()  # one keep-alive connection per simulated client
+        try:
+            while self._take():
+                kind = rng.choices(self.kinds, self.weights)[0]
+                body = self.payload(kind, rng)
+                start = time.perf_counter()
+                status, error = None, None
+                try:
+                    response = session.post(self.base_url + ENDPOINTS[kind], json=body, timeout=self.timeout)
+                    status = response.status_code
+                    if status >= 400:
+                        error = f'HTTP {status}: ' + str(response.json().get('error', ''))[:100]
+                except (requests.RequestException, ValueError) as e:
+                    error = type(e).__name__
+                if start >= self._record_after:
+                    self.stats.record(kind, time.perf_counter() - start, status, error)
+        finally:
+            session.close()
+
+    def run(self, duration=None, requests_total=None, warmup=0.0):
+        """Drive load and return the report; requests during the first warmup seconds are not recorded"""
+        start = time.perf_counter()
+        self._record_after = start + warmup
+        self._deadline = start + warmup + duration if duration else None
+        self._remaining = requests_total
+
+        threads = [threading.Thread(target=self._worker, args=(n,), daemon=True) for n in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return self.stats.report(max(time.perf_counter() - self._record_after, 1e-9))
+
+
+@contextlib.contextmanager
+def serve_app(spotify_latency=0.0, llm_latency=0.0, ai_provider='openai'):
+    """Run app.py in a threaded WSGI server with its upstreams pointed at local stand-ins; yields (base URL, upstream)"""
+    import app as flask_app  # imported after the environment defaults above are in place
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    with FakeUpstream(spotify_latency=spotify_latency, llm_latency=llm_latency) as upstream:
+        connect(flask_app.spotify_client, flask_app.mood_analyzer, upstream, flask_app.incremental_analyzer)
+        flask_app.mood_analyzer.ai_provider = ai_provider
+        server = make_server('127.0.0.1', 0, flask_app.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f'http://127.0.0.1:{server.server_port}', upstream
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def print_report(report):
+    print(f"Requests: {report['requests']} in {report['duration_sec']}s "
+          f"({report['requests_per_sec']} req/s), errors: {report['errors']} ({(report['error_rate'] or 0):.2%})")
+    for kind, stats in report['endpoints'].items():
+        print(f"\n{stats['endpoint']}  {stats['requests']} requests, {stats['requests_per_sec']} req/s, "
+              f"{stats['error_rate']:.2%} errors")
+        print(f"  latency ms: mean {stats['mean_ms']}  p50 {stats['p50_ms']}  p95 {stats['p95_ms']}  p99 {stats['p99_ms']}")
+        widest = max(bucket['count'] for bucket in stats['histogram']) or 1
+        for bucket in stats['histogram']:
+            if bucket['count']:
+                bound = '+Inf' if bucket['le'] == 'inf' else f"{bucket['le'] * 1000:g}ms"
+                print(f"  <= {bound:>8} {'#' * max(1, round(40 * bucket['count'] / widest)):<40} {bucket['count']}")
+        for reason, count in stats['error_reasons'].items():
+            print(f"  ❌ {count} x {reason}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients (default: 8)')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to run, after warmup (default: 10)')
+    parser.add_argument('--requests', type=int, help='stop after this many requests instead of after --duration')
+    parser.add_argument('--warmup', type=float, default=0.0, help='seconds of unrecorded load before measuring')
+    parser.add_argument('--mix', type=parse_mix, default=dict(DEFAULT_MIX),
+                        help='request weights, e.g. analyze=6,batch=1,info=3 (the default)')
+    parser.add_argument('--playlists', type=int, default=50, help='distinct synthetic playlists to request (default: 50)')
+    parser.add_argument('--sizes', type=lambda s: [int(n) for n in s.split(',')], default=[50, 200, 1000],
+                        help='playlist sizes to draw from (default: 50,200,1000)')
+    parser.add_argument('--batch-size', type=int, default=5, help='playlists per /api/analyze-batch request (default: 5)')
+    parser.add_argument('--ai-batch-size', type=int, default=1, help='ai_batch_size sent with batch requests (default: 1)')
+    parser.add_argument('--spotify-latency', type=float, default=20.0, help='added latency per Spotify call in ms (default: 20)')
+    parser.add_argument('--llm-latency', type=float, default=300.0, help='added latency per OpenAI/Gemini call in ms (default: 300)')
+    parser.add_argument('--ai-provider', default='openai', choices=['openai', 'gemini', 'local', 'auto', 'none'],
+                        help='AI provider the app uses (default: openai)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the playlist pool and request sequence')
+    parser.add_argument('--save', help='write the report as JSON to this file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("🧪 Spotify Mood Analyzer Load Test", file=sys.stderr)
+
+    playlists = synthetic.playlist_pool(args.playlists, args.sizes, args.seed)
+    with serve_app(args.spotify_latency / 1000, args.llm_latency / 1000, args.ai_provider) as (base_url, upstream):
+        driver = LoadDriver(base_url, playlists, args.mix, args.concurrency, args.batch_size,
+                            args.ai_batch_size, args.seed)
+        print(f"🚀 {args.concurrency} clients against {base_url}...", file=sys.stderr)
+        # The app prints progress for every analysis; keep it out of the report
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            report = driver.run(None if args.requests else args.duration, args.requests, args.warmup)
+        report['upstream_calls'] = dict(upstream.counts)
+
+    print_report(report)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'created': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'settings': {k: v for k, v in vars(args).items() if k != 'save'},
+                **report
+            }, f, indent=2)
+        print(f"\n💾 Saved report to {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark playlist fetching, mood scoring, AI suggestions and the Flask API against local stand-ins
+
+Spotify and OpenAI are served by a local HTTP server (Gemini by an in-process
+model) with configurable latency, so runs are repeatable and need no network.
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 10,100,1000,10000 --iterations 5
+    python -m benchmarks.run_benchmarks --save results.json
+    python -m benchmarks.run_benchmarks --compare results.json --threshold 0.15
+"""
+
+import os
+
+# Measure the code rather than Spotify's quota: no client-side rate limiting unless asked for
+os.environ.setdefault('SPOTIFY_RATE_LIMIT', '0')
+os.environ.setdefault('SPOTIFY_MAX_CONCURRENCY', '64')
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from benchmarks import synthetic
+from benchmarks.fake_services import FakeUpstream, connect
+from metrics import Histogram, QUANTILES
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+def measure(func, iterations, setup=None):
+    """Time func over several iterations, then run it once more under tracemalloc for peak memory"""
+    histogram = Histogram()
+    total = 0.0
+    for _ in range(iterations):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        histogram.observe(elapsed)
+        total += elapsed
+
+    # Memory is measured separately because tracemalloc slows everything down
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'ops_per_sec': round(iterations / total, 3) if total else None,
+        'mean_ms': round(total / iterations * 1000, 3),
+        **{f'p{int(q * 100)}_ms': round(histogram.quantile(q) * 1000, 3) for q in QUANTILES},
+        'peak_memory_mb': round(peak / (1024 * 1024), 3)
+    }
+
+
+def benchmark_targets(spotify_client, mood_analyzer, flask_client, warm, incremental_analyzer=None):
+    """(name, run(size), setup) for every benchmark; setup clears caches unless warm.
+
+    The caches are the in-memory ones connect() installs, never the configured SQLite files.
+    Stored incremental states are cleared even when warm, so with INCREMENTAL_ANALYSIS on
+    every /api/analyze iteration runs a full analysis rather than the unchanged-snapshot shortcut.
+    """
+
+    def clear_caches():
+        if incremental_analyzer is not None:
+            incremental_analyzer.states.clear()
+        if not warm:
+            spotify_client.feature_cache.clear()
+            mood_analyzer.suggestion_cache.clear()
+
+    def analyze_playlist(size):
+        result = spotify_client.analyze_playlist(synthetic.playlist_url(size))
+        assert result and result['total_tracks'] == size, 'analyze_playlist returned no data'
+
+    prepared = {}
+
+    def analyze_playlist_mood(size):
+        result = mood_analyzer.analyze_playlist_mood(prepared[size])
+        assert not result.get('error'), result.get('error')
+
+    def combine_analysis(size):
+        result = mood_analyzer.combine_analysis(prepared[size])
+        assert result['final_recommendations'], 'combine_analysis returned no recommendations'
+
+    def api_analyze(size, query=''):
+        response = flask_client.post(f'/api/analyze{query}', json={'playlist_url': synthetic.playlist_url(size)})
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+
+    def prepare(size):
+        if size not in prepared:
+            prepared[size] = synthetic.playlist_data(size)
+
+    return [
+        ('spotify.analyze_playlist', analyze_playlist, clear_caches),
+        ('mood.analyze_playlist_mood', analyze_playlist_mood, None),
+        ('mood.combine_analysis', combine_analysis, clear_caches),
+        ('api./api/analyze', api_analyze, clear_caches),
+        ('api./api/analyze?compact=1', lambda size: api_analyze(size, '?compact=1'), clear_caches)
+    ], prepare
+
+
+def run(args):
+    import app as flask_app  # imported after the environment defaults above are in place
+
+    upstream = FakeUpstream(spotify_latency=args.spotify_latency / 1000, llm_latency=args.llm_latency / 1000).start()
+    try:
+        connect(flask_app.spotify_client, flask_app.mood_analyzer, upstream, flask_app.incremental_analyzer)
+        flask_app.mood_analyzer.ai_provider = args.ai_provider
+        targets, prepare = benchmark_targets(
+            flask_app.spotify_client, flask_app.mood_analyzer, flask_app.app.test_client(), args.warm,
+            flask_app.incremental_analyzer
+        )
+
+        results = []
+        for size in args.sizes:
+            prepare(size)
+            for name, func, setup in targets:
+                if args.only and not any(part in name for part in args.only):
+                    continue
+                print(f"⏱️  {name} ({size} tracks)...", file=sys.stderr)
+                stats = measure(lambda: func(size), args.iterations, setup)
+                results.append({'name': name, 'size': size, **stats})
+        return results, dict(upstream.counts)
+    finally:
+        upstream.stop()
+
+
+def print_results(results):
+    print(f"{'benchmark':<30}{'tracks':>8}{'ops/s':>10}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'peak MB':>10}")
+    for r in results:
+        print(f"{r['name']:<30}{r['size']:>8}{r['ops_per_sec']:>10}{r['p50_ms']:>11}{r['p95_ms']:>11}"
+              f"{r['p99_ms']:>11}{r['peak_memory_mb']:>10}")
+
+
+def compare(results, baseline_path, threshold):
+    """Print changes against a saved run and return the benchmarks whose p50 got slower than threshold"""
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['size']): r for r in json.load(f)['results']}
+
+    regressions = []
+    print(f"\n📊 Compared with {baseline_path}")
+    for r in results:
+        before = baseline.get((r['name'], r['size']))
+        if not before or not before['p50_ms']:
+            continue
+        change = (r['p50_ms'] - before['p50_ms']) / before['p50_ms']
+        flag = '❌' if change > threshold else '✅'
+        print(f"{flag} {r['name']} ({r['size']} tracks): p50 {before['p50_ms']} -> {r['p50_ms']} ms ({change:+.1%}), "
+              f"peak {before['peak_memory_mb']} -> {r['peak_memory_mb']} MB")
+        if change > threshold:
+            regressions.append(r)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=lambda s: [int(n) for n in s.split(',')], default=list(DEFAULT_SIZES),
+                        help='comma-separated playlist sizes in tracks (default: 10,100,1000,10000)')
+    parser.add_argument('--iterations', type=int, default=5, help='timed runs per benchmark (default: 5)')
+    parser.add_argument('--spotify-latency', type=float, default=0.0, help='added latency per Spotify call in ms')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='added latency per OpenAI/Gemini call in ms')
+    parser.add_argument('--ai-provider', default='openai', choices=['openai', 'gemini', 'local', 'auto'],
+                        help='AI provider to exercise (default: openai)')
+    parser.add_argument('--warm', action='store_true', help='keep feature and AI caches between iterations')
+    parser.add_argument('--only', action='append', help='run only benchmarks whose name contains this (repeatable)')
+    parser.add_argument('--save', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='compare with results saved by an earlier --save')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='p50 slowdown counted as a regression by --compare (default: 0.10)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("🧪 Spotify Mood Analyzer Benchmarks", file=sys.stderr)
+
+    results, upstream_calls = run(args)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'created': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'settings': {k: v for k, v in vars(args).items() if k not in ('save', 'compare')},
+                'upstream_calls': upstream_calls,
+                'results': results
+            }, f, indent=2)
+        print(f"\n💾 Saved results to {args.save}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding and response compression for analysis payloads
+
+Two payloads per playlist size: an /api/analyze-batch response body with
+--playlists analyses, and one analysis with its scored tracks attached (the
+per-track detail that grows with playlist size). Each is encoded with the
+standard library and orjson providers, then compressed with every available
+Content-Encoding; bytes are what would go over the wire.
+
+Usage:
+    python -m benchmarks.serialization --sizes 1000,10000 --iterations 20
+    python -m benchmarks.serialization --playlists 50 --save serialization.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from benchmarks import synthetic
+from benchmarks.run_benchmarks import measure
+from compression import available_encodings, compress
+from json_provider import OrjsonProvider, orjson_available
+from mood_analyzer import MoodAnalyzer
+
+DEFAULT_SIZES = (1000, 10000)
+
+
+def analysis_payloads(size, playlists):
+    """{payload name: body} for playlists of size tracks, analyzed without any network calls"""
+    from app import batch_result  # the app builds the batch entries; imported here so --help stays fast
+
+    analyzer = MoodAnalyzer()
+    analyses = []
+    # Every playlist is distinct: repeated analyses would let gzip and brotli look far better than they are
+    for seed in range(playlists):
+        playlist_data = synthetic.playlist_data(size, seed=seed)
+        analysis = analyzer.combine_analysis(playlist_data, ai_suggestions=analyzer.get_demo_ai_suggestions(playlist_data))
+        analyses.append((synthetic.playlist_url(size, seed=seed), analysis, playlist_data['tracks']))
+
+    results = [batch_result(url, analysis, None) for url, analysis, _ in analyses]
+    url, analysis, tracks = analyses[0]
+    return {
+        f'analyze-batch x{playlists}': {
+            'success': True,
+            'results': results,
+            'total_processed': len(results),
+            'successful': len(results)
+        },
+        'analysis+tracks': {'url': url, 'success': True, 'analysis': {**analysis, 'tracks': tracks.to_dicts()}}
+    }
+
+
+def encoders():
+    """(name, obj -> bytes) for each JSON provider the app can be configured with"""
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    found = [('json stdlib', lambda obj: stdlib.dumps(obj).encode())]
+    if orjson_available():
+        fast = OrjsonProvider(app)
+        found.append(('json orjson', fast.dumps_bytes))
+    return found
+
+
+def run(args):
+    results = []
+    for size in args.sizes:
+        print(f"⏱️  building payloads ({size} tracks)...", file=sys.stderr)
+        for payload, body in analysis_payloads(size, args.playlists).items():
+            encoded = None
+            for name, encode in encoders():
+                encoded = encode(body)
+                stats = measure(lambda: encode(body), args.iterations)
+                results.append({'payload': payload, 'size': size, 'step': name, 'bytes': len(encoded), **stats})
+
+            # Compression input is the last (fastest available) encoder's output
+            for encoding in available_encodings():
+                compressed = compress(encoded, encoding)
+                stats = measure(lambda: compress(encoded, encoding), args.iterations)
+                results.append({'payload': payload, 'size': size, 'step': encoding, 'bytes': len(compressed), **stats})
+    return results
+
+
+def print_results(results):
+    print(f"{'payload':<22}{'tracks':>8}{'step':>14}{'p50 ms':>11}{'p95 ms':>11}{'bytes':>12}{'peak MB':>10}")
+    for r in results:
+        print(f"{r['payload']:<22}{r['size']:>8}{r['step']:>14}{r['p50_ms']:>11}{r['p95_ms']:>11}"
+              f"{r['bytes']:>12}{r['peak_memory_mb']:>10}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=lambda s: [int(n) for n in s.split(',')], default=list(DEFAULT_SIZES),
+                        help='comma-separated playlist sizes in tracks (default: 1000,10000)')
+    parser.add_argument('--playlists', type=int, default=20, help='analyses in the batch payload (default: 20)')
+    parser.add_argument('--iterations', type=int, default=10, help='timed runs per step (default: 10)')
+    parser.add_argument('--save', help='write results as JSON to this file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("🧪 Spotify Mood Analyzer Serialization Benchmarks", file=sys.stderr)
+
+    results = run(args)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'created': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'settings': {k: v for k, v in vars(args).items() if k != 'save'},
+                'results': results
+            }, f, indent=2)
+        print(f"\n💾 Saved results to {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Deterministic synthetic playlists, tracks and audio features for benchmarks and load tests
+"""
+
+import random
+import re
+from track_table import TrackTable
+
+# Playlist IDs encode their size and seed, so any process can rebuild the same playlist from the ID alone
+PLAYLIST_ID_PATTERN = re.compile(r'^synth(\d+)s(\d+)$')
+
+GENRE_WORDS = ['Piano', 'Rain', 'Neon', 'Summer', 'Midnight', 'Ocean', 'Forest', 'City', 'Dream', 'Fire']
+
+
+def playlist_id(size, seed=0):
+    """Spotify-style (base62) ID for a synthetic playlist of size tracks"""
+    return f'synth{size}s{seed}'
+
+
+def playlist_url(size, seed=0):
+    return f'https://open.spotify.com/playlist/{playlist_id(size, seed)}'
+
+
+def parse_playlist_id(playlist_id):
+    """(size, seed) for a synthetic playlist ID, or None"""
+    match = PLAYLIST_ID_PATTERN.match(playlist_id)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def track_ids(playlist_id):
+    """Track IDs of a synthetic playlist in order; about 1 in 50 repeats an earlier track"""
+    size, seed = parse_playlist_id(playlist_id)
+    rng = random.Random(f'{playlist_id}:order')
+    ids = []
+    for i in range(size):
+        if i and rng.random() < 0.02:
+            ids.append(ids[rng.randrange(i)])
+        else:
+            ids.append(f's{seed}t{size}n{i}')
+    return ids
+
+
+def track(track_id):
+    """Spotify track object for a synthetic track ID"""
+    rng = random.Random(f'{track_id}:track')
+    words = rng.sample(GENRE_WORDS, 2)
+    return {
+        'id': track_id,
+        'name': f'{words[0]} {words[1]} {track_id[-4:]}',
+        'artists': [{'name': f'Artist {rng.randrange(500)}'}],
+        'album': {'name': f'Album {rng.randrange(200)}'},
+        'duration_ms': rng.randrange(90000, 420000),
+        'popularity': rng.randrange(100),
+        'preview_url': None,
+        'external_urls': {'spotify': f'https://open.spotify.com/track/{track_id}'}
+    }
+
+
+def audio_features(track_id):
+    """Spotify audio features object for a synthetic track ID"""
+    rng = random.Random(f'{track_id}:features')
+    return {
+        'id': track_id,
+        'acousticness': rng.random(),
+        'danceability': rng.random(),
+        'energy': rng.random(),
+        'instrumentalness': rng.random() ** 3,
+        'liveness': rng.random() ** 2,
+        'loudness': -rng.uniform(0, 30),
+        'speechiness': rng.random() ** 4,
+        'tempo': rng.uniform(60, 200),
+        'valence': rng.random(),
+        'mode': rng.randrange(2),
+        'key': rng.randrange(12),
+        'time_signature': rng.choice([3, 4, 4, 4, 5])
+    }
+
+
+def playlist(playlist_id):
+    """Spotify playlist object (without its track pages) for a synthetic playlist ID"""
+    size, seed = parse_playlist_id(playlist_id)
+    return {
+        'id': playlist_id,
+        'name': f'Synthetic {size} #{seed}',
+        'description': f'{size} generated tracks for benchmarking',
+        'snapshot_id': f'{playlist_id}v1',
+        'tracks': {'total': size},
+        'external_urls': {'spotify': f'https://open.spotify.com/playlist/{playlist_id}'},
+        'images': [],
+        'owner': {'display_name': 'benchmark'}
+    }
+
+
+def playlist_data(size, seed=0):
+    """The parts of SpotifyClient.analyze_playlist's result that MoodAnalyzer reads, built without HTTP"""
+    pid = playlist_id(size, seed)
+    ids = track_ids(pid)
+    tracks = TrackTable.from_items({'track': track(tid)} for tid in ids)
+    tracks.set_features({tid: audio_features(tid) for tid in ids})
+    info = playlist(pid)
+    return {
+        'playlist_info': {
+            'id': pid,
+            'name': info['name'],
+            'snapshot_id': info['snapshot_id'],
+            'description': info['description'],
+            'total_tracks': size,
+            'url': info['external_urls']['spotify'],
+            'image': None,
+            'owner': info['owner']['display_name']
+        },
+        'tracks': tracks,
+        'total_tracks': len(tracks),
+        'total_with_features': len(tracks)
+    }
+
+
+def playlist_pool(count, sizes, seed=0):
+    """URLs of count distinct synthetic playlists with sizes drawn from sizes; the same arguments give the same pool"""
+    rng = random.Random(f'pool:{seed}')
+    return [playlist_url(rng.choice(sizes), seed * count + i) for i in range(count)]
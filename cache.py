@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe LRU cache with optional TTL and SQLite persistence"""
+
+    def __init__(self, maxsize=1024, ttl=None, db_path=None, table='cache'):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl or None  # None or 0 means entries never expire
+        self.table = table
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self.db_path = db_path
+        self._db = None
+        self._connect()
+
+    def _connect(self):
+        if not self.db_path:
+            return
+        try:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._db.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Cache database unavailable, using memory only: {e}")
+            self._db = None
+
+    def reconnect(self):
+        """Open a fresh database connection; SQLite connections must not be shared across fork()"""
+        with self._lock:
+            self._db = None  # the inherited connection belongs to the parent process
+            self._connect()
+
+    def _expires_at(self):
+        return time.time() + self.ttl if self.ttl else None
+
+    def _store(self, key, value, expires_at):
+        """Insert into the in-memory LRU, evicting the least recently used entry if full"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, key, now):
+        """Find a live entry in memory or on disk; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or expires_at > now:
+                self._entries.move_to_end(key)
+                return True, value
+            del self._entries[key]
+
+        if self._db is not None:
+            row = self._db.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row and (row[1] is None or row[1] > now):
+                value = json.loads(row[0])
+                self._store(key, value, row[1])
+                self.disk_hits += 1
+                return True, value
+
+        return False, None
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            found, value = self._lookup(key, time.time())
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def get_many(self, keys):
+        """Return a dict of the keys that are cached"""
+        found = {}
+        with self._lock:
+            now = time.time()
+            for key in keys:
+                if key in found:
+                    continue
+                hit, value = self._lookup(key, now)
+                if hit:
+                    self.hits += 1
+                    found[key] = value
+                else:
+                    self.misses += 1
+        return found
+
+    def set(self, key, value):
+        """Cache a single value"""
+        self.set_many({key: value})
+
+    def set_many(self, mapping):
+        """Cache every key/value pair in mapping"""
+        if not mapping:
+            return
+        with self._lock:
+            expires_at = self._expires_at()
+            for key, value in mapping.items():
+                self._store(key, value, expires_at)
+
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                        [(key, json.dumps(value), expires_at) for key, value in mapping.items()]
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Error writing to cache database: {e}")
+
+    def clear(self):
+        """Drop all cached entries, including persisted ones"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table}")
+                self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'persistent': self._db is not None
+            }
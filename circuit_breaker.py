@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Stop calling a dependency that keeps failing, then probe it after a cooldown.
+
+    Closed: calls go through and outcomes are recorded in a rolling window.
+    Once the window holds at least min_calls outcomes and the error rate
+    reaches error_rate, the breaker opens. Open: calls are rejected until
+    cooldown seconds have passed. Half-open: one probe call is let through;
+    success closes the breaker, failure opens it for another cooldown.
+    """
+
+    def __init__(self, name, window=20, min_calls=5, error_rate=0.5, cooldown=30.0):
+        self.name = name
+        self.min_calls = max(1, int(min_calls))
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self._outcomes = deque(maxlen=max(self.min_calls, int(window)))  # True for success
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started = None
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_started = None
+        self.times_opened += 1
+
+    def _current_state(self, now):
+        """Move from open to half-open once the cooldown is over; caller holds the lock"""
+        if self._state == OPEN and now - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probe_started = None
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def allow_request(self):
+        """True if a call may go out now; in half-open this claims the single probe"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            # A probe that never reported back (e.g. a hedge that was not needed) expires after a cooldown
+            if state == HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.cooldown):
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._current_state(time.monotonic()) == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+                self._probe_started = None
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._open(now)
+                return
+            self._outcomes.append(False)
+            if state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.error_rate:
+                    self._open(now)
+
+    def reset(self):
+        """Close the breaker and forget recorded outcomes"""
+        with self._lock:
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._probe_started = None
+
+    def stats(self):
+        """Breaker state and recent error rate for monitoring"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            calls = len(self._outcomes)
+            failures = self._outcomes.count(False)
+            return {
+                'state': state,
+                'recent_calls': calls,
+                'recent_failures': failures,
+                'error_rate': round(failures / calls, 4) if calls else 0.0,
+                'retry_in': round(max(0.0, self.cooldown - (now - self._opened_at)), 2) if state == OPEN else 0.0,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected
+            }
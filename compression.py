@@ -0,0 +1,56 @@
+import gzip
+from typing import Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it responses are only gzip-compressed
+    brotli = None
+
+# Content types worth compressing; images and already-compressed formats are left alone
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json',
+    'application/javascript',
+    'text/css',
+    'text/html',
+    'text/javascript',
+    'text/plain'
+))
+
+
+def available_encodings() -> list:
+    """Content-Encodings this process can produce, brotli first when installed"""
+    return (['br'] if brotli is not None else []) + ['gzip']
+
+
+def choose_encoding(accept_encodings, preferred: Iterable[str]) -> Optional[str]:
+    """First of preferred that this process supports and the client accepts (q > 0).
+
+    accept_encodings is werkzeug's parsed Accept-Encoding header, so '*' counts
+    as accepting everything not refused by name.
+    """
+    supported = available_encodings()
+    for encoding in preferred:
+        if encoding in supported and accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """data in the given Content-Encoding; level is the gzip level or brotli quality"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=5 if level is None else level)
+    if encoding == 'gzip':
+        # mtime=0 keeps output identical for identical bodies, which helps ETags and caches
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    raise ValueError(f"Unsupported encoding '{encoding}'")
+
+
+def should_compress(response, min_size: int) -> bool:
+    """Whether a finished Flask response is worth compressing"""
+    if response.direct_passthrough or response.is_streamed:
+        return False  # streamed NDJSON lines must reach the client as they are produced
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    return response.content_length is not None and response.content_length >= min_size
@@ -14,13 +14,118 @@ class Config:
     # Google Gemini API key
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', 'your_gemini_api_key')
     
-    # AI Provider preference (openai, gemini, or auto)
-    AI_PROVIDER = os.getenv('AI_PROVIDER', 'auto')  # auto will try OpenAI first, then Gemini
+    # AI Provider preference: openai, gemini, local, a comma-separated order such as 'local,openai',
+    # or auto (every configured provider in registration order: OpenAI, Gemini, then the local server)
+    AI_PROVIDER = os.getenv('AI_PROVIDER', 'auto')
+
+    # Provider hedging when several AI providers are configured:
+    # 'off' tries them in order, 'hedge' starts the next one after AI_HEDGE_DELAY seconds, 'race' starts all at once
+    AI_HEDGE_MODE = os.getenv('AI_HEDGE_MODE', 'off')
+    AI_HEDGE_DELAY = float(os.getenv('AI_HEDGE_DELAY', '3.0'))
+
+    # Per-provider circuit breaker: skip a provider once AI_BREAKER_ERROR_RATE of its last
+    # AI_BREAKER_WINDOW calls failed (after at least AI_BREAKER_MIN_CALLS), retrying after AI_BREAKER_COOLDOWN seconds
+    AI_BREAKER_WINDOW = int(os.getenv('AI_BREAKER_WINDOW', '20'))
+    AI_BREAKER_MIN_CALLS = int(os.getenv('AI_BREAKER_MIN_CALLS', '5'))
+    AI_BREAKER_ERROR_RATE = float(os.getenv('AI_BREAKER_ERROR_RATE', '0.5'))
+    AI_BREAKER_COOLDOWN = float(os.getenv('AI_BREAKER_COOLDOWN', '30'))
+
+    # AI model names
+    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+
+    # Local OpenAI-compatible server (llama.cpp, Ollama, vLLM); the 'local' provider is enabled when the URL is set
+    LOCAL_LLM_URL = os.getenv('LOCAL_LLM_URL', '')
+    LOCAL_LLM_MODEL = os.getenv('LOCAL_LLM_MODEL', 'local-model')
+    LOCAL_LLM_API_KEY = os.getenv('LOCAL_LLM_API_KEY', '')
+
+    # AI prompt size: approximate token budget for the prompt, most sample tracks to include,
+    # and the completion token limit sent to the model
+    AI_PROMPT_TOKEN_BUDGET = int(os.getenv('AI_PROMPT_TOKEN_BUDGET', '350'))
+    AI_PROMPT_SAMPLE_TRACKS = int(os.getenv('AI_PROMPT_SAMPLE_TRACKS', '8'))
+    AI_MAX_TOKENS = int(os.getenv('AI_MAX_TOKENS', '300'))
+
+    # Batched AI suggestions for /api/analyze-batch: playlists per model call (1 disables batching),
+    # seconds a fetched playlist waits for others to share its call, and approximate prompt tokens and
+    # sample tracks per playlist within a batch prompt
+    AI_BATCH_SIZE = int(os.getenv('AI_BATCH_SIZE', '1'))
+    AI_BATCH_WAIT = float(os.getenv('AI_BATCH_WAIT', '0.5'))
+    AI_BATCH_PLAYLIST_TOKENS = int(os.getenv('AI_BATCH_PLAYLIST_TOKENS', '120'))
+    AI_BATCH_SAMPLE_TRACKS = int(os.getenv('AI_BATCH_SAMPLE_TRACKS', '3'))
+
+    # AI suggestion cache (AI_CACHE_DB is an optional SQLite file path)
+    AI_CACHE_SIZE = int(os.getenv('AI_CACHE_SIZE', '1000'))
+    AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', str(24 * 3600)))  # seconds, 0 never expires
+    AI_CACHE_DB = os.getenv('AI_CACHE_DB', '')
     
     # Flask settings
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev_secret_key_change_in_production')
-    
+
+    # Spotify fetch settings
+    SPOTIFY_PIPELINED_FETCH = os.getenv('SPOTIFY_PIPELINED_FETCH', 'true').lower() == 'true'
+    SPOTIFY_FETCH_WORKERS = int(os.getenv('SPOTIFY_FETCH_WORKERS', '4'))
+
+    # Process-wide Spotify rate limiting: requests per second (0 disables), burst size,
+    # concurrent-call cap (halved on each 429, regrown on success) and retries per throttled call
+    SPOTIFY_RATE_LIMIT = float(os.getenv('SPOTIFY_RATE_LIMIT', '10'))
+    SPOTIFY_RATE_BURST = int(os.getenv('SPOTIFY_RATE_BURST', '20'))
+    SPOTIFY_MAX_CONCURRENCY = int(os.getenv('SPOTIFY_MAX_CONCURRENCY', '8'))
+    SPOTIFY_MIN_CONCURRENCY = int(os.getenv('SPOTIFY_MIN_CONCURRENCY', '1'))
+    SPOTIFY_MAX_RETRIES = int(os.getenv('SPOTIFY_MAX_RETRIES', '3'))
+
+    # Audio feature cache (FEATURE_CACHE_DB is an optional SQLite file path)
+    FEATURE_CACHE_SIZE = int(os.getenv('FEATURE_CACHE_SIZE', '50000'))
+    FEATURE_CACHE_TTL = int(os.getenv('FEATURE_CACHE_TTL', str(30 * 24 * 3600)))  # seconds, 0 never expires
+    FEATURE_CACHE_DB = os.getenv('FEATURE_CACHE_DB', '')
+
+    # Incremental re-analysis: keep each playlist's last analyzed state and only process changed tracks
+    # (INCREMENTAL_STATE_DB is an optional SQLite file path)
+    INCREMENTAL_ANALYSIS = os.getenv('INCREMENTAL_ANALYSIS', 'false').lower() == 'true'
+    INCREMENTAL_STATE_SIZE = int(os.getenv('INCREMENTAL_STATE_SIZE', '1000'))
+    INCREMENTAL_STATE_TTL = int(os.getenv('INCREMENTAL_STATE_TTL', str(7 * 24 * 3600)))  # seconds, 0 never expires
+    INCREMENTAL_STATE_DB = os.getenv('INCREMENTAL_STATE_DB', '')
+
+    # Batch analysis settings
+    BATCH_EXECUTION_MODE = os.getenv('BATCH_EXECUTION_MODE', 'threaded')  # threaded or sequential
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', '4'))
+    BATCH_ITEM_TIMEOUT = float(os.getenv('BATCH_ITEM_TIMEOUT', '120'))  # seconds per playlist, 0 disables
+
+    # Shared HTTP connection pools for Spotify and OpenAI: sockets kept per host, hosts pooled per service,
+    # whether callers wait for a free socket instead of opening extra ones, and idle keep-alive seconds
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '16'))
+    HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', '4'))
+    HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'false').lower() == 'true'
+    HTTP_KEEPALIVE = float(os.getenv('HTTP_KEEPALIVE', '60'))
+
+    # Background job settings (requests sent with "async": true)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '100'))
+    JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', '3600'))  # seconds to keep finished job results
+
+    # Production server (serve.py): bind address, worker processes and threads per process, seconds a
+    # request may run, seconds in-flight requests get to finish on shutdown, and TLS files (HTTPS when both exist)
+    SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+    SERVER_PORT = int(os.getenv('SERVER_PORT', '5000'))
+    SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', '1'))
+    SERVER_THREADS = int(os.getenv('SERVER_THREADS', '8'))
+    SERVER_TIMEOUT = int(os.getenv('SERVER_TIMEOUT', '180'))
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', '30'))
+    SSL_CERT_FILE = os.getenv('SSL_CERT_FILE', 'localhost.crt')
+    SSL_KEY_FILE = os.getenv('SSL_KEY_FILE', 'localhost.key')
+
+    # API responses: JSON encoder ('auto' uses orjson when installed, else 'stdlib'), and compression of
+    # bodies of at least COMPRESS_MIN_SIZE bytes (0 disables) with the first of COMPRESS_ENCODINGS the client
+    # accepts; 'br' needs the brotli package
+    JSON_ENCODER = os.getenv('JSON_ENCODER', 'auto')
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_ENCODINGS = [e.strip() for e in os.getenv('COMPRESS_ENCODINGS', 'br,gzip').split(',') if e.strip()]
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+
+    # Rule-based scoring engine: 'python' (per-track loops) or 'numpy' (vectorized, needs numpy)
+    SCORING_ENGINE = os.getenv('SCORING_ENGINE', 'python')
+
     # Mood categories for mapping
     MOOD_CATEGORIES = {
         'calming': {
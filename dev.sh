@@ -7,10 +7,25 @@ case "$1" in
         echo "🚀 Starting Spotify Mood Analyzer..."
         python3 app.py
         ;;
+    "serve")
+        echo "🚀 Starting production server..."
+        shift
+        python3 serve.py "$@"
+        ;;
     "test")
         echo "🧪 Running tests..."
         python3 -m pytest tests/ -v
         ;;
+    "bench")
+        echo "⏱️  Running benchmarks..."
+        shift
+        python3 -m benchmarks.run_benchmarks "$@"
+        ;;
+    "load")
+        echo "🔥 Running load test..."
+        shift
+        python3 -m benchmarks.load_test "$@"
+        ;;
     "install")
         echo "📦 Installing dependencies..."
         pip3 install -r requirements.txt
@@ -34,8 +49,11 @@ case "$1" in
         echo "Usage: ./dev.sh [command]"
         echo ""
         echo "Commands:"
-        echo "  run     - Start the Flask application"
+        echo "  run     - Start the Flask development server"
+        echo "  serve   - Start the production server (serve.py, options passed through)"
         echo "  test    - Run all tests"
+        echo "  bench   - Run benchmarks (extra options are passed through)"
+        echo "  load    - Load test the API (extra options are passed through)"
         echo "  install - Install Python dependencies"
         echo "  clean   - Clean Python cache files"
         echo "  ssl     - Generate SSL certificates"
@@ -0,0 +1,148 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+from metrics import metrics
+
+
+
+def load_httpx():
+    """The httpx module, imported on first use since only the OpenAI client needs it"""
+    try:
+        import httpx
+    except ImportError:  # newer openai releases depend on the httpx2 fork instead
+        import httpx2 as httpx
+    return httpx
+
+
+class SharedSession(requests.Session):
+    """A session owned by the pool registry; SDK clients closing it on teardown is a no-op"""
+
+    def close(self):
+        pass
+
+
+class PooledSessions:
+    """Process-wide keep-alive HTTP connection pools, one per upstream service.
+
+    requests sessions (Spotify) and httpx clients (OpenAI) are built once per
+    name and handed to every client object, so threads reuse warm TLS
+    connections instead of opening new ones per SDK instance.
+    """
+
+    def __init__(self, pool_size=None, pool_hosts=None, pool_block=None, keepalive=None):
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.pool_hosts = pool_hosts or Config.HTTP_POOL_HOSTS
+        self.pool_block = Config.HTTP_POOL_BLOCK if pool_block is None else pool_block
+        self.keepalive = Config.HTTP_KEEPALIVE if keepalive is None else keepalive
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._httpx_clients = {}
+        self._async_httpx_clients = {}
+        self._httpx_requests = {}
+
+    def requests_session(self, name, max_retries=0):
+        """Shared requests.Session with a bounded per-host connection pool.
+
+        max_retries never honours Retry-After: 429s go back to the caller so its
+        rate limiter sees them, instead of urllib3 sleeping on them silently.
+        """
+        if not isinstance(max_retries, Retry):
+            max_retries = Retry(max_retries, read=False)
+        max_retries = max_retries.new(respect_retry_after_header=False)
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is None:
+                # pool_connections is how many hosts keep a pool, pool_maxsize how many sockets each host keeps
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_hosts,
+                    pool_maxsize=self.pool_size,
+                    pool_block=self.pool_block,
+                    max_retries=max_retries
+                )
+                session = SharedSession()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[name] = session
+            return session
+
+    def _count_httpx_request(self, name):
+        with self._lock:
+            self._httpx_requests[name] = self._httpx_requests.get(name, 0) + 1
+        metrics.inc('http_pool_requests_total', pool=name)
+
+    def _build_httpx_client(self, client_class, hook):
+        httpx = load_httpx()
+        return client_class(
+            limits=httpx.Limits(
+                max_connections=self.pool_size * self.pool_hosts,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive
+            ),
+            event_hooks={'request': [hook]}
+        )
+
+    def httpx_client(self, name, client_class=None):
+        """Shared httpx client with keep-alive limits; client_class lets SDKs supply their subclass"""
+        with self._lock:
+            client = self._httpx_clients.get(name)
+            if client is None:
+                self._httpx_requests.setdefault(name, 0)
+
+                def count_request(request):
+                    self._count_httpx_request(name)
+
+                client = self._build_httpx_client(client_class or load_httpx().Client, count_request)
+                self._httpx_clients[name] = client
+            return client
+
+    def async_httpx_client(self, name, client_class=None):
+        """Shared httpx.AsyncClient; it must only be used from one event loop (see ai_providers.provider_loop)"""
+        with self._lock:
+            client = self._async_httpx_clients.get(name)
+            if client is None:
+                self._httpx_requests.setdefault(name, 0)
+
+                async def count_request(request):
+                    self._count_httpx_request(name)
+
+                client = self._build_httpx_client(client_class or load_httpx().AsyncClient, count_request)
+                self._async_httpx_clients[name] = client
+            return client
+
+    def _requests_pool_stats(self, session):
+        """Per-host connection counters from urllib3's pools"""
+        hosts = {}
+        adapter = session.get_adapter('https://')
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            # urllib3 pre-fills the queue with None placeholders, so count real sockets only
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0
+            hosts[pool.host] = {
+                'requests': pool.num_requests,
+                'connections_opened': pool.num_connections,
+                'idle_connections': idle,
+                'reuse_rate': round(1 - pool.num_connections / pool.num_requests, 4) if pool.num_requests else 0.0
+            }
+        return hosts
+
+    def stats(self):
+        """Pool configuration and utilization counters for monitoring"""
+        with self._lock:
+            sessions = dict(self._sessions)
+            httpx_requests = dict(self._httpx_requests)
+        return {
+            'pool_size': self.pool_size,
+            'pool_hosts': self.pool_hosts,
+            'keepalive': self.keepalive,
+            'requests_sessions': {name: self._requests_pool_stats(session) for name, session in sessions.items()},
+            'httpx_clients': {name: {'requests': count} for name, count in httpx_requests.items()}
+        }
+
+
+# Shared pools for the whole process
+http_pools = PooledSessions()
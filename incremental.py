@@ -0,0 +1,146 @@
+import copy
+import threading
+from collections import Counter
+from cache import LRUCache
+from config import Config
+from metrics import metrics
+from track_table import TrackTable
+
+
+class IncrementalAnalyzer:
+    """Re-analyze playlists by applying track changes to their last analyzed state.
+
+    For each playlist it keeps the snapshot_id, its tracks (a packed TrackTable
+    with audio features and mood scores), running per-mood score sums and the
+    last combined analysis. An unchanged snapshot_id returns the stored
+    analysis without touching tracks; otherwise only track IDs are paged, and
+    just the added tracks are fetched and scored before the sums are adjusted.
+    """
+
+    def __init__(self, spotify_client, mood_analyzer, maxsize=None, ttl=None, db_path=None):
+        self.spotify = spotify_client
+        self.mood_analyzer = mood_analyzer
+        self.states = LRUCache(
+            maxsize=maxsize or Config.INCREMENTAL_STATE_SIZE,
+            ttl=Config.INCREMENTAL_STATE_TTL if ttl is None else ttl,
+            db_path=db_path or Config.INCREMENTAL_STATE_DB or None,
+            table='playlist_state'
+        )
+        self._lock = threading.Lock()
+        self.counts = {'full': 0, 'incremental': 0, 'unchanged': 0}
+
+    def _count(self, mode):
+        with self._lock:
+            self.counts[mode] += 1
+        metrics.inc('playlist_analyses_total', mode=mode)
+
+    def analyze(self, playlist_url, suggest=None):
+        """Combined mood analysis for a playlist, reusing its last analyzed state when possible.
+
+        suggest(playlist_data), if given, supplies the AI suggestions (see app.analyze_with_batched_ai).
+        """
+        playlist_id = self.spotify.extract_playlist_id(playlist_url)
+        state = self.states.get(playlist_id)
+        if state is None or 'track_table' not in state:
+            # States saved before tracks were stored column by column are rebuilt from scratch
+            return self.analyze_full(playlist_id, playlist_url, suggest)
+
+        playlist_info = self.spotify.get_playlist_info(playlist_url)
+        if not playlist_info:
+            return None
+
+        if playlist_info.get('snapshot_id') and playlist_info['snapshot_id'] == state['snapshot_id']:
+            print(f"⚡ Playlist {playlist_id} unchanged since last analysis")
+            self._count('unchanged')
+            return copy.deepcopy(state['analysis'])
+
+        return self.analyze_changes(playlist_id, playlist_url, playlist_info, state, suggest)
+
+    def analyze_full(self, playlist_id, playlist_url, suggest=None):
+        """First analysis of a playlist: fetch and score everything, then remember it"""
+        playlist_data = self.spotify.analyze_playlist(playlist_url)
+        if not playlist_data:
+            return None
+
+        analysis = self.mood_analyzer.combine_analysis(
+            playlist_data, ai_suggestions=suggest(playlist_data) if suggest else None
+        )
+
+        mood_sums = {mood: 0.0 for mood in self.mood_analyzer.mood_categories}
+        totals, scored_count = TrackTable.of(playlist_data['tracks']).mood_totals()
+        mood_sums.update(totals)
+
+        self._count('full')
+        self.save_state(playlist_id, playlist_data, analysis, mood_sums, scored_count)
+        return analysis
+
+    @metrics.timed('incremental_update')
+    def analyze_changes(self, playlist_id, playlist_url, playlist_info, state, suggest=None):
+        """Fetch and score only added tracks and update the running mood sums for adds and removes"""
+        track_ids = self.spotify.get_playlist_track_ids(playlist_url)
+        if not track_ids:
+            return None
+
+        previous = TrackTable.from_state(state['track_table'])
+        old_counts = Counter(previous.ids)
+        new_counts = Counter(track_ids)
+
+        added_ids = [track_id for track_id in new_counts if track_id not in old_counts]
+        known = previous
+        if added_ids:
+            added = self.spotify.get_tracks(added_ids)
+            added.set_features({f['id']: f for f in self.spotify.get_audio_features(added.ids)})
+            self.mood_analyzer.score_tracks(added)
+            known = TrackTable.concat([previous, added])
+        rows = {track_id: index for index, track_id in enumerate(known.ids)}
+
+        # A track's contribution changes by how many more (or fewer) times it now appears
+        mood_sums = dict(state['mood_sums'])
+        scored_count = state['scored_count']
+        for track_id in old_counts.keys() | new_counts.keys():
+            delta = new_counts[track_id] - old_counts[track_id]
+            scores = known.row_mood_scores(rows[track_id]) if delta and track_id in rows else None
+            if not scores:
+                continue
+            for mood, score in scores.items():
+                mood_sums[mood] = mood_sums.get(mood, 0.0) + delta * score
+            scored_count += delta
+
+        print(f"🔁 Playlist {playlist_id}: {len(added_ids)} new tracks, "
+              f"{len(old_counts.keys() - new_counts.keys())} removed")
+
+        tracks = known.take(rows[track_id] for track_id in track_ids if track_id in rows)
+        playlist_data = self.spotify.build_playlist_data(playlist_info, tracks)
+
+        if scored_count > 0:
+            mood_averages = {
+                mood: mood_sums.get(mood, 0.0) / scored_count
+                for mood in self.mood_analyzer.mood_categories
+            }
+            rule_based = self.mood_analyzer.mood_summary(playlist_info, mood_averages, scored_count)
+        else:
+            rule_based = {'error': 'No tracks with audio features found'}
+
+        analysis = self.mood_analyzer.combine_analysis(
+            playlist_data, rule_based, ai_suggestions=suggest(playlist_data) if suggest else None
+        )
+
+        self._count('incremental')
+        self.save_state(playlist_id, playlist_data, analysis, mood_sums, scored_count)
+        return analysis
+
+    def save_state(self, playlist_id, playlist_data, analysis, mood_sums, scored_count):
+        """Remember what was analyzed so the next run only handles the differences"""
+        self.states.set(playlist_id, {
+            'snapshot_id': playlist_data['playlist_info'].get('snapshot_id'),
+            'track_table': TrackTable.of(playlist_data['tracks']).to_state(),
+            'mood_sums': mood_sums,
+            'scored_count': scored_count,
+            'analysis': copy.deepcopy(analysis)
+        })
+
+    def stats(self):
+        """How analyses were served, plus the state cache counters"""
+        with self._lock:
+            counts = dict(self.counts)
+        return {**counts, 'state_cache': self.states.stats()}
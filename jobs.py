@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+import uuid
+from config import Config
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another job"""
+    pass
+
+
+class Job:
+    """A unit of background work and its outcome"""
+
+    def __init__(self, kind, func, args):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        """Serializable status, including the result once finished"""
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if self.status == 'completed':
+            data['result'] = self.result
+        elif self.status == 'failed':
+            data['error'] = self.error
+        return data
+
+
+class JobQueue:
+    """Bounded in-process work queue served by a fixed pool of worker threads"""
+
+    def __init__(self, workers=None, max_queued=None, result_ttl=None):
+        self.workers = max(1, int(workers or Config.JOB_WORKERS))
+        self.result_ttl = result_ttl if result_ttl is not None else Config.JOB_RESULT_TTL
+        self._queue = queue.Queue(maxsize=max_queued if max_queued is not None else Config.JOB_QUEUE_SIZE)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _start_workers(self):
+        """Start worker threads on first use so importing the app stays cheap"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                job.result = job.func(*job.args)
+                job.status = 'completed'
+            except Exception as e:
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def _purge_expired(self):
+        """Forget finished jobs whose results have been kept for result_ttl seconds"""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def submit(self, kind, func, *args):
+        """Queue func(*args) and return the Job, or raise QueueFullError"""
+        self._start_workers()
+        self._purge_expired()
+
+        job = Job(kind, func, args)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFullError("Job queue is full, try again later")
+        return job
+
+    def get(self, job_id):
+        """Look up a job by id, or None if unknown or expired"""
+        self._purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        """Queue depth and job counts by status"""
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            'workers': self.workers,
+            'queued': self._queue.qsize(),
+            'capacity': self._queue.maxsize,
+            'jobs': counts
+        }
@@ -0,0 +1,176 @@
+import functools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds (seconds) for latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Quantiles reported from the most recent samples of each series
+QUANTILES = (0.5, 0.95, 0.99)
+QUANTILE_WINDOW = 1024
+
+METRIC_PREFIX = 'mood_analyzer_'
+
+METRIC_HELP = {
+    'stage_duration_seconds': 'Time spent in each analysis stage',
+    'http_request_duration_seconds': 'Time to produce an API response',
+    'http_requests_total': 'API requests by endpoint and status',
+    'ai_requests_total': 'AI suggestion requests by provider and outcome',
+    'ai_hedges_total': 'Backup AI provider calls started by hedging',
+    'ai_tokens_total': 'Prompt and completion tokens reported by AI providers',
+    'spotify_requests_total': 'Spotify API calls by endpoint',
+    'spotify_throttled_total': 'Spotify API calls rejected with 429 by endpoint',
+    'http_pool_requests_total': 'Requests sent through a shared httpx connection pool',
+    'playlist_analyses_total': 'Incremental playlist analyses by mode (full, incremental, unchanged)'
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram plus a window of recent samples for quantiles"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=QUANTILE_WINDOW)
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q):
+        """Nearest-rank quantile over the recent sample window"""
+        if not self.recent:
+            return float('nan')
+        samples = sorted(self.recent)
+        return samples[max(0, math.ceil(q * len(samples)) - 1)]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Process-wide counters and latency histograms rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # name -> {labels: value}
+        self._histograms = {}  # name -> {labels: Histogram}
+
+    def inc(self, name, amount=1, **labels):
+        """Increment a counter"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record one sample in a histogram"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name='stage_duration_seconds', **labels):
+        """Time the enclosed block into a histogram, even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def time_stage(self, stage, **labels):
+        """Shorthand for timing one analysis stage"""
+        return self.timer('stage_duration_seconds', stage=stage, **labels)
+
+    def timed(self, stage, **labels):
+        """Decorator that times every call of a function as an analysis stage"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time_stage(stage, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Counters and latency quantiles as plain data (useful for tests and JSON)"""
+        with self._lock:
+            return {
+                'counters': {
+                    name: {_format_labels(key): value for key, value in series.items()}
+                    for name, series in self._counters.items()
+                },
+                'histograms': {
+                    name: {
+                        _format_labels(key): {
+                            'count': h.count,
+                            'sum': h.sum,
+                            **{f'p{int(q * 100)}': h.quantile(q) for q in QUANTILES}
+                        }
+                        for key, h in series.items()
+                    }
+                    for name, series in self._histograms.items()
+                }
+            }
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full_name = METRIC_PREFIX + name
+                lines.append(f"# HELP {full_name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full_name}{_format_labels(key)} {_format_value(value)}")
+
+            for name, series in sorted(self._histograms.items()):
+                full_name = METRIC_PREFIX + name
+                lines.append(f"# HELP {full_name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for key, h in sorted(series.items()):
+                    for bound, count in zip(h.buckets, h.counts):
+                        lines.append(f"{full_name}_bucket{_format_labels(key + (('le', repr(bound)),))} {count}")
+                    lines.append(f"{full_name}_bucket{_format_labels(key + (('le', '+Inf'),))} {h.count}")
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(h.sum)}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {h.count}")
+
+                # Recent-window percentiles for quick capacity checks without PromQL
+                quantile_name = f"{full_name}_quantile"
+                lines.append(f"# HELP {quantile_name} p50/p95/p99 of the last {QUANTILE_WINDOW} samples")
+                lines.append(f"# TYPE {quantile_name} gauge")
+                for key, h in sorted(series.items()):
+                    for q in QUANTILES:
+                        lines.append(f"{quantile_name}{_format_labels(key + (('quantile', str(q)),))} {_format_value(h.quantile(q))}")
+
+        return '\n'.join(lines) + '\n'
+
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
@@ -1,42 +1,89 @@
 from typing import Dict, List, Tuple
 from config import Config
-from openai import OpenAI
-import google.generativeai as genai
-import os
-import json
+import asyncio
+import copy
+import hashlib
+from ai_providers import PROVIDERS, demo_suggestions, is_provider_error, parse_json_reply, provider_loop
+from cache import LRUCache
+from circuit_breaker import CircuitBreaker
+from metrics import metrics
+from track_table import TrackTable
+from mood_engine import VectorizedMoodScorer, compile_mood_rules, numpy_available
+import prompt_builder
+
+# Upper bound on the completion tokens requested for one batched call
+MAX_BATCH_COMPLETION_TOKENS = 4096
+
+def provider_attribute(provider: str, attribute: str):
+    """Property forwarding to an attribute of one of the analyzer's providers"""
+    return property(
+        lambda self: getattr(self.providers[provider], attribute),
+        lambda self, value: setattr(self.providers[provider], attribute, value)
+    )
 
 class MoodAnalyzer:
+    # Shortcuts to the built-in providers' availability and SDK clients
+    openai_available = provider_attribute('openai', 'available')
+    openai_client = provider_attribute('openai', 'client')
+    gemini_available = provider_attribute('gemini', 'available')
+    gemini_model = provider_attribute('gemini', 'model')
+    
     def __init__(self):
-        self.mood_categories = Config.MOOD_CATEGORIES
         self.ai_provider = Config.AI_PROVIDER.lower()
         
-        # Initialize OpenAI client
-        try:
-            self.openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
-            self.openai_available = bool(Config.OPENAI_API_KEY and Config.OPENAI_API_KEY != 'your_openai_api_key')
-        except Exception as e:
-            print(f"OpenAI initialization failed: {e}")
-            self.openai_client = None
-            self.openai_available = False
+        # Rule-based scoring engine (python or numpy)
+        self.scoring_engine = Config.SCORING_ENGINE.lower()
+        if self.scoring_engine == 'numpy' and not numpy_available():
+            print("NumPy not installed, falling back to the Python scoring engine")
+            self.scoring_engine = 'python'
         
-        # Initialize Gemini client
-        try:
-            if Config.GEMINI_API_KEY and Config.GEMINI_API_KEY != 'your_gemini_api_key_here':
-                genai.configure(api_key=Config.GEMINI_API_KEY)
-                # Use the current Gemini model name
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-                self.gemini_available = True
-            else:
-                self.gemini_model = None
-                self.gemini_available = False
-        except Exception as e:
-            print(f"Gemini initialization failed: {e}")
-            self.gemini_model = None
-            self.gemini_available = False
+        # Provider hedging: off, hedge (start the backup after hedge_delay) or race (start all at once)
+        self.hedge_mode = Config.AI_HEDGE_MODE.lower()
+        self.hedge_delay = Config.AI_HEDGE_DELAY
+        
+        # One instance of every registered provider (see ai_providers); SDKs are imported on first use
+        self.providers = {name: provider_class() for name, provider_class in PROVIDERS.items()}
+        
+        # Circuit breakers let a provider that keeps failing be skipped without a network round trip
+        self.breakers = {
+            name: CircuitBreaker(
+                name,
+                window=Config.AI_BREAKER_WINDOW,
+                min_calls=Config.AI_BREAKER_MIN_CALLS,
+                error_rate=Config.AI_BREAKER_ERROR_RATE,
+                cooldown=Config.AI_BREAKER_COOLDOWN
+            )
+            for name, provider in self.providers.items() if not provider.fallback
+        }
+        
+        # Setting mood_categories compiles the rule table used for scoring
+        self.mood_categories = Config.MOOD_CATEGORIES
+        
+        # Cache AI responses so repeat analyses of the same playlist skip the LLM call
+        self.suggestion_cache = LRUCache(
+            maxsize=Config.AI_CACHE_SIZE,
+            ttl=Config.AI_CACHE_TTL,
+            db_path=Config.AI_CACHE_DB or None,
+            table='ai_suggestions'
+        )
+    
+    @property
+    def mood_categories(self) -> Dict:
+        return self._mood_categories
+    
+    @mood_categories.setter
+    def mood_categories(self, mood_categories: Dict):
+        self._mood_categories = mood_categories
+        self.compile_mood_rules()
+    
+    def compile_mood_rules(self):
+        """Rebuild the compiled rule table; call after editing mood_categories in place"""
+        self.mood_rules = compile_mood_rules(self._mood_categories)
+        self.vectorized_scorer = VectorizedMoodScorer(self._mood_categories) if self.scoring_engine == 'numpy' else None
     
     def calculate_feature_score(self, feature_value: float, feature_range: tuple) -> float:
         """Calculate how well a feature value fits within a range (0-1)"""
-        if len(feature_range) == 2:
+        if isinstance(feature_range, (tuple, list)) and len(feature_range) == 2:
             min_val, max_val = feature_range
             if min_val <= feature_value <= max_val:
                 return 1.0
@@ -50,248 +97,440 @@ class MoodAnalyzer:
         """Analyze a single track's mood based on audio features"""
         mood_scores = {}
         
-        for mood, config in self.mood_categories.items():
+        # Inlined version of calculate_feature_score over the compiled rule table
+        for mood, rules in self.mood_rules:
             score = 0.0
             feature_count = 0
             
-            for feature_name, feature_range in config['audio_features'].items():
-                if feature_name in audio_features:
-                    feature_value = audio_features[feature_name]
-                    feature_score = self.calculate_feature_score(feature_value, feature_range)
-                    score += feature_score
+            for rule in rules:
+                if rule.feature in audio_features:
+                    feature_value = audio_features[rule.feature]
+                    if rule.exact:
+                        score += 1.0 if feature_value == rule.lo else 0.0
+                    elif rule.lo <= feature_value <= rule.hi:
+                        score += 1.0
+                    else:
+                        score += max(0.0, 1.0 - min(abs(feature_value - rule.lo), abs(feature_value - rule.hi)))
                     feature_count += 1
             
-            if feature_count > 0:
-                mood_scores[mood] = score / feature_count
-            else:
-                mood_scores[mood] = 0.0
+            mood_scores[mood] = score / feature_count if feature_count > 0 else 0.0
         
         return mood_scores
     
-    def analyze_playlist_mood(self, playlist_data: Dict) -> Dict:
-        """Analyze overall playlist mood"""
-        tracks = playlist_data['tracks']
-        track_moods = []
+    def score_rows(self, table: TrackTable, indices: List[int], mood_columns: List):
+        """Python engine: score the listed rows into mood_columns, reading straight from the feature columns"""
+        rule_columns = [
+            [(table.features.get(rule.feature), rule) for rule in rules]
+            for _, rules in self.mood_rules
+        ]
+        for index in indices:
+            # Same arithmetic as analyze_track_mood; NaN marks a missing feature
+            for rules, mood_column in zip(rule_columns, mood_columns):
+                score = 0.0
+                feature_count = 0
+                
+                for column, rule in rules:
+                    if column is None:
+                        continue
+                    feature_value = column[index]
+                    if feature_value != feature_value:
+                        continue
+                    if rule.exact:
+                        score += 1.0 if feature_value == rule.lo else 0.0
+                    elif rule.lo <= feature_value <= rule.hi:
+                        score += 1.0
+                    else:
+                        score += max(0.0, 1.0 - min(abs(feature_value - rule.lo), abs(feature_value - rule.hi)))
+                    feature_count += 1
+                
+                mood_column[index] = score / feature_count if feature_count > 0 else 0.0
+    
+    def score_tracks(self, tracks) -> Tuple[int, Dict[str, float]]:
+        """Score the tracks that have audio features and average them; returns (tracks scored, mood averages).
         
-        for track in tracks:
-            if track.get('audio_features'):
-                track_mood = self.analyze_track_mood(track['audio_features'])
-                track_moods.append(track_mood)
-                track['mood_scores'] = track_mood
+        Scores go into a TrackTable's mood columns, or into each track dict's mood_scores.
+        """
+        table = TrackTable.of(tracks)
+        indices = table.feature_indices()
+        moods = [mood for mood, _ in self.mood_rules]
         
-        if not track_moods:
-            return {'error': 'No tracks with audio features found'}
+        if not indices:
+            return 0, {mood: 0.0 for mood in moods}
         
-        # Calculate average mood scores across all tracks
-        mood_averages = {}
-        for mood in self.mood_categories.keys():
-            scores = [track_mood.get(mood, 0) for track_mood in track_moods]
-            mood_averages[mood] = sum(scores) / len(scores) if scores else 0.0
+        mood_columns = table.mood_columns(moods)
+        if self.scoring_engine == 'numpy':
+            mood_averages = self.vectorized_scorer.score_columns(table.features, indices, mood_columns)
+        else:
+            self.score_rows(table, indices, mood_columns)
+            
+            # Calculate average mood scores across all tracks
+            mood_averages = {}
+            for mood, column in zip(moods, mood_columns):
+                mood_averages[mood] = sum(column[index] for index in indices) / len(indices)
         
+        if table is not tracks:
+            for index in indices:
+                tracks[index]['mood_scores'] = table.row_mood_scores(index)
+        
+        return len(indices), mood_averages
+    
+    def mood_summary(self, playlist_info: Dict, mood_averages: Dict[str, float], total_tracks_analyzed: int) -> Dict:
+        """Rule-based analysis result for a playlist's average mood scores"""
         top_moods = sorted(mood_averages.items(), key=lambda x: x[1], reverse=True)[:3]
         
         return {
-            'playlist_info': playlist_data['playlist_info'],
+            'playlist_info': playlist_info,
             'mood_averages': mood_averages,
             'top_moods': top_moods,
-            'total_tracks_analyzed': len(track_moods)
+            'total_tracks_analyzed': total_tracks_analyzed
         }
     
-    def get_ai_mood_suggestions(self, playlist_data: Dict) -> Dict:
-        """Use AI to suggest moods based on playlist info"""
+    @metrics.timed('rule_scoring')
+    def analyze_playlist_mood(self, playlist_data: Dict) -> Dict:
+        """Analyze overall playlist mood"""
+        scored_count, mood_averages = self.score_tracks(playlist_data['tracks'])
+        
+        if not scored_count:
+            return {'error': 'No tracks with audio features found'}
+        
+        return self.mood_summary(playlist_data['playlist_info'], mood_averages, scored_count)
+    
+    def build_mood_prompt(self, playlist_data: Dict) -> str:
+        """Build the compact mood suggestion prompt shared by all AI providers"""
+        return prompt_builder.build_mood_prompt(
+            playlist_data,
+            list(self.mood_categories.keys()),
+            token_budget=Config.AI_PROMPT_TOKEN_BUDGET,
+            max_samples=Config.AI_PROMPT_SAMPLE_TRACKS
+        )
+    
+    def get_ai_mood_suggestions(self, playlist_data: Dict, prompt: str = None) -> Dict:
+        """Use OpenAI to suggest moods based on playlist info"""
+        return self.suggest_with('openai', playlist_data, prompt)
+    
+    def get_gemini_mood_suggestions(self, playlist_data: Dict, prompt: str = None) -> Dict:
+        """Get AI mood suggestions using Google Gemini"""
+        return self.suggest_with('gemini', playlist_data, prompt)
+    
+    def suggest_with(self, provider: str, playlist_data: Dict, prompt: str = None) -> Dict:
+        """One provider's suggestions, without caching, circuit breaking or fallback"""
+        if prompt is None:
+            prompt = self.build_mood_prompt(playlist_data)
+        return provider_loop.run(self.providers[provider].suggest(playlist_data, prompt))
+    
+    def parse_json_reply(self, content: str):
+        """Parse a model's JSON reply, removing markdown code blocks if present"""
+        return parse_json_reply(content)
+    
+    def complete(self, provider: str, prompt: str, max_tokens: int) -> str:
+        """Send a prompt to one provider and return the text of its reply"""
+        return provider_loop.run(self.providers[provider].acomplete(prompt, max_tokens))
+    
+    def suggestion_cache_key(self, provider: str, prompt: str) -> str:
+        """Stable fingerprint of a prompt for a given provider and model"""
+        model = self.providers[provider].model_name
+        return hashlib.sha256(f"{provider}\n{model}\n{prompt}".encode('utf-8')).hexdigest()
+    
+    def is_valid_suggestion(self, result: Dict) -> bool:
+        """A usable AI answer rather than an error placeholder"""
+        return bool(result.get('suggestions')) and not result.get('error')
+    
+    async def call_provider(self, provider: str, playlist_data: Dict, prompt: str) -> Dict:
+        """Call one AI provider, recording latency and caching successful answers"""
+        print(f"🤖 Trying {provider.upper()} for mood analysis...")
         try:
-            playlist_info = playlist_data['playlist_info']
-            
-            context = f"""
-            Playlist: {playlist_info['name']}
-            Description: {playlist_info.get('description', 'No description')}
-            Total Tracks: {playlist_data['total_tracks']}
-            
-            Sample tracks:
-            """
-            
-            # Show more tracks if no audio features available
-            sample_count = 10 if not any(track.get('audio_features') for track in playlist_data['tracks'][:10]) else 5
-            
-            for i, track in enumerate(playlist_data['tracks'][:sample_count]):
-                context += f"\n{i+1}. {track['name']} by {', '.join(track['artists'])}"
-                if track.get('audio_features'):
-                    af = track['audio_features']
-                    context += f" (Energy: {af.get('energy', 0):.2f}, Valence: {af.get('valence', 0):.2f})"
+            with metrics.time_stage('llm_call', provider=provider):
+                result = await self.providers[provider].suggest(playlist_data, prompt)
+        except Exception:
+            self.breakers[provider].record_failure()
+            metrics.inc('ai_requests_total', provider=provider, outcome='error')
+            raise
+        
+        # Only cache real answers, not error placeholders
+        if self.is_valid_suggestion(result):
+            self.breakers[provider].record_success()
+            # The cache may write to SQLite, which must not stall other calls on the provider loop
+            await asyncio.to_thread(self.suggestion_cache.set, self.suggestion_cache_key(provider, prompt), copy.deepcopy(result))
+            metrics.inc('ai_requests_total', provider=provider, outcome='success')
+        else:
+            self.breakers[provider].record_failure()
+            metrics.inc('ai_requests_total', provider=provider, outcome='error')
+        return result
+    
+    async def get_hedged_suggestions(self, providers: List[str], playlist_data: Dict, prompt: str):
+        """Start the next provider if the current one is slow or fails, and keep the first valid answer"""
+        # Race mode starts every provider at once; hedge mode waits hedge_delay before each backup
+        delay = 0.0 if self.hedge_mode == 'race' else self.hedge_delay
+        waiting = list(providers)
+        running = {}
+        first_result = None
+        
+        def launch_next():
+            provider = waiting.pop(0)
+            if running:
+                print(f"⏱️ Hedging with {provider.upper()}...")
+                metrics.inc('ai_hedges_total', provider=provider)
+            running[asyncio.ensure_future(self.call_provider(provider, playlist_data, prompt))] = provider
+        
+        try:
+            launch_next()
+            while running or waiting:
+                if waiting and (delay <= 0 or not running):
+                    launch_next()
+                    continue
                 
-            # Add note about missing audio features if applicable
-            if not any(track.get('audio_features') for track in playlist_data['tracks'][:5]):
-                context += f"\n\nNote: Audio features not available, analyzing based on track names, artists, and playlist context."
-            
-            mood_list = list(self.mood_categories.keys())
-            context += f"\n\nAvailable moods: {', '.join(mood_list)}"
-            
-            prompt = f"""
-            Based on this playlist, suggest the top 3 most appropriate moods from the available options and explain why.
-            
-            {context}
-            
-            Available moods: {', '.join(mood_list)}
-            
-            Rules:
-            - Only suggest moods from the available list
-            - Provide confidence between 0.0 and 1.0
-            - Give clear reasoning for each suggestion
-            
-            Respond in JSON format:
-            {{
-                "suggestions": [
-                    {{
-                        "mood": "mood_name",
-                        "confidence": 0.85,
-                        "reasoning": "explanation"
-                    }}
-                ],
-                "overall_assessment": "brief description"
-            }}
-            """
-            
-            print(f"🤖 Sending request to OpenAI...")
-            print(f"📝 Prompt length: {len(prompt)} characters")
-            print(f"🔑 API Key present: {'sk-' in os.getenv('OPENAI_API_KEY', '')}")
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=500
-            )
-            
-            import json
-            content = response.choices[0].message.content
-            print(f"✅ OpenAI response received: {len(content)} characters")
-            print(f"📄 Raw response: {content[:200]}...")
-            
-            if not content:
-                raise ValueError("No content in OpenAI response")
-            
-            result = json.loads(content)
-            print(f"📊 AI suggested {len(result.get('suggestions', []))} moods")
-            return result
-            
-        except Exception as e:
-            error_str = str(e).lower()
-            print(f"❌ OpenAI Error: {type(e).__name__}: {str(e)}")
-            
-            # Re-raise API-related errors so fallback can handle them
-            if any(keyword in error_str for keyword in ['quota', 'rate limit', 'authentication', 'invalid_api_key', 'invalid api key']):
-                raise e
-            
-            # For other errors, return error response
-            import traceback
-            print(f"🔍 Full traceback: {traceback.format_exc()}")
-            return {
-                "suggestions": [],
-                "overall_assessment": "Unable to generate AI suggestions",
-                "error": str(e)
-            }
+                done, _ = await asyncio.wait(running, timeout=delay if waiting else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Still waiting on a slow provider, so bring in the next one
+                    launch_next()
+                    continue
+                
+                for task in done:
+                    provider = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        print(f"❌ {provider.upper()} failed: {str(e)[:100]}...")
+                        continue
+                    
+                    if self.is_valid_suggestion(result):
+                        print(f"🏁 {provider.upper()} answered first")
+                        return result
+                    if first_result is None:
+                        first_result = result
+            
+            return first_result
+        finally:
+            # Calls that lost the race are cancelled and their results discarded
+            for task in running:
+                task.cancel()
     
+    def configured_providers(self) -> List[str]:
+        """AI providers to use, in order of preference.
+        
+        AI_PROVIDER is 'auto' (every configured provider in registration order),
+        one provider name, or a comma-separated preference list.
+        """
+        if self.ai_provider == 'auto':
+            names = list(self.providers)
+        else:
+            names = [name.strip() for name in self.ai_provider.split(',')]
+        
+        return [name for name in names
+                if name in self.providers and not self.providers[name].fallback and self.providers[name].available]
+    
+    def load_providers(self) -> List[str]:
+        """Import and build the configured providers' clients now instead of on first use"""
+        return [name for name in self.configured_providers() if self.providers[name].load()]
+    
+    def cached_suggestions(self, providers: List[str], prompt: str):
+        """A cached answer to this prompt from any of the providers, or None"""
+        for provider in providers:
+            cached = self.suggestion_cache.get(self.suggestion_cache_key(provider, prompt))
+            if cached is not None:
+                print(f"⚡ Using cached {provider.upper()} mood suggestions")
+                metrics.inc('ai_requests_total', provider=provider, outcome='cache_hit')
+                return copy.deepcopy(cached)
+        return None
+    
+    def prepare_suggestion(self, playlist_data: Dict) -> Tuple[List[str], str, Dict]:
+        """Providers to try, the prompt, and any cached answer to it.
+        
+        This is the CPU and SQLite part of a suggestion, so it runs on the
+        caller's thread rather than on the shared provider loop.
+        """
+        providers = self.configured_providers()
+        prompt = self.build_mood_prompt(playlist_data) if providers else None
+        cached = self.cached_suggestions(providers, prompt) if prompt else None
+        return providers, prompt, cached
+    
+    @metrics.timed('ai_suggestions')
     def get_ai_mood_suggestions_with_fallback(self, playlist_data: Dict) -> Dict:
         """Get AI mood suggestions with intelligent provider selection and fallback"""
+        prepared = self.prepare_suggestion(playlist_data)
+        cached = prepared[2]
+        if cached is not None:
+            return cached
+        return provider_loop.run(self.suggest(playlist_data, prepared))
+    
+    async def suggest(self, playlist_data: Dict, prepared: Tuple = None) -> Dict:
+        """Mood suggestions from the first provider that answers, falling back to the demo provider.
+        
+        prepared is prepare_suggestion's result; without it the prompt is built
+        in a worker thread so the provider loop stays free for other calls.
+        """
+        if prepared is None:
+            prepared = await asyncio.to_thread(self.prepare_suggestion, playlist_data)
+        providers_to_try, prompt, cached = prepared
+        if cached is not None:
+            return cached
         
-        # Determine which AI provider to use
-        providers_to_try = []
+        # Skip providers whose circuit breaker is open
+        available = []
+        for provider in providers_to_try:
+            if self.breakers[provider].allow_request():
+                available.append(provider)
+            else:
+                print(f"⛔ {provider.upper()} circuit open, skipping")
+                metrics.inc('ai_requests_total', provider=provider, outcome='circuit_open')
+        providers_to_try = available
         
-        if self.ai_provider == 'openai' and self.openai_available:
-            providers_to_try = ['openai']
-        elif self.ai_provider == 'gemini' and self.gemini_available:
-            providers_to_try = ['gemini']
-        elif self.ai_provider == 'auto':
-            # Try OpenAI first, then Gemini
-            if self.openai_available:
-                providers_to_try.append('openai')
-            if self.gemini_available:
-                providers_to_try.append('gemini')
+        if self.hedge_mode in ('hedge', 'race') and len(providers_to_try) > 1:
+            result = await self.get_hedged_suggestions(providers_to_try, playlist_data, prompt)
+            if result is not None:
+                return result
+            providers_to_try = []
         
         # Try each provider in order
         for provider in providers_to_try:
             try:
-                print(f"🤖 Trying {provider.upper()} for mood analysis...")
-                if provider == 'openai':
-                    return self.get_ai_mood_suggestions(playlist_data)
-                elif provider == 'gemini':
-                    return self.get_gemini_mood_suggestions(playlist_data)
+                return await self.call_provider(provider, playlist_data, prompt)
             except Exception as e:
-                error_str = str(e).lower()
                 print(f"❌ {provider.upper()} failed: {str(e)[:100]}...")
                 
                 # If this was an API issue, try the next provider
-                if any(keyword in error_str for keyword in ['quota', 'rate limit', 'authentication', 'invalid_api_key', 'invalid api key', 'api_key']):
+                if is_provider_error(e):
                     continue
                 else:
                     # For other errors, stop trying
                     break
         
-        # If all AI providers failed, use demo fallback
-        print("🎭 All AI providers failed, using demo fallback...")
-        return self.get_demo_ai_suggestions(playlist_data)
+        # If all AI providers failed, use a fallback provider (the keyword-based demo)
+        for name, provider in self.providers.items():
+            if provider.fallback and provider.available:
+                print(f"🎭 All AI providers failed, using {name} fallback...")
+                metrics.inc('ai_requests_total', provider=name, outcome='fallback')
+                with metrics.time_stage('llm_call', provider=name):
+                    return await provider.suggest(playlist_data, prompt)
+        
+        return {"suggestions": [], "overall_assessment": "No AI provider available", "error": "No AI provider available"}
     
-    def get_demo_ai_suggestions(self, playlist_data: Dict) -> Dict:
-        """Generate demo AI suggestions based on track analysis"""
-        tracks = playlist_data.get('tracks', [])
-        playlist_name = playlist_data.get('playlist_info', {}).get('name', '').lower()
+    def parse_batch_reply(self, content: str, count: int) -> Dict[int, Dict]:
+        """Valid per-playlist answers from a batch reply, keyed by position in the batch"""
+        reply = self.parse_json_reply(content)
+        entries = reply.get('playlists') if isinstance(reply, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError("Batch reply has no playlists list")
         
-        # Analyze track names and artists for mood hints
-        all_text = ' '.join([
-            playlist_name,
-            ' '.join([track.get('name', '') for track in tracks[:10]]),
-            ' '.join([' '.join(track.get('artists', [])) for track in tracks[:10]])
-        ]).lower()
+        results = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(entry.get('id')) - 1
+            except (TypeError, ValueError):
+                continue
+            suggestions = entry.get('suggestions')
+            if 0 <= index < count and isinstance(suggestions, list) and suggestions \
+                    and all(isinstance(s, dict) and s.get('mood') for s in suggestions):
+                results[index] = {
+                    'suggestions': suggestions,
+                    'overall_assessment': entry.get('overall_assessment', '')
+                }
+        return results
+    
+    async def fill_batch(self, provider: str, playlists: List[Dict], indices: List[int], prompts: Dict[int, str], results: List) -> bool:
+        """Ask one provider about several playlists at once, splitting and retrying what comes back malformed.
         
-        # Simple keyword-based mood detection
-        mood_scores = {}
-        for mood, keywords in {
-            'energetic': ['pump', 'energy', 'power', 'rock', 'metal', 'dance', 'electronic'],
-            'relaxed': ['chill', 'relax', 'calm', 'peaceful', 'soft', 'acoustic'],
-            'happy': ['happy', 'joy', 'fun', 'party', 'celebration', 'upbeat'],
-            'melancholic': ['sad', 'blue', 'melancholy', 'sorrow', 'lonely'],
-            'ambient': ['ambient', 'atmospheric', 'drone', 'soundscape', 'space'],
-            'romantic': ['love', 'romantic', 'tender', 'sweet', 'intimate'],
-            'meditative': ['meditation', 'zen', 'spiritual', 'therapy', 'healing'],
-            'aggressive': ['aggressive', 'heavy', 'intense', 'brutal', 'hardcore'],
-            'nostalgic': ['retro', 'vintage', 'classic', 'old', 'memories'],
-            'focus': ['study', 'focus', 'concentration', 'work', 'productivity'],
-            'party': ['party', 'club', 'dance', 'festival', 'celebration'],
-            'downtempo': ['downtempo', 'slow', 'laid-back', 'lounge']
-        }.items():
-            score = sum(1 for keyword in keywords if keyword in all_text)
-            if score > 0:
-                mood_scores[mood] = score
-        
-        # Generate suggestions based on scores
-        sorted_moods = sorted(mood_scores.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        suggestions = []
-        for i, (mood, score) in enumerate(sorted_moods):
-            confidence = min(0.95, 0.6 + (score * 0.1))
-            suggestions.append({
-                'mood': mood,
-                'confidence': confidence,
-                'reasoning': f"Analysis of track names and playlist context suggests {mood} characteristics."
-            })
+        Returns False if the provider failed outright and should not get further batches.
+        """
+        if len(indices) < 2:
+            return True  # single playlists go through the regular per-playlist path
         
-        # Fallback if no matches
-        if not suggestions:
-            suggestions = [{
-                'mood': 'ambient',
-                'confidence': 0.7,
-                'reasoning': "Default mood suggestion based on general music analysis patterns."
-            }]
+        prompt = await asyncio.to_thread(
+            prompt_builder.build_batch_mood_prompt,
+            [playlists[i] for i in indices],
+            list(self.mood_categories.keys()),
+            playlist_token_budget=Config.AI_BATCH_PLAYLIST_TOKENS,
+            max_samples=Config.AI_BATCH_SAMPLE_TRACKS
+        )
+        max_tokens = min(Config.AI_MAX_TOKENS * len(indices), MAX_BATCH_COMPLETION_TOKENS)
         
-        return {
-            'suggestions': suggestions,
-            'overall_assessment': f"Demo analysis of playlist based on track names and context. {len(tracks)} tracks analyzed."
-        }
+        print(f"🤖 Asking {provider.upper()} about {len(indices)} playlists in one request...")
+        try:
+            with metrics.time_stage('llm_batch_call', provider=provider):
+                content = await self.providers[provider].acomplete(prompt, max_tokens)
+            parsed = self.parse_batch_reply(content, len(indices))
+        except ValueError as e:  # includes JSONDecodeError
+            print(f"⚠️ Malformed batch reply from {provider.upper()}: {str(e)[:100]}")
+            parsed = {}
+        except Exception as e:
+            # API errors: leave these playlists to the per-playlist fallback path
+            print(f"❌ {provider.upper()} batch request failed: {str(e)[:100]}...")
+            self.breakers[provider].record_failure()
+            metrics.inc('ai_requests_total', provider=provider, outcome='error')
+            return False
+        
+        if parsed:
+            self.breakers[provider].record_success()
+            metrics.inc('ai_requests_total', provider=provider, outcome='batch_success')
+        else:
+            self.breakers[provider].record_failure()
+            metrics.inc('ai_requests_total', provider=provider, outcome='batch_malformed')
+        
+        missing = []
+        for position, index in enumerate(indices):
+            result = parsed.get(position)
+            if result is None:
+                missing.append(index)
+                continue
+            # Cache under the single-playlist prompt so later per-playlist requests hit it
+            await asyncio.to_thread(self.suggestion_cache.set, self.suggestion_cache_key(provider, prompts[index]),
+                                    copy.deepcopy(result))
+            results[index] = result
+        
+        if missing:
+            print(f"🔁 Retrying {len(missing)} playlists missing from the batch reply in smaller batches")
+            half = (len(missing) + 1) // 2
+            return (await self.fill_batch(provider, playlists, missing[:half], prompts, results)
+                    and await self.fill_batch(provider, playlists, missing[half:], prompts, results))
+        return True
+    
+    @metrics.timed('ai_batch_suggestions')
+    def get_batched_ai_suggestions(self, playlists: List[Dict], batch_size: int = None) -> List[Dict]:
+        """AI mood suggestions for many playlists, packing up to batch_size of them into each model call.
+        
+        Cached answers are reused, and any playlist the batches could not answer
+        falls back to the regular per-playlist path on its own.
+        """
+        prepared = [self.prepare_suggestion(playlist_data) for playlist_data in playlists]
+        return provider_loop.run(self.suggest_batch(playlists, batch_size, prepared))
     
-    def combine_analysis(self, playlist_data: Dict) -> Dict:
-        """Combine rule-based and AI analysis"""
-        rule_based = self.analyze_playlist_mood(playlist_data)
-        ai_suggestions = self.get_ai_mood_suggestions_with_fallback(playlist_data)
+    async def suggest_batch(self, playlists: List[Dict], batch_size: int = None, prepared: List[Tuple] = None) -> List[Dict]:
+        """Batched suggestions on the provider loop; prepared holds prepare_suggestion's result per playlist"""
+        batch_size = batch_size or Config.AI_BATCH_SIZE
+        if prepared is None:
+            prepared = await asyncio.to_thread(lambda: [self.prepare_suggestion(p) for p in playlists])
+        providers = self.configured_providers()
+        results = [cached for _, _, cached in prepared]
+        prompts = {index: prompt for index, (_, prompt, cached) in enumerate(prepared) if prompt and cached is None}
+        
+        pending = list(prompts)
+        provider = next((p for p in providers if self.breakers[p].allow_request()), None) if pending else None
+        if provider:
+            for start in range(0, len(pending), batch_size):
+                if not await self.fill_batch(provider, playlists, pending[start:start + batch_size], prompts, results):
+                    break
+        
+        # Whatever the batches left unanswered is requested per playlist, concurrently on the event loop
+        missing = [index for index, result in enumerate(results) if result is None]
+        answers = await asyncio.gather(*(self.suggest(playlists[index], prepared[index]) for index in missing))
+        for index, answer in zip(missing, answers):
+            results[index] = answer
+        return results
+    
+    def get_demo_ai_suggestions(self, playlist_data: Dict) -> Dict:
+        """Generate demo AI suggestions based on track analysis"""
+        return demo_suggestions(playlist_data)
+    
+    @metrics.timed('combine_analysis')
+    def combine_analysis(self, playlist_data: Dict, rule_based: Dict = None, ai_suggestions: Dict = None) -> Dict:
+        """Combine rule-based and AI analysis, reusing either part if it was already computed"""
+        if rule_based is None:
+            rule_based = self.analyze_playlist_mood(playlist_data)
+        if ai_suggestions is None:
+            ai_suggestions = self.get_ai_mood_suggestions_with_fallback(playlist_data)
         
         combined_result = {
             'playlist_info': playlist_data['playlist_info'],
@@ -354,100 +593,3 @@ class MoodAnalyzer:
             'audio_features': config['audio_features'],
             'description': f"Music characterized by {', '.join(config['keywords'][:3])} qualities"
         }
-    
-    def get_gemini_mood_suggestions(self, playlist_data: Dict) -> Dict:
-        """Get AI mood suggestions using Google Gemini"""
-        try:
-            if not self.gemini_available:
-                raise Exception("Gemini API not available")
-            
-            context = f"""
-            Playlist: {playlist_data['playlist_info']['name']}
-            Description: {playlist_data['playlist_info'].get('description', 'No description')}
-            Total Tracks: {playlist_data['total_tracks']}
-            
-            Sample tracks:
-            """
-            
-            # Show more tracks if no audio features available
-            sample_count = 10 if not any(track.get('audio_features') for track in playlist_data['tracks'][:10]) else 5
-            
-            for i, track in enumerate(playlist_data['tracks'][:sample_count]):
-                context += f"\n{i+1}. {track['name']} by {', '.join(track['artists'])}"
-                if track.get('audio_features'):
-                    af = track['audio_features']
-                    context += f" (Energy: {af.get('energy', 0):.2f}, Valence: {af.get('valence', 0):.2f})"
-                
-            # Add note about missing audio features if applicable
-            if not any(track.get('audio_features') for track in playlist_data['tracks'][:5]):
-                context += f"\n\nNote: Audio features not available, analyzing based on track names, artists, and playlist context."
-            
-            mood_list = list(self.mood_categories.keys())
-            context += f"\n\nAvailable moods: {', '.join(mood_list)}"
-            
-            prompt = f"""
-            Based on this playlist, suggest the top 3 most appropriate moods from the available options and explain why.
-            
-            {context}
-            
-            Available moods: {', '.join(mood_list)}
-            
-            Rules:
-            - Only suggest moods from the available list
-            - Provide confidence between 0.0 and 1.0
-            - Give clear reasoning for each suggestion
-            
-            Respond in JSON format:
-            {{
-                "suggestions": [
-                    {{
-                        "mood": "mood_name",
-                        "confidence": 0.85,
-                        "reasoning": "explanation"
-                    }}
-                ],
-                "overall_assessment": "brief description"
-            }}
-            """
-            
-            print(f"🤖 Sending request to Gemini...")
-            print(f"📝 Prompt length: {len(prompt)} characters")
-            print(f"🔑 API Key present: {bool(Config.GEMINI_API_KEY and Config.GEMINI_API_KEY != 'your_gemini_api_key_here')}")
-            
-            response = self.gemini_model.generate_content(prompt)
-            
-            content = response.text
-            print(f"✅ Gemini response received: {len(content)} characters")
-            print(f"📄 Raw response: {content[:200]}...")
-            
-            if not content:
-                raise ValueError("No content in Gemini response")
-            
-            # Clean up the response - remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.endswith('```'):
-                content = content[:-3]
-            content = content.strip()
-            
-            result = json.loads(content)
-            print(f"📊 Gemini suggested {len(result.get('suggestions', []))} moods")
-            return result
-            
-        except Exception as e:
-            error_str = str(e).lower()
-            print(f"❌ Gemini Error: {type(e).__name__}: {str(e)}")
-            
-            # Re-raise API-related errors so fallback can handle them
-            if any(keyword in error_str for keyword in ['quota', 'rate limit', 'authentication', 'invalid_api_key', 'invalid api key', 'api_key']):
-                raise e
-            
-            # For other errors, return error response
-            import traceback
-            print(f"🔍 Full traceback: {traceback.format_exc()}")
-            return {
-                "suggestions": [],
-                "overall_assessment": "Unable to generate Gemini suggestions",
-                "error": str(e)
-            }
\ No newline at end of file
@@ -0,0 +1,149 @@
+from importlib.util import find_spec
+from typing import Dict, List, Tuple
+
+
+def numpy_available() -> bool:
+    """Whether the vectorized scoring engine can be used (checked without importing numpy)"""
+    return find_spec('numpy') is not None
+
+
+def load_numpy():
+    """The numpy module, imported on first use so the default Python engine doesn't pay for it at startup"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is required for the vectorized scoring engine") from None
+    return numpy
+
+
+class MoodRule:
+    """A single compiled audio feature rule for a mood"""
+    __slots__ = ('feature', 'lo', 'hi', 'exact')
+
+    def __init__(self, feature: str, lo, hi, exact: bool):
+        self.feature = feature
+        self.lo = lo
+        self.hi = hi
+        self.exact = exact
+
+    def __repr__(self):
+        return f"MoodRule({self.feature!r}, {self.lo!r}, {self.hi!r}, exact={self.exact})"
+
+
+def compile_mood_rules(mood_categories: Dict) -> Tuple[Tuple[str, Tuple[MoodRule, ...]], ...]:
+    """Compile MOOD_CATEGORIES into (mood, rules) pairs, deciding range vs exact match once"""
+    compiled = []
+    for mood, config in mood_categories.items():
+        rules = []
+        for feature_name, feature_range in config['audio_features'].items():
+            if isinstance(feature_range, (tuple, list)) and len(feature_range) == 2:
+                rules.append(MoodRule(feature_name, feature_range[0], feature_range[1], False))
+            else:
+                # Exact-match rules such as melancholic's 'mode': 0
+                rules.append(MoodRule(feature_name, feature_range, feature_range, True))
+        compiled.append((mood, tuple(rules)))
+    return tuple(compiled)
+
+
+class VectorizedMoodScorer:
+    """Score many tracks against every mood category with NumPy array operations.
+
+    Produces the same values as MoodAnalyzer.analyze_track_mood: features are
+    accumulated in the order they appear in each mood's config, and playlist
+    averages are summed track by track, so results agree to within float
+    rounding (Python's sum() compensates for it since 3.12; cumsum doesn't).
+    """
+
+    def __init__(self, mood_categories: Dict):
+        np = load_numpy()
+
+        mood_rules = compile_mood_rules(mood_categories)
+        self.moods = [mood for mood, _ in mood_rules]
+        self.features = []
+        for _, rules in mood_rules:
+            for rule in rules:
+                if rule.feature not in self.features:
+                    self.features.append(rule.feature)
+
+        # Pack each mood's rules into moods x max_rules matrices
+        max_rules = max((len(rules) for _, rules in mood_rules), default=0)
+        shape = (len(self.moods), max_rules)
+        self.feature_index = np.zeros(shape, dtype=np.intp)
+        self.lo = np.zeros(shape)
+        self.hi = np.zeros(shape)
+        self.exact = np.zeros(shape, dtype=bool)
+        self.valid = np.zeros(shape, dtype=bool)
+
+        for m, (_, rules) in enumerate(mood_rules):
+            for k, rule in enumerate(rules):
+                self.feature_index[m, k] = self.features.index(rule.feature)
+                self.lo[m, k] = rule.lo
+                self.hi[m, k] = rule.hi
+                self.exact[m, k] = rule.exact
+                self.valid[m, k] = True
+
+    def feature_matrix(self, audio_features_list: List[Dict]) -> 'np.ndarray':
+        """Pack a list of audio feature dicts into a tracks x features array (NaN = missing)"""
+        np = load_numpy()
+        # None (missing) converts to NaN under a float dtype
+        rows = [[af.get(feature_name) for feature_name in self.features] for af in audio_features_list]
+        return np.array(rows, dtype=float).reshape(len(audio_features_list), len(self.features))
+
+    def column_matrix(self, columns: Dict, indices: List[int]) -> 'np.ndarray':
+        """Gather the given rows of a TrackTable's feature columns into a tracks x features array"""
+        np = load_numpy()
+        rows = np.asarray(indices, dtype=np.intp)
+        matrix = np.full((len(rows), len(self.features)), np.nan)
+        for j, feature_name in enumerate(self.features):
+            column = columns.get(feature_name)
+            if column is not None and len(rows):
+                matrix[:, j] = np.frombuffer(column, dtype=float)[rows]
+        return matrix
+
+    def score_matrix(self, matrix: 'np.ndarray') -> 'np.ndarray':
+        """Return a tracks x moods array of scores for a tracks x features array"""
+        np = load_numpy()
+        total = np.zeros((matrix.shape[0], len(self.moods)))
+        count = np.zeros((matrix.shape[0], len(self.moods)))
+
+        for k in range(self.lo.shape[1]):
+            values = matrix[:, self.feature_index[:, k]]  # tracks x moods
+            lo, hi = self.lo[:, k], self.hi[:, k]
+
+            in_range = (values >= lo) & (values <= hi)
+            distance = np.minimum(np.abs(values - lo), np.abs(values - hi))
+            range_score = np.where(in_range, 1.0, np.maximum(0.0, 1.0 - distance))
+            exact_score = (values == lo).astype(float)
+            score = np.where(self.exact[:, k], exact_score, range_score)
+
+            present = ~np.isnan(values) & self.valid[:, k]
+            total += np.where(present, score, 0.0)
+            count += present
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / count, 0.0)
+
+    def playlist_averages(self, scores: 'np.ndarray') -> Dict[str, float]:
+        """Average each mood's score across tracks"""
+        np = load_numpy()
+        if scores.shape[0] == 0:
+            return {mood: 0.0 for mood in self.moods}
+        # cumsum accumulates track by track (see the class docstring on rounding)
+        sums = np.cumsum(scores, axis=0)[-1]
+        return dict(zip(self.moods, (sums / scores.shape[0]).tolist()))
+
+    def score_columns(self, columns: Dict, indices: List[int], mood_columns: List) -> Dict[str, float]:
+        """Score the given rows of a TrackTable into its mood columns (in self.moods order); returns the averages"""
+        np = load_numpy()
+        scores = self.score_matrix(self.column_matrix(columns, indices))
+        rows = np.asarray(indices, dtype=np.intp)
+        for j, column in enumerate(mood_columns):
+            # Writes through to the array's buffer
+            np.frombuffer(column, dtype=float)[rows] = scores[:, j]
+        return self.playlist_averages(scores)
+
+    def score_tracks(self, audio_features_list: List[Dict]) -> Tuple[List[Dict[str, float]], Dict[str, float]]:
+        """Score a list of audio feature dicts, returning per-track scores and playlist averages"""
+        scores = self.score_matrix(self.feature_matrix(audio_features_list))
+        track_scores = [dict(zip(self.moods, row)) for row in scores.tolist()]
+        return track_scores, self.playlist_averages(scores)
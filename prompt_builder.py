@@ -0,0 +1,172 @@
+import math
+from typing import Dict, List
+from track_table import TrackTable, is_missing
+
+# Rough size of a token for English text and JSON; good enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Features used to spread the track sample across the playlist's range of moods
+SAMPLE_FEATURES = ('energy', 'valence', 'danceability', 'acousticness')
+
+# Most tracks the farthest-point pass looks at; larger playlists are thinned to this first
+MAX_SAMPLE_CANDIDATES = 256
+
+# Longest playlist description kept in the prompt, and in each playlist of a batch prompt
+MAX_DESCRIPTION_CHARS = 200
+MAX_BATCH_DESCRIPTION_CHARS = 100
+
+RESPONSE_FORMAT = '{"suggestions":[{"mood":"","confidence":0.0,"reasoning":""}],"overall_assessment":""}'
+BATCH_RESPONSE_FORMAT = '{"playlists":[{"id":1,"suggestions":[{"mood":"","confidence":0.0,"reasoning":""}],"overall_assessment":""}]}'
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a prompt"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def sample_candidates(tracks: TrackTable, rows: List[int], limit: int) -> List[int]:
+    """At most about limit of rows: an even stride through them plus each sample feature's extremes.
+
+    Deterministic, so the same playlist always yields the same prompt (and AI cache key).
+    """
+    if len(rows) <= limit:
+        return rows
+
+    extremes = set()
+    for name in SAMPLE_FEATURES:
+        column = tracks.features[name]
+        present = [row for row in rows if not is_missing(column[row])]
+        if present:
+            extremes.add(min(present, key=column.__getitem__))
+            extremes.add(max(present, key=column.__getitem__))
+
+    step = len(rows) / (limit - len(extremes))
+    strided = {rows[int(i * step)] for i in range(limit - len(extremes))}
+    return sorted(strided | extremes)
+
+
+def select_sample_indices(tracks: TrackTable, count: int) -> List[int]:
+    """Rows of up to count tracks that cover the playlist's feature space, most representative first.
+
+    Tracks with audio features are chosen by farthest-point sampling: start with
+    the track nearest the playlist's average, then repeatedly add the track
+    farthest from everything picked so far. Large playlists are first thinned
+    to MAX_SAMPLE_CANDIDATES tracks that keep each feature's extremes, so the
+    cost stays flat however long the playlist is. Without audio features,
+    tracks are spread evenly through the playlist instead of taken from the top.
+    """
+    if count <= 0 or not len(tracks):
+        return []
+
+    with_features = tracks.feature_indices()
+    if not with_features:
+        step = len(tracks) / min(count, len(tracks))
+        return [int(i * step) for i in range(min(count, len(tracks)))]
+    with_features = sample_candidates(tracks, with_features, MAX_SAMPLE_CANDIDATES)
+
+    columns = [tracks.features[name] for name in SAMPLE_FEATURES]
+    points = [[0.0 if is_missing(column[index]) else column[index] for column in columns] for index in with_features]
+    centroid = [sum(column) / len(points) for column in zip(*points)]
+
+    def distance(a, b):
+        return sum((x - y) ** 2 for x, y in zip(a, b))
+
+    first = min(range(len(points)), key=lambda i: distance(points[i], centroid))
+    chosen = [first]
+    nearest = [distance(point, points[first]) for point in points]
+
+    while len(chosen) < min(count, len(points)):
+        candidate = max(range(len(points)), key=lambda i: nearest[i])
+        if nearest[candidate] == 0:
+            break  # every remaining track duplicates one already chosen
+        chosen.append(candidate)
+        nearest = [min(nearest[i], distance(points[i], points[candidate])) for i in range(len(points))]
+
+    return [with_features[i] for i in chosen]
+
+
+def select_sample_tracks(tracks, count: int) -> List[Dict]:
+    """Track dicts for select_sample_indices, from a TrackTable or a list of track dicts"""
+    return [tracks[index] for index in select_sample_indices(TrackTable.of(tracks), count)]
+
+
+def format_track(track: Dict) -> str:
+    line = f"{track['name']} - {', '.join(track['artists'])}"
+    features = track.get('audio_features')
+    if features:
+        line += f" (energy {features.get('energy', 0):.2f}, valence {features.get('valence', 0):.2f})"
+    return line
+
+
+def shorten(text: str, limit: int) -> str:
+    text = (text or '').strip()
+    return text[:limit].rstrip() + '...' if len(text) > limit else text
+
+
+def build_mood_prompt(playlist_data: Dict, moods: List[str], token_budget: int, max_samples: int) -> str:
+    """Compact mood prompt that lists the moods once and fits within token_budget.
+
+    Sample tracks are dropped, least representative first, until the prompt fits;
+    the header, mood list and response format are always kept.
+    """
+    playlist_info = playlist_data['playlist_info']
+    description = shorten(playlist_info.get('description'), MAX_DESCRIPTION_CHARS)
+
+    header = [
+        "Pick the 3 moods that best fit this Spotify playlist.",
+        f"Playlist: {playlist_info['name']}"
+    ]
+    if description:
+        header.append(f"Description: {description}")
+    header.append(f"Tracks: {playlist_data['total_tracks']}")
+
+    footer = [
+        f"Moods: {', '.join(moods)}",
+        "Use only these moods, confidence 0-1, one short reason each.",
+        f"Reply with JSON only: {RESPONSE_FORMAT}"
+    ]
+
+    tracks = TrackTable.of(playlist_data['tracks'])
+    samples = select_sample_indices(tracks, max_samples)
+    if not any(tracks.has_features[index] for index in samples):
+        footer.insert(0, "No audio features available; judge from titles, artists and playlist context.")
+
+    lines = {index: format_track(tracks.track(index)) for index in samples}
+    while True:
+        # Show samples in playlist order so they read naturally
+        sample_lines = [f"{i}. {lines[index]}" for i, index in enumerate(sorted(samples), 1)]
+        prompt = '\n'.join(header + (["Sample tracks:"] + sample_lines if samples else []) + footer)
+        if not samples or estimate_tokens(prompt) <= token_budget:
+            return prompt
+        samples = samples[:-1]
+
+
+def playlist_summary(number: int, playlist_data: Dict, token_budget: int, max_samples: int) -> str:
+    """One playlist's entry in a batch prompt, with as many sample tracks as fit token_budget"""
+    playlist_info = playlist_data['playlist_info']
+    line = f"#{number} {playlist_info['name']} ({playlist_data['total_tracks']} tracks)"
+    description = shorten(playlist_info.get('description'), MAX_BATCH_DESCRIPTION_CHARS)
+    if description:
+        line += f": {description}"
+
+    tracks = TrackTable.of(playlist_data['tracks'])
+    samples = select_sample_indices(tracks, max_samples)
+    lines = {index: format_track(tracks.track(index)) for index in samples}
+    while True:
+        summary = line + ('\n  ' + '; '.join(lines[index] for index in sorted(samples)) if samples else '')
+        if not samples or estimate_tokens(summary) <= token_budget:
+            return summary
+        samples = samples[:-1]
+
+
+def build_batch_mood_prompt(playlists: List[Dict], moods: List[str], playlist_token_budget: int, max_samples: int) -> str:
+    """One prompt asking for mood suggestions for several playlists, answered per playlist id"""
+    lines = [f"Pick the 3 moods that best fit each of these {len(playlists)} Spotify playlists."]
+    lines += [playlist_summary(number, playlist, playlist_token_budget, max_samples)
+              for number, playlist in enumerate(playlists, 1)]
+    lines += [
+        f"Moods: {', '.join(moods)}",
+        "Use only these moods, confidence 0-1, one short reason each.",
+        f"Reply with JSON only, one entry per playlist id: {BATCH_RESPONSE_FORMAT}"
+    ]
+    return '\n'.join(lines)
@@ -0,0 +1,125 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class RateLimiter:
+    """Token bucket plus an adaptive cap on concurrent calls, shared by every caller.
+
+    Each call takes one token; tokens refill at `rate` per second up to `burst`.
+    At most `concurrency` calls run at once. A throttled response halves the
+    concurrency cap and pauses everyone for the server's Retry-After; each run
+    of successes as long as the current cap raises it by one again (AIMD).
+    A rate of 0 disables the token bucket but keeps the concurrency cap.
+    """
+
+    def __init__(self, rate=10.0, burst=20, max_concurrency=8, min_concurrency=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_concurrency = max(1, min(int(min_concurrency), self.max_concurrency))
+        self.concurrency = self.max_concurrency
+
+        self._cond = threading.Condition()
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._successes = 0
+
+        self.calls = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+
+    def _refill(self, now):
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _delay(self, now):
+        """Seconds until this caller may go; caller holds the lock"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._in_flight >= self.concurrency:
+            return None  # wait for a running call to finish
+        if self.rate > 0 and self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        return 0.0
+
+    def acquire(self):
+        """Block until a token and a concurrency slot are free"""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._delay(now)
+                if delay == 0.0:
+                    break
+                self._cond.wait(delay)
+
+            if self.rate > 0:
+                self._tokens -= 1
+            self._in_flight += 1
+            self.calls += 1
+            self.wait_time += time.monotonic() - start
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Hold a token and a concurrency slot for the enclosed call"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_success(self):
+        """Grow the concurrency cap by one after a full window of successes"""
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.concurrency and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def record_throttled(self, retry_after=None):
+        """Back off after a 429: halve concurrency and pause until Retry-After"""
+        with self._cond:
+            self.throttled += 1
+            self._successes = 0
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            # Drain the bucket so callers resume at the steady rate, not in a burst
+            self._tokens = 0.0
+
+    def split(self, parts):
+        """Keep 1/parts of the rate and burst, for one of several processes sharing the same quota"""
+        parts = max(1, int(parts))
+        with self._cond:
+            self.rate /= parts
+            self.burst = max(1, self.burst // parts)
+            self._tokens = min(self._tokens, float(self.burst))
+
+    def stats(self):
+        """Current limits and throttling counters for monitoring"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'tokens': round(self._tokens, 2),
+                'concurrency': self.concurrency,
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self._in_flight,
+                'blocked_for': round(max(0.0, self._blocked_until - now), 2),
+                'calls': self.calls,
+                'throttled': self.throttled,
+                'wait_time': round(self.wait_time, 3)
+            }
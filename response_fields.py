@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional
+
+# Top-level keys of MoodAnalyzer.combine_analysis results
+ANALYSIS_FIELDS = ('playlist_info', 'rule_based_analysis', 'ai_suggestions', 'final_recommendations')
+
+# What compact mode keeps: the playlist's identity and the final moods with their confidence
+COMPACT_FIELDS = (
+    'playlist_info.id',
+    'playlist_info.name',
+    'final_recommendations.mood',
+    'final_recommendations.confidence'
+)
+
+
+def parse_fields(value) -> Optional[List[str]]:
+    """Dotted field paths from a comma-separated string or a list; None selects everything.
+
+    Raises ValueError for any other type of value, or a path whose top-level
+    name is not part of an analysis.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, (list, tuple)):
+        raise ValueError("fields must be a comma-separated string or a list of field paths")
+    fields = [str(field).strip() for field in value if str(field).strip()]
+    if not fields:
+        return None
+
+    unknown = sorted({field.split('.')[0] for field in fields} - set(ANALYSIS_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(ANALYSIS_FIELDS)}")
+    return fields
+
+
+def requested_fields(args, body: Dict) -> Optional[List[str]]:
+    """Fields asked for with ?fields= (or ?include=) or the JSON body; compact=true picks COMPACT_FIELDS"""
+    for name in ('fields', 'include'):
+        value = args.get(name) or body.get(name)
+        if value:
+            return parse_fields(value)
+
+    compact = args.get('compact') or body.get('compact')
+    if compact and str(compact).lower() not in ('0', 'false', 'no'):
+        return list(COMPACT_FIELDS)
+    return None
+
+
+def build_tree(fields: List[str]) -> Dict:
+    """{'a': {'b': {}}} for ['a.b']; an empty dict means keep the whole value"""
+    tree = {}
+    for field in fields:
+        node = tree
+        *parents, leaf = field.split('.')
+        for part in parents:
+            if node.get(part) == {}:
+                break  # a shorter path already selects the whole value
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = {}
+    return tree
+
+
+def project(value, tree: Dict):
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+
+def select_fields(analysis: Dict, fields: Optional[List[str]] = None) -> Dict:
+    """The parts of an analysis a client asked for; the whole analysis when fields is None.
+
+    Builds new dicts rather than editing analysis, which may be shared with
+    other requests (see SingleFlight) or cached.
+    """
+    if not analysis or fields is None:
+        return analysis
+    return project(analysis, build_tree(fields))
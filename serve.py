@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Production server for the Spotify Mood Analyzer
+
+Runs app.py under gunicorn with SERVER_WORKERS processes of SERVER_THREADS
+threads each. The app (SpotifyClient, MoodAnalyzer and the configured AI
+SDKs) is loaded once before the workers are forked. Where gunicorn is unavailable (Windows)
+it falls back to a single-process threaded server. SIGTERM stops accepting
+connections and gives in-flight requests SERVER_GRACEFUL_TIMEOUT seconds to
+finish. HTTPS is used when SSL_CERT_FILE and SSL_KEY_FILE both exist.
+
+Usage:
+    python serve.py
+    python serve.py --workers 4 --threads 16 --port 8000
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+from config import Config
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # gunicorn does not run on Windows
+    BaseApplication = None
+
+
+def ssl_files():
+    """(certificate, key) paths when both exist, otherwise None"""
+    if os.path.exists(Config.SSL_CERT_FILE) and os.path.exists(Config.SSL_KEY_FILE):
+        return Config.SSL_CERT_FILE, Config.SSL_KEY_FILE
+    return None
+
+
+def load_app():
+    """Import the app and its configured AI SDKs once, so every worker inherits them"""
+    import app as flask_app
+    loaded = flask_app.mood_analyzer.load_providers()
+    if loaded:
+        print(f"🤖 Preloaded AI providers: {', '.join(loaded)}")
+    return flask_app
+
+
+def after_fork(flask_app, workers):
+    """Per-process setup in a forked worker: fresh SQLite connections and a share of the Spotify quota"""
+    for cache in (flask_app.spotify_client.feature_cache, flask_app.mood_analyzer.suggestion_cache,
+                  flask_app.incremental_analyzer.states):
+        cache.reconnect()
+    flask_app.spotify_client.rate_limiter.split(workers)
+
+
+if BaseApplication:
+    class GunicornServer(BaseApplication):
+        """gunicorn configured from code rather than its command line"""
+
+        def __init__(self, flask_app, options):
+            self.flask_app = flask_app
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.flask_app.app
+
+
+def serve_gunicorn(flask_app, host, port, workers, threads, timeout, graceful_timeout, ssl):
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': workers,
+        'threads': threads,
+        'worker_class': 'gthread',
+        'timeout': timeout,
+        'graceful_timeout': graceful_timeout,
+        'preload_app': True,
+        'post_fork': lambda server, worker: after_fork(flask_app, workers)
+    }
+    if ssl:
+        options['certfile'], options['keyfile'] = ssl
+    GunicornServer(flask_app, options).run()
+
+
+def serve_threaded(flask_app, host, port, graceful_timeout, ssl):
+    """Single-process fallback: a thread per connection, draining in-flight requests on SIGTERM/SIGINT"""
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, flask_app.app, threaded=True, ssl_context=ssl)
+    server.daemon_threads = False  # lets server_close() wait for in-flight requests
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever() returns, so it can't run on the serving thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    server.serve_forever()
+
+    closer = threading.Thread(target=server.server_close, daemon=True)
+    closer.start()
+    closer.join(graceful_timeout)
+
+
+def serve(host=None, port=None, workers=None, threads=None, timeout=None, graceful_timeout=None):
+    """Serve the app until stopped; arguments default to the SERVER_* settings"""
+    host = host or Config.SERVER_HOST
+    port = port or Config.SERVER_PORT
+    workers = max(1, workers or Config.SERVER_WORKERS)
+    threads = max(1, threads or Config.SERVER_THREADS)
+    timeout = timeout or Config.SERVER_TIMEOUT
+    graceful_timeout = graceful_timeout if graceful_timeout is not None else Config.SERVER_GRACEFUL_TIMEOUT
+
+    ssl = ssl_files()
+    scheme = 'https' if ssl else 'http'
+    flask_app = load_app()
+
+    print(f"{'🔒' if ssl else '🌐'} Starting {scheme.upper()} server...")
+    print(f"📱 Demo will be available at: {scheme}://localhost:{port}")
+    if ssl:
+        print("⚠️  You may need to accept the security warning in your browser")
+
+    if BaseApplication:
+        print(f"⚙️  {workers} worker process(es) x {threads} threads")
+        serve_gunicorn(flask_app, host, port, workers, threads, timeout, graceful_timeout, ssl)
+    else:
+        if workers > 1:
+            print("⚠️  gunicorn is not available, serving from a single process")
+        serve_threaded(flask_app, host, port, graceful_timeout, ssl)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Production server for the Spotify Mood Analyzer")
+    parser.add_argument('--host', help=f'bind address (default: {Config.SERVER_HOST})')
+    parser.add_argument('--port', type=int, help=f'port (default: {Config.SERVER_PORT})')
+    parser.add_argument('--workers', type=int, help=f'worker processes (default: {Config.SERVER_WORKERS})')
+    parser.add_argument('--threads', type=int, help=f'threads per worker (default: {Config.SERVER_THREADS})')
+    parser.add_argument('--timeout', type=int, help=f'seconds a request may run (default: {Config.SERVER_TIMEOUT})')
+    parser.add_argument('--graceful-timeout', type=int,
+                        help=f'seconds to finish requests on shutdown (default: {Config.SERVER_GRACEFUL_TIMEOUT})')
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.threads, args.timeout, args.graceful_timeout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
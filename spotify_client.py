@@ -1,15 +1,75 @@
 import spotipy
+from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyClientCredentials
+from urllib3.util.retry import Retry
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import Config
+from cache import LRUCache
+from metrics import metrics
+from rate_limiter import RateLimiter
+from http_pool import http_pools
+from track_table import TrackTable
+
+# Maximum page size for playlist_tracks and batch size for audio_features
+SPOTIFY_PAGE_SIZE = 100
+
+# Maximum IDs per tracks request
+SPOTIFY_TRACKS_BATCH_SIZE = 50
+
+# Only the fields needed to diff a playlist against its last analyzed state
+TRACK_ID_FIELDS = 'items(track(id)),limit,offset,total,next'
+
+# Server errors are retried by the HTTP adapter; 429s are left to the shared rate limiter, so urllib3
+# must not honour Retry-After itself (it would sleep inside a limiter slot and hide the throttle).
+# Once the retries run out the last 5xx response is handed back: raising RetryError instead would make
+# spotipy report it as a 429 "Max Retries" and the outage would be mistaken for a throttle.
+SPOTIFY_RETRY_STATUSES = (500, 502, 503, 504)
+SPOTIFY_HTTP_RETRY = Retry(
+    total=3,
+    connect=None,
+    read=False,
+    allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+    status=3,
+    backoff_factor=0.3,
+    status_forcelist=SPOTIFY_RETRY_STATUSES,
+    respect_retry_after_header=False,
+    raise_on_status=False
+)
+
+# Token requests are never retried by the adapter
+SPOTIFY_AUTH_RETRY = Retry(0, read=False, respect_retry_after_header=False)
+
+# One limiter for every SpotifyClient in the process, since they share the app's quota
+rate_limiter = RateLimiter(
+    rate=Config.SPOTIFY_RATE_LIMIT,
+    burst=Config.SPOTIFY_RATE_BURST,
+    max_concurrency=Config.SPOTIFY_MAX_CONCURRENCY,
+    min_concurrency=Config.SPOTIFY_MIN_CONCURRENCY
+)
 
 class SpotifyClient:
     def __init__(self):
+        # Every SpotifyClient shares keep-alive pools; token requests are not retried, API calls are
         self.client_credentials_manager = SpotifyClientCredentials(
             client_id=Config.SPOTIFY_CLIENT_ID,
-            client_secret=Config.SPOTIFY_CLIENT_SECRET
+            client_secret=Config.SPOTIFY_CLIENT_SECRET,
+            requests_session=http_pools.requests_session('spotify_auth', max_retries=SPOTIFY_AUTH_RETRY)
+        )
+        self.sp = spotipy.Spotify(
+            client_credentials_manager=self.client_credentials_manager,
+            requests_session=http_pools.requests_session('spotify', max_retries=SPOTIFY_HTTP_RETRY)
+        )
+        self.rate_limiter = rate_limiter
+        
+        # Audio features never change for a track, so they are shared across playlists
+        self.feature_cache = LRUCache(
+            maxsize=Config.FEATURE_CACHE_SIZE,
+            ttl=Config.FEATURE_CACHE_TTL,
+            db_path=Config.FEATURE_CACHE_DB or None,
+            table='audio_features'
         )
-        self.sp = spotipy.Spotify(client_credentials_manager=self.client_credentials_manager)
     
     def extract_playlist_id(self, spotify_url):
         """Extract playlist ID from Spotify URL"""
@@ -28,15 +88,51 @@ class SpotifyClient:
         # If no pattern matches, assume it's already a playlist ID
         return spotify_url
     
+    def is_throttled(self, error):
+        """Whether a SpotifyException is a real 429 from Spotify.
+
+        spotipy also reports exhausted adapter retries as 429 "Max Retries",
+        but without response headers; those are failures, not throttles.
+        """
+        return error.http_status == 429 and getattr(error, 'headers', None) is not None
+    
+    def retry_after(self, error, attempt):
+        """Seconds to wait after a 429, from Retry-After or exponential backoff"""
+        headers = getattr(error, 'headers', None) or {}
+        try:
+            return float(headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return float(2 ** attempt)
+    
+    def request(self, endpoint, *args, **kwargs):
+        """Call a spotipy method through the shared rate limiter, retrying 429s after Retry-After"""
+        for attempt in range(Config.SPOTIFY_MAX_RETRIES + 1):
+            metrics.inc('spotify_requests_total', endpoint=endpoint)
+            with self.rate_limiter.slot():
+                try:
+                    result = getattr(self.sp, endpoint)(*args, **kwargs)
+                except SpotifyException as e:
+                    if not self.is_throttled(e) or attempt == Config.SPOTIFY_MAX_RETRIES:
+                        raise
+                    delay = self.retry_after(e, attempt)
+                    print(f"⏳ Spotify rate limited on {endpoint}, retrying in {delay:.1f}s")
+                    metrics.inc('spotify_throttled_total', endpoint=endpoint)
+                    self.rate_limiter.record_throttled(delay)
+                    continue
+            self.rate_limiter.record_success()
+            return result
+    
+    @metrics.timed('spotify_playlist_info')
     def get_playlist_info(self, playlist_url):
         """Get basic playlist information"""
         try:
             playlist_id = self.extract_playlist_id(playlist_url)
-            playlist = self.sp.playlist(playlist_id)
+            playlist = self.request('playlist', playlist_id)
             
             return {
                 'id': playlist['id'],
                 'name': playlist['name'],
+                'snapshot_id': playlist.get('snapshot_id'),
                 'description': playlist.get('description', ''),
                 'total_tracks': playlist['tracks']['total'],
                 'url': playlist['external_urls']['spotify'],
@@ -47,108 +143,186 @@ class SpotifyClient:
             print(f"Error fetching playlist info: {str(e)}")
             return None
     
+    def parse_track_items(self, items):
+        """Convert raw playlist_tracks items into a TrackTable, skipping local/unavailable tracks"""
+        return TrackTable.from_items(items)
+    
+    def parse_audio_features(self, features):
+        """Convert raw audio_features results into feature dicts"""
+        audio_features = []
+        for feature in features or []:
+            if feature:  # Some tracks might not have audio features
+                audio_features.append({
+                    'id': feature['id'],
+                    'acousticness': feature['acousticness'],
+                    'danceability': feature['danceability'],
+                    'energy': feature['energy'],
+                    'instrumentalness': feature['instrumentalness'],
+                    'liveness': feature['liveness'],
+                    'loudness': feature['loudness'],
+                    'speechiness': feature['speechiness'],
+                    'tempo': feature['tempo'],
+                    'valence': feature['valence'],
+                    'mode': feature['mode'],
+                    'key': feature['key'],
+                    'time_signature': feature['time_signature']
+                })
+        return audio_features
+    
+    @metrics.timed('spotify_tracks')
     def get_playlist_tracks(self, playlist_url):
         """Get all tracks from a playlist"""
         try:
             playlist_id = self.extract_playlist_id(playlist_url)
             
-            tracks = []
-            results = self.sp.playlist_tracks(playlist_id)
+            tracks = TrackTable()
+            results = self.request('playlist_tracks', playlist_id)
             
             while results:
-                for item in results['items']:
-                    if item['track'] and item['track']['id']:
-                        track_info = {
-                            'id': item['track']['id'],
-                            'name': item['track']['name'],
-                            'artists': [artist['name'] for artist in item['track']['artists']],
-                            'album': item['track']['album']['name'],
-                            'duration_ms': item['track']['duration_ms'],
-                            'popularity': item['track']['popularity'],
-                            'preview_url': item['track']['preview_url'],
-                            'external_urls': item['track']['external_urls']
-                        }
-                        tracks.append(track_info)
-                
-                results = self.sp.next(results) if results['next'] else None
+                tracks.extend_items(results['items'])
+                if results['next']:
+                    results = self.request('next', results)
+                else:
+                    results = None
             
             return tracks
         except Exception as e:
             print(f"Error fetching playlist tracks: {str(e)}")
-            return []
+            return TrackTable()
     
+    @metrics.timed('spotify_track_ids')
+    def get_playlist_track_ids(self, playlist_url):
+        """Get the IDs of a playlist's tracks in order, without the rest of the track metadata"""
+        playlist_id = self.extract_playlist_id(playlist_url)
+        
+        track_ids = []
+        results = self.request('playlist_tracks', playlist_id, fields=TRACK_ID_FIELDS)
+        while results:
+            track_ids.extend(item['track']['id'] for item in results['items'] if item['track'] and item['track']['id'])
+            results = self.request('next', results) if results['next'] else None
+        return track_ids
+    
+    @metrics.timed('spotify_track_details')
+    def get_tracks(self, track_ids):
+        """Get specific tracks by ID, as a TrackTable like get_playlist_tracks"""
+        tracks = TrackTable()
+        for i in range(0, len(track_ids), SPOTIFY_TRACKS_BATCH_SIZE):
+            results = self.request('tracks', track_ids[i:i+SPOTIFY_TRACKS_BATCH_SIZE])
+            tracks.extend_items({'track': track} for track in results['tracks'])
+        return tracks
+    
+    @metrics.timed('spotify_audio_features')
     def get_audio_features(self, track_ids):
-        """Get audio features for multiple tracks"""
+        """Get audio features for multiple tracks, fetching only cache misses from Spotify"""
         try:
-            # Spotify API can handle up to 100 tracks at once
-            audio_features = []
+            features_by_id = self.feature_cache.get_many(track_ids)
+            missing_ids = [track_id for track_id in dict.fromkeys(track_ids) if track_id not in features_by_id]
             
-            for i in range(0, len(track_ids), 100):
-                batch = track_ids[i:i+100]
-                features = self.sp.audio_features(batch)
-                
-                for feature in features:
-                    if feature:  # Some tracks might not have audio features
-                        audio_features.append({
-                            'id': feature['id'],
-                            'acousticness': feature['acousticness'],
-                            'danceability': feature['danceability'],
-                            'energy': feature['energy'],
-                            'instrumentalness': feature['instrumentalness'],
-                            'liveness': feature['liveness'],
-                            'loudness': feature['loudness'],
-                            'speechiness': feature['speechiness'],
-                            'tempo': feature['tempo'],
-                            'valence': feature['valence'],
-                            'mode': feature['mode'],
-                            'key': feature['key'],
-                            'time_signature': feature['time_signature']
-                        })
+            # Spotify API can handle up to 100 tracks at once
+            for i in range(0, len(missing_ids), SPOTIFY_PAGE_SIZE):
+                batch = missing_ids[i:i+SPOTIFY_PAGE_SIZE]
+                features = self.parse_audio_features(self.request('audio_features', batch))
+                fetched = {f['id']: f for f in features}
+                self.feature_cache.set_many(fetched)
+                features_by_id.update(fetched)
             
-            return audio_features
+            return [features_by_id[track_id] for track_id in dict.fromkeys(track_ids) if track_id in features_by_id]
         except Exception as e:
             print(f"Error fetching audio features: {str(e)}")
             return []
     
-    def analyze_playlist(self, playlist_url):
-        """Complete playlist analysis with tracks and audio features"""
-        try:
-            # Get playlist info
-            playlist_info = self.get_playlist_info(playlist_url)
-            if not playlist_info:
-                return None
+    @metrics.timed('spotify_pipelined_fetch')
+    def fetch_playlist_pipelined(self, playlist_url):
+        """Fetch playlist info, track pages and audio features with overlapping requests"""
+        playlist_id = self.extract_playlist_id(playlist_url)
+        
+        with ThreadPoolExecutor(max_workers=Config.SPOTIFY_FETCH_WORKERS) as pool:
+            info_future = pool.submit(self.get_playlist_info, playlist_url)
+            feature_futures = []
             
-            # Get tracks
-            tracks = self.get_playlist_tracks(playlist_url)
-            if not tracks:
-                return None
+            paging_start = time.perf_counter()
+            try:
+                # The first page tells us the total, so the remaining pages can be requested at once
+                first_page = self.request('playlist_tracks', playlist_id, limit=SPOTIFY_PAGE_SIZE)
+                page_size = first_page.get('limit') or SPOTIFY_PAGE_SIZE
+                pages = {0: self.parse_track_items(first_page['items'])}
+                feature_futures.append(pool.submit(self.get_audio_features, pages[0].ids))
+                
+                page_futures = {
+                    pool.submit(self.request, 'playlist_tracks', playlist_id, limit=page_size, offset=offset): offset
+                    for offset in range(page_size, first_page['total'], page_size)
+                }
+                
+                # Start each audio features batch as soon as its page of IDs arrives
+                for future in as_completed(page_futures):
+                    page_tracks = self.parse_track_items(future.result()['items'])
+                    pages[page_futures[future]] = page_tracks
+                    feature_futures.append(pool.submit(self.get_audio_features, page_tracks.ids))
+                
+                tracks = TrackTable.concat([pages[offset] for offset in sorted(pages)])
+            except Exception as e:
+                print(f"Error fetching playlist tracks: {str(e)}")
+                tracks = TrackTable()
+            metrics.observe('stage_duration_seconds', time.perf_counter() - paging_start, stage='spotify_tracks')
             
-            # Get audio features
-            track_ids = [track['id'] for track in tracks]
-            audio_features = self.get_audio_features(track_ids)
+            audio_features = [feature for future in feature_futures for feature in future.result()]
+            playlist_info = info_future.result()
+        
+        return playlist_info, tracks, audio_features
+    
+    @metrics.timed('spotify_analyze_playlist')
+    def analyze_playlist(self, playlist_url, pipelined=None):
+        """Complete playlist analysis with tracks and audio features"""
+        if pipelined is None:
+            pipelined = Config.SPOTIFY_PIPELINED_FETCH
+        
+        try:
+            if pipelined:
+                playlist_info, tracks, audio_features = self.fetch_playlist_pipelined(playlist_url)
+                if not playlist_info or not tracks:
+                    return None
+            else:
+                # Get playlist info
+                playlist_info = self.get_playlist_info(playlist_url)
+                if not playlist_info:
+                    return None
+                
+                # Get tracks
+                tracks = self.get_playlist_tracks(playlist_url)
+                if not tracks:
+                    return None
+                
+                # Get audio features
+                audio_features = self.get_audio_features(tracks.ids)
             
             # Combine track info with audio features
-            features_dict = {f['id']: f for f in audio_features}
+            tracks.set_features({f['id']: f for f in audio_features})
             
-            for track in tracks:
-                track['audio_features'] = features_dict.get(track['id'], {})
-            
-            # Calculate total duration
-            total_duration_ms = sum(track.get('duration_ms', 0) for track in tracks)
-            total_duration_formatted = self.format_duration(total_duration_ms)
-            
-            return {
-                'playlist_info': playlist_info,
-                'tracks': tracks,
-                'total_tracks': len(tracks),
-                'total_with_features': len([t for t in tracks if t['audio_features']]),
-                'total_duration_ms': total_duration_ms,
-                'total_duration_formatted': total_duration_formatted
-            }
+            return self.build_playlist_data(playlist_info, tracks)
         except Exception as e:
             print(f"Error analyzing playlist: {str(e)}")
             return None
     
+    def build_playlist_data(self, playlist_info, tracks):
+        """Assemble the analyze_playlist result from playlist info and tracks with audio features.
+        
+        tracks stays a TrackTable; it is only turned into dicts by whoever needs them.
+        """
+        tracks = TrackTable.of(tracks)
+        
+        # Calculate total duration
+        total_duration_ms = tracks.total_duration_ms()
+        total_duration_formatted = self.format_duration(total_duration_ms)
+        
+        return {
+            'playlist_info': playlist_info,
+            'tracks': tracks,
+            'total_tracks': len(tracks),
+            'total_with_features': tracks.feature_count(),
+            'total_duration_ms': total_duration_ms,
+            'total_duration_formatted': total_duration_formatted
+        }
+    
     def format_duration(self, duration_ms):
         """Format duration from milliseconds to human-readable format"""
         if not duration_ms:
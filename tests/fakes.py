@@ -0,0 +1,108 @@
+"""
+Test doubles shared by several test modules
+"""
+
+import threading
+from ai_providers import AIProvider
+from benchmarks.fake_services import memory_cache
+from spotify_client import SpotifyClient
+
+
+class StubProvider(AIProvider):
+    """Provider whose suggestions come from an async test function"""
+
+    def __init__(self, name, suggest_fn):
+        self.name = self.label = name
+        self.suggest_fn = suggest_fn
+        super().__init__()
+
+    def is_configured(self):
+        return True
+
+    async def suggest(self, playlist_data, prompt):
+        return await self.suggest_fn(playlist_data, prompt)
+
+
+class FakeSpotify:
+    """Stand-in for spotipy.Spotify serving a playlist of numbered tracks.
+
+    track_numbers and snapshot_id can be changed between calls to edit the
+    playlist; calls counts requests per endpoint.
+    """
+
+    def __init__(self, track_numbers, snapshot_id='snap1'):
+        self.track_numbers = list(track_numbers)
+        self.snapshot_id = snapshot_id
+        self.lock = threading.Lock()
+        self.calls = {'playlist': 0, 'playlist_tracks': 0, 'next': 0, 'tracks': 0, 'audio_features': 0}
+        self.track_requests = []
+
+    def _count(self, name):
+        with self.lock:
+            self.calls[name] += 1
+
+    def _track(self, i):
+        return {
+            'id': f'track{i}',
+            'name': f'Track {i}',
+            'artists': [{'name': f'Artist {i % 7}'}],
+            'album': {'name': f'Album {i % 3}'},
+            'duration_ms': 180000 + i,
+            'popularity': 50,
+            'preview_url': None,
+            'external_urls': {'spotify': f'https://open.spotify.com/track/track{i}'}
+        }
+
+    def playlist(self, playlist_id):
+        self._count('playlist')
+        return {
+            'id': playlist_id,
+            'name': 'Editable Playlist',
+            'snapshot_id': self.snapshot_id,
+            'description': '',
+            'tracks': {'total': len(self.track_numbers)},
+            'external_urls': {'spotify': f'https://open.spotify.com/playlist/{playlist_id}'},
+            'images': [],
+            'owner': {'display_name': 'tester'}
+        }
+
+    def playlist_tracks(self, playlist_id, limit=100, offset=0, fields=None):
+        self._count('playlist_tracks')
+        numbers = self.track_numbers[offset:offset + limit]
+        return {
+            'items': [{'track': self._track(i)} for i in numbers],
+            'limit': limit,
+            'offset': offset,
+            'total': len(self.track_numbers),
+            'next': 'more' if offset + limit < len(self.track_numbers) else None
+        }
+
+    def next(self, results):
+        self._count('next')
+        return self.playlist_tracks(None, limit=results['limit'], offset=results['offset'] + results['limit'])
+
+    def tracks(self, track_ids):
+        self._count('tracks')
+        self.track_requests.extend(track_ids)
+        return {'tracks': [self._track(int(track_id[5:])) for track_id in track_ids]}
+
+    def audio_features(self, track_ids):
+        self._count('audio_features')
+        features = []
+        for track_id in track_ids:
+            i = int(track_id[5:])
+            features.append({
+                'id': track_id, 'acousticness': (i % 10) / 10, 'danceability': (i % 7) / 7,
+                'energy': (i % 11) / 11, 'instrumentalness': 0.1, 'liveness': 0.1,
+                'loudness': -float(i % 20), 'speechiness': 0.05, 'tempo': 60.0 + i % 140,
+                'valence': (i % 13) / 13, 'mode': i % 2, 'key': 5, 'time_signature': 4
+            })
+        return features
+
+
+def fake_spotify_client(fake):
+    """SpotifyClient calling fake, with an empty in-memory feature cache rather than FEATURE_CACHE_DB"""
+    client = SpotifyClient()
+    client.sp = fake
+    client.feature_cache = memory_cache(client.feature_cache)
+    return client
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test batched AI mood suggestions for many playlists
+"""
+
+import json
+import re
+from benchmarks import synthetic
+from batch_executor import BatchExecutor
+from benchmarks.fake_services import FakeUpstream, connect
+from config import Config
+from mood_analyzer import MoodAnalyzer
+
+class BatchGeminiModel:
+    """Mock Gemini model that answers batch prompts, garbling any batch larger than max_good"""
+
+    def __init__(self, max_good=None, drop_ids=()):
+        self.max_good = max_good
+        self.drop_ids = set(drop_ids)
+        self.batch_sizes = []
+        self.single_calls = 0
+
+    def generate_content(self, prompt, generation_config=None):
+        ids = [int(n) for n in re.findall(r'^#(\d+) ', prompt, re.MULTILINE)]
+        names = re.findall(r'^#\d+ (.+?) \(', prompt, re.MULTILINE)
+        if not ids:
+            # Single-playlist prompt from the regular fallback path
+            self.single_calls += 1
+            name = re.search(r'^Playlist: (.+)$', prompt, re.MULTILINE).group(1)
+            text = json.dumps({'suggestions': [{'mood': 'romantic', 'confidence': 0.7, 'reasoning': name}], 'overall_assessment': name})
+        elif self.max_good and len(ids) > self.max_good:
+            self.batch_sizes.append(len(ids))
+            text = '{"playlists": [{"id": 1, "suggest'  # cut off mid-reply
+        else:
+            self.batch_sizes.append(len(ids))
+            text = json.dumps({'playlists': [
+                {'id': n, 'suggestions': [{'mood': 'calming', 'confidence': 0.8, 'reasoning': name}], 'overall_assessment': name}
+                for n, name in zip(ids, names) if name not in self.drop_ids
+            ]})
+
+        class MockResponse:
+            pass
+        response = MockResponse()
+        response.text = '```json\n' + text + '\n```'
+        return response
+
+def make_playlist(i):
+    return {
+        'playlist_info': {'id': f'p{i}', 'name': f'Playlist {i}', 'description': 'Batch test'},
+        'total_tracks': 1,
+        'tracks': [{'id': f't{i}', 'name': f'Song {i}', 'artists': ['Artist'],
+                    'audio_features': {'energy': 0.1 * (i % 10), 'valence': 0.5}}]
+    }
+
+def make_analyzer(model):
+    analyzer = MoodAnalyzer()
+    analyzer.ai_provider = 'gemini'
+    analyzer.openai_available = False
+    analyzer.gemini_available = True
+    analyzer.gemini_model = model
+    analyzer.suggestion_cache.clear()
+    return analyzer
+
+def test_one_call_for_many_playlists():
+    """Eight playlists with batch size 4 take two model calls, each answer matched to its playlist"""
+    model = BatchGeminiModel()
+    analyzer = make_analyzer(model)
+    playlists = [make_playlist(i) for i in range(8)]
+
+    results = analyzer.get_batched_ai_suggestions(playlists, batch_size=4)
+
+    assert model.batch_sizes == [4, 4]
+    assert [r['overall_assessment'] for r in results] == [f'Playlist {i}' for i in range(8)]
+    print("✅ 8 playlists answered in 2 calls")
+
+def test_malformed_reply_is_split_and_retried():
+    """A garbled batch reply is retried in halves until the batches are small enough"""
+    model = BatchGeminiModel(max_good=2)
+    analyzer = make_analyzer(model)
+    playlists = [make_playlist(i) for i in range(8)]
+
+    results = analyzer.get_batched_ai_suggestions(playlists, batch_size=8)
+
+    assert model.batch_sizes == [8, 4, 2, 2, 4, 2, 2]
+    assert [r['overall_assessment'] for r in results] == [f'Playlist {i}' for i in range(8)]
+    print("✅ Malformed batch split and retried")
+
+def test_missing_entry_falls_back_and_cache_is_shared():
+    """A playlist left out of the reply is retried, and batch answers serve later single requests"""
+    model = BatchGeminiModel(drop_ids={'Playlist 2'})
+    analyzer = make_analyzer(model)
+    playlists = [make_playlist(i) for i in range(4)]
+
+    results = analyzer.get_batched_ai_suggestions(playlists, batch_size=4)
+    assert [r['overall_assessment'] for r in results] == [f'Playlist {i}' for i in range(4)]
+    assert model.batch_sizes == [4]
+    assert model.single_calls == 1  # Playlist 2 on its own
+
+    single = analyzer.get_ai_mood_suggestions_with_fallback(make_playlist(1))
+    assert single['overall_assessment'] == 'Playlist 1'
+    assert model.single_calls == 1
+    print("✅ Missing entry recovered and batch answers cached per playlist")
+
+def test_batch_endpoint_keeps_incremental_state():
+    """ai_batch_size requests share model calls and still read and update incremental state"""
+    import app as flask_app
+    client = flask_app.app.test_client()
+    body = {'playlist_urls': [synthetic.playlist_url(20, seed=60 + i) for i in range(4)], 'ai_batch_size': 4}
+    incremental, batch_wait = Config.INCREMENTAL_ANALYSIS, Config.AI_BATCH_WAIT
+    provider = flask_app.mood_analyzer.ai_provider
+    unchanged_before = flask_app.incremental_analyzer.counts['unchanged']
+    try:
+        Config.INCREMENTAL_ANALYSIS = True
+        # The group closes as soon as all four playlists are in; a long wait keeps a slow fetch
+        # on a busy machine from splitting it into two model calls
+        Config.AI_BATCH_WAIT = 30
+        with FakeUpstream() as upstream:
+            connect(flask_app.spotify_client, flask_app.mood_analyzer, upstream, flask_app.incremental_analyzer)
+            flask_app.mood_analyzer.ai_provider = 'openai'
+            first = client.post('/api/analyze-batch', json=body).get_json()
+            first_calls = upstream.counts.get('openai', 0)
+            second = client.post('/api/analyze-batch', json=body).get_json()
+    finally:
+        Config.INCREMENTAL_ANALYSIS, Config.AI_BATCH_WAIT = incremental, batch_wait
+        flask_app.mood_analyzer.ai_provider = provider
+
+    assert all(r['success'] for r in first['results'] + second['results'])
+    assert first_calls == 1  # four playlists, one model call
+    assert upstream.counts['openai'] == 1  # second run served from the saved state
+    assert flask_app.incremental_analyzer.counts['unchanged'] == unchanged_before + 4
+    assert [r['analysis'] for r in second['results']] == [r['analysis'] for r in first['results']]
+    print("✅ Batched AI requests go through incremental analysis")
+
+def test_ai_batch_size_validated():
+    """ai_batch_size must be an integer of at least 1 and is capped at max_workers"""
+    import app as flask_app
+    client = flask_app.app.test_client()
+    urls = ['https://open.spotify.com/playlist/abc']
+
+    for value in ('abc', None, 0, -1, True, [4]):
+        response = client.post('/api/analyze-batch', json={'playlist_urls': urls, 'ai_batch_size': value})
+        assert response.status_code == 400, value
+        assert 'ai_batch_size' in response.get_json()['error']
+
+    assert flask_app.ai_batch_size_for({'ai_batch_size': 10}, BatchExecutor(max_workers=3)) == 3
+    assert flask_app.ai_batch_size_for({'ai_batch_size': '2'}, BatchExecutor(max_workers=3)) == 2
+    assert flask_app.ai_batch_size_for({}, BatchExecutor(max_workers=3)) == min(Config.AI_BATCH_SIZE, 3)
+    print("✅ ai_batch_size validated and capped at max_workers")
+
+def main():
+    print("🧪 Testing Batched AI Suggestions")
+    print("=" * 40)
+    test_one_call_for_many_playlists()
+    test_malformed_reply_is_split_and_retried()
+    test_missing_entry_falls_back_and_cache_is_shared()
+    test_batch_endpoint_keeps_incremental_state()
+    test_ai_batch_size_validated()
+    print("\n✅ All AI batching tests passed!")
+
+if __name__ == "__main__":
+    main()
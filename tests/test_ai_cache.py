@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test that AI mood suggestions are cached by playlist content
+"""
+
+from mood_analyzer import MoodAnalyzer
+
+class CountingGeminiModel:
+    """Mock Gemini model that counts how often it is called"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+
+        class MockResponse:
+            text = '{"suggestions": [{"mood": "calming", "confidence": 0.9, "reasoning": "Soft piano"}], "overall_assessment": "Calm"}'
+
+        return MockResponse()
+
+def make_playlist(name):
+    return {
+        'playlist_info': {'id': 'abc', 'name': name, 'description': 'Quiet piano'},
+        'total_tracks': 2,
+        'tracks': [
+            {'id': 't1', 'name': 'Nocturne', 'artists': ['Chopin'], 'audio_features': {'energy': 0.1, 'valence': 0.2}},
+            {'id': 't2', 'name': 'Gymnopedie', 'artists': ['Satie'], 'audio_features': {'energy': 0.05, 'valence': 0.3}}
+        ]
+    }
+
+def make_analyzer():
+    analyzer = MoodAnalyzer()
+    analyzer.ai_provider = 'gemini'
+    analyzer.openai_available = False
+    analyzer.gemini_available = True
+    analyzer.gemini_model = CountingGeminiModel()
+    analyzer.suggestion_cache.clear()
+    return analyzer
+
+def test_repeat_analysis_uses_cache():
+    """The same playlist content only reaches the provider once"""
+    analyzer = make_analyzer()
+
+    first = analyzer.get_ai_mood_suggestions_with_fallback(make_playlist('Peaceful Piano'))
+    second = analyzer.get_ai_mood_suggestions_with_fallback(make_playlist('Peaceful Piano'))
+
+    assert first == second
+    assert analyzer.gemini_model.calls == 1
+    assert analyzer.suggestion_cache.stats()['hits'] == 1
+    print("✅ Repeat analysis served from cache")
+
+def test_changed_content_misses_cache():
+    """A different playlist name produces a different fingerprint"""
+    analyzer = make_analyzer()
+
+    analyzer.get_ai_mood_suggestions_with_fallback(make_playlist('Peaceful Piano'))
+    analyzer.get_ai_mood_suggestions_with_fallback(make_playlist('Sleepy Piano'))
+
+    assert analyzer.gemini_model.calls == 2
+    print("✅ Changed playlist content calls the provider again")
+
+def main():
+    print("🧪 Testing AI Suggestion Cache")
+    print("=" * 40)
+    test_repeat_analysis_uses_cache()
+    test_changed_content_misses_cache()
+    print("\n✅ All AI cache tests passed!")
+
+if __name__ == "__main__":
+    main()
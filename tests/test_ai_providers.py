@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the AI provider registry and the shared provider event loop
+"""
+
+import asyncio
+import threading
+import time
+from ai_providers import PROVIDERS, AIProvider, provider_loop, register_provider
+from benchmarks import synthetic
+from benchmarks.fake_services import FakeUpstream, connect
+from mood_analyzer import MoodAnalyzer
+from spotify_client import SpotifyClient
+
+PLAYLIST = {
+    'playlist_info': {'id': 'p1', 'name': 'Provider Test', 'description': ''},
+    'total_tracks': 1,
+    'tracks': [{'id': 't1', 'name': 'Song', 'artists': ['Artist'], 'audio_features': {}}]
+}
+
+class EchoProvider(AIProvider):
+    """Answers every prompt with one mood after a short non-blocking wait"""
+    name = 'echo'
+    label = 'Echo'
+
+    def is_configured(self):
+        return True
+
+    async def acomplete(self, prompt, max_tokens=None):
+        await asyncio.sleep(0.2)
+        return '{"suggestions": [{"mood": "euphoric", "confidence": 0.9, "reasoning": "echo"}], "overall_assessment": "echo"}'
+
+def test_registered_provider_joins_fallback_chain():
+    """A newly registered provider is picked up by name, with its own breaker, and no analyzer changes"""
+    register_provider(EchoProvider)
+    try:
+        analyzer = MoodAnalyzer()
+        analyzer.ai_provider = 'echo,openai'
+        analyzer.suggestion_cache.clear()
+
+        assert analyzer.configured_providers() == ['echo']
+        assert 'echo' in analyzer.breakers
+        result = analyzer.get_ai_mood_suggestions_with_fallback(PLAYLIST)
+    finally:
+        del PROVIDERS['echo']
+
+    assert result['suggestions'][0]['mood'] == 'euphoric'
+    assert analyzer.breakers['echo'].stats()['state'] == 'closed'
+    print("✅ Registered provider used without touching the fallback loop")
+
+def test_concurrent_calls_share_one_loop():
+    """Calls from many request threads overlap on the provider loop instead of queueing"""
+    provider = EchoProvider()
+    replies = []
+
+    def request():
+        replies.append(provider_loop.run(provider.acomplete('prompt')))
+
+    threads = [threading.Thread(target=request) for _ in range(20)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    assert len(replies) == 20
+    assert elapsed < 1.0  # 20 x 0.2s one after another would take 4s
+    print(f"✅ 20 concurrent calls finished in {elapsed:.2f}s")
+
+def test_prompts_built_off_the_provider_loop():
+    """Prompt building and cache lookups run on the calling thread, never on the shared loop"""
+    register_provider(EchoProvider)
+    threads = []
+    try:
+        analyzer = MoodAnalyzer()
+        analyzer.ai_provider = 'echo'
+        analyzer.suggestion_cache.clear()
+        build = analyzer.build_mood_prompt
+
+        def recording_build(playlist_data):
+            threads.append(threading.current_thread().name)
+            return build(playlist_data)
+
+        analyzer.build_mood_prompt = recording_build
+        other = {**PLAYLIST, 'playlist_info': {'id': 'p2', 'name': 'Other', 'description': ''}}
+        analyzer.get_ai_mood_suggestions_with_fallback(PLAYLIST)
+        analyzer.get_batched_ai_suggestions([PLAYLIST, other], 2)
+        provider_loop.run(analyzer.suggest({**other, 'playlist_info': {'id': 'p3', 'name': 'Third'}}))
+    finally:
+        del PROVIDERS['echo']
+
+    assert len(threads) == 4
+    assert 'ai-provider-loop' not in threads
+    print("✅ Prompts built off the provider loop")
+
+def test_local_provider_against_fake_server():
+    """The local provider speaks the OpenAI API to a configurable base URL"""
+    spotify = SpotifyClient()
+    analyzer = MoodAnalyzer()
+    analyzer.ai_provider = 'local'
+    analyzer.suggestion_cache.clear()
+
+    with FakeUpstream() as upstream:
+        connect(spotify, analyzer, upstream)
+        result = analyzer.get_ai_mood_suggestions_with_fallback(synthetic.playlist_data(20))
+
+    assert analyzer.configured_providers() == ['local']
+    assert result['suggestions'] and 'error' not in result
+    assert upstream.counts['openai'] == 1
+    print("✅ Local provider answered through the OpenAI-compatible API")
+
+def main():
+    print("🧪 Testing AI Providers")
+    print("=" * 40)
+    test_registered_provider_joins_fallback_chain()
+    test_concurrent_calls_share_one_loop()
+    test_prompts_built_off_the_provider_loop()
+    test_local_provider_against_fake_server()
+    print("\n✅ All AI provider tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test the bounded batch executor used by /api/analyze-batch
+"""
+
+import time
+import threading
+from batch_executor import BatchExecutor, ItemTimeoutError, MicroBatcher
+
+def test_preserves_order():
+    """Results come back in input order even when later items finish first"""
+    executor = BatchExecutor(max_workers=4, item_timeout=5, mode='threaded')
+    delays = [0.2, 0.05, 0.1, 0.0]
+
+    def work(delay):
+        time.sleep(delay)
+        return delay * 10
+
+    results = list(executor.map(work, delays))
+    assert [item for item, _, _ in results] == delays
+    assert [result for _, result, _ in results] == [d * 10 for d in delays]
+    print("✅ Order preserved")
+
+def test_runs_in_parallel_with_cap():
+    """No more than max_workers items run at the same time"""
+    executor = BatchExecutor(max_workers=3, item_timeout=5, mode='threaded')
+    lock = threading.Lock()
+    running = {'now': 0, 'peak': 0}
+
+    def work(item):
+        with lock:
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+        time.sleep(0.05)
+        with lock:
+            running['now'] -= 1
+        return item
+
+    start = time.monotonic()
+    list(executor.map(work, range(9)))
+    elapsed = time.monotonic() - start
+
+    assert running['peak'] == 3
+    assert elapsed < 9 * 0.05
+    print(f"✅ Peak concurrency {running['peak']}, {elapsed:.2f}s for 9 items")
+
+def test_per_item_errors_and_timeouts():
+    """A failing or slow item is reported without affecting the others"""
+    executor = BatchExecutor(max_workers=2, item_timeout=0.1, mode='threaded')
+
+    def work(item):
+        if item == 'boom':
+            raise ValueError('bad playlist')
+        if item == 'slow':
+            time.sleep(0.5)
+        return item.upper()
+
+    results = list(executor.map(work, ['a', 'boom', 'slow', 'b']))
+
+    assert results[0] == ('a', 'A', None)
+    assert isinstance(results[1][2], ValueError)
+    assert isinstance(results[2][2], ItemTimeoutError)
+    assert results[3] == ('b', 'B', None)
+    print("✅ Errors and timeouts reported per item")
+
+def test_sequential_mode():
+    """Sequential mode keeps the original one-at-a-time behaviour"""
+    executor = BatchExecutor(max_workers=4, mode='sequential')
+    seen = []
+
+    def work(item):
+        seen.append(threading.current_thread().name)
+        return item
+
+    list(executor.map(work, [1, 2, 3]))
+    assert set(seen) == {threading.current_thread().name}
+    print("✅ Sequential mode runs on the calling thread")
+
+def test_as_completed_order_and_timeouts():
+    """as_completed yields fast items first and reports timeouts with their index"""
+    executor = BatchExecutor(max_workers=3, item_timeout=0.2, mode='threaded')
+    delays = {'slow': 0.1, 'fast': 0.0, 'stuck': 1.0}
+
+    def work(item):
+        time.sleep(delays[item])
+        return item
+
+    results = list(executor.as_completed(work, ['slow', 'fast', 'stuck']))
+
+    assert [index for index, _, _, _ in results] == [1, 0, 2]
+    assert isinstance(results[2][3], ItemTimeoutError)
+    print("✅ as_completed streams results in completion order")
+
+def test_micro_batcher_groups_workers():
+    """Items submitted by parallel workers share calls; skipped items don't hold a group back"""
+    executor = BatchExecutor(max_workers=4, item_timeout=5, mode='threaded')
+    groups = []
+    batcher = MicroBatcher(lambda items: groups.append(list(items)) or [item * 10 for item in items],
+                           max_size=4, expected=6, max_wait=5)
+
+    def work(item):
+        if item % 3 == 0:
+            batcher.skip()  # e.g. an unchanged playlist that needs no AI call
+            return None
+        return batcher.submit(item)
+
+    start = time.monotonic()
+    results = [result for _, result, _ in executor.map(work, range(6))]
+
+    assert results == [None, 10, 20, None, 40, 50]
+    assert sorted(sum(groups, [])) == [1, 2, 4, 5] and len(groups) <= 2
+    assert time.monotonic() - start < 1  # never waited out max_wait
+    print(f"✅ 4 items answered in {len(groups)} call(s)")
+
+def test_micro_batcher_call_within_item_timeout():
+    """A slow grouped call counts against each item's timeout"""
+    executor = BatchExecutor(max_workers=2, item_timeout=0.2, mode='threaded')
+    batcher = MicroBatcher(lambda items: time.sleep(0.5) or items, max_size=2, expected=2, max_wait=0.05)
+
+    results = list(executor.map(batcher.submit, ['a', 'b']))
+    assert all(isinstance(error, ItemTimeoutError) for _, _, error in results)
+    print("✅ Grouped call bounded by the per-item timeout")
+
+def test_batch_endpoint_rejects_bad_options():
+    """Invalid max_workers, timeout or mode values get a 400 instead of a 500"""
+    import app as flask_app
+    client = flask_app.app.test_client()
+    urls = ['https://open.spotify.com/playlist/abc']
+
+    for options in ({'max_workers': 'abc'}, {'max_workers': 0}, {'max_workers': -2}, {'max_workers': None},
+                    {'timeout': 'soon'}, {'timeout': -1}, {'mode': 'parallel'}):
+        response = client.post('/api/analyze-batch', json={'playlist_urls': urls, **options})
+        assert response.status_code == 400, options
+        assert response.get_json()['error']
+    print("✅ Bad batch options rejected with 400")
+
+def main():
+    print("🧪 Testing Batch Executor")
+    print("=" * 40)
+    test_preserves_order()
+    test_runs_in_parallel_with_cap()
+    test_per_item_errors_and_timeouts()
+    test_sequential_mode()
+    test_as_completed_order_and_timeouts()
+    test_micro_batcher_groups_workers()
+    test_batch_endpoint_rejects_bad_options()
+    test_micro_batcher_call_within_item_timeout()
+    print("\n✅ All batch executor tests passed!")
+
+if __name__ == "__main__":
+    main()
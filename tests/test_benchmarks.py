@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the benchmark harness and its local Spotify/OpenAI stand-ins
+"""
+
+import json
+import os
+import tempfile
+from benchmarks import run_benchmarks, synthetic
+from benchmarks.fake_services import FakeUpstream, connect
+from incremental import IncrementalAnalyzer
+from mood_analyzer import MoodAnalyzer
+from spotify_client import SpotifyClient
+
+def test_synthetic_playlists_are_deterministic():
+    """Same size and seed give the same tracks and features; a different seed does not"""
+    first = synthetic.playlist_data(120, seed=1)
+    again = synthetic.playlist_data(120, seed=1)
+    other = synthetic.playlist_data(120, seed=2)
+
+    assert first == again
+    assert first['total_tracks'] == 120
+    assert [t['id'] for t in first['tracks']] != [t['id'] for t in other['tracks']]
+    print("✅ Synthetic playlists are deterministic")
+
+def test_clients_round_trip_through_fake_upstream():
+    """SpotifyClient and the OpenAI path work unchanged against the local stand-in"""
+    spotify = SpotifyClient()
+    analyzer = MoodAnalyzer()
+    analyzer.ai_provider = 'openai'
+
+    with FakeUpstream() as upstream:
+        connect(spotify, analyzer, upstream)
+        playlist_data = spotify.analyze_playlist(synthetic.playlist_url(250))
+        result = analyzer.combine_analysis(playlist_data)
+
+    assert playlist_data['total_tracks'] == 250
+    assert all(track['audio_features'] for track in playlist_data['tracks'])
+    assert upstream.counts['spotify_playlist_tracks'] == 3
+    assert upstream.counts['openai'] == 1
+    assert result['final_recommendations']
+    print("✅ Clients round-trip through the fake upstream")
+
+def test_incremental_states_stay_in_memory():
+    """connect() keeps playlist states out of INCREMENTAL_STATE_DB and the benchmark setup clears them"""
+    spotify = SpotifyClient()
+    analyzer = MoodAnalyzer()
+    analyzer.ai_provider = 'none'
+
+    with tempfile.TemporaryDirectory() as directory:
+        incremental = IncrementalAnalyzer(spotify, analyzer, db_path=os.path.join(directory, 'state.db'))
+        with FakeUpstream() as upstream:
+            connect(spotify, analyzer, upstream, incremental)
+            incremental.analyze(synthetic.playlist_url(10))
+            assert not incremental.states.stats()['persistent'] and incremental.states.stats()['size'] == 1
+
+            targets, _ = run_benchmarks.benchmark_targets(spotify, analyzer, None, True, incremental)
+            setups = {name: setup for name, _, setup in targets}
+            setups['api./api/analyze']()  # cleared even with warm=True
+            assert incremental.states.stats()['size'] == 0
+            incremental.analyze(synthetic.playlist_url(10))
+
+        assert incremental.stats()['full'] == 2 and incremental.stats()['unchanged'] == 0
+    print("✅ Incremental states kept in memory and cleared between iterations")
+
+def test_save_and_compare():
+    """A saved run can be compared against, with a generous threshold passing"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.json')
+        args = ['--sizes', '10', '--iterations', '1', '--only', 'mood.']
+        assert run_benchmarks.main(args + ['--save', path]) == 0
+
+        with open(path) as f:
+            saved = json.load(f)
+        names = {r['name'] for r in saved['results']}
+        assert names == {'mood.analyze_playlist_mood', 'mood.combine_analysis'}
+        assert all(r['p50_ms'] > 0 and r['peak_memory_mb'] >= 0 for r in saved['results'])
+
+        assert run_benchmarks.main(args + ['--compare', path, '--threshold', '100']) == 0
+    print("✅ Results saved and compared")
+
+def main():
+    print("🧪 Testing Benchmark Harness")
+    print("=" * 40)
+    test_synthetic_playlists_are_deterministic()
+    test_clients_round_trip_through_fake_upstream()
+    test_incremental_states_stay_in_memory()
+    test_save_and_compare()
+    print("\n✅ All benchmark harness tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the LRU/TTL cache used for audio features
+"""
+
+import os
+import time
+import tempfile
+from cache import LRUCache
+
+def test_lru_eviction():
+    """The least recently used entry is evicted when the cache is full"""
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+    print("✅ LRU eviction works")
+
+def test_ttl_expiry():
+    """Entries older than the TTL are treated as misses"""
+    cache = LRUCache(maxsize=10, ttl=0.05)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.1)
+    assert cache.get('a') is None
+    print("✅ TTL expiry works")
+
+def test_hit_miss_counters():
+    """get_many counts a hit or miss per requested key"""
+    cache = LRUCache(maxsize=10)
+    cache.set_many({'a': 1, 'b': 2})
+    found = cache.get_many(['a', 'b', 'c'])
+
+    assert found == {'a': 1, 'b': 2}
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 1
+    print(f"✅ Counters: {stats}")
+
+def test_sqlite_persistence():
+    """Values written to the SQLite store survive a new cache instance"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cache.db')
+        LRUCache(maxsize=10, db_path=db_path).set('track1', {'energy': 0.8})
+
+        cache = LRUCache(maxsize=10, db_path=db_path)
+        assert cache.get('track1') == {'energy': 0.8}
+        assert cache.stats()['disk_hits'] == 1
+    print("✅ SQLite persistence works")
+
+def main():
+    print("🧪 Testing LRU Cache")
+    print("=" * 40)
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_hit_miss_counters()
+    test_sqlite_persistence()
+    print("\n✅ All cache tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test the AI provider circuit breaker
+"""
+
+import time
+from circuit_breaker import CircuitBreaker
+from mood_analyzer import MoodAnalyzer
+from tests.fakes import StubProvider
+
+PLAYLIST = {
+    'playlist_info': {'id': 'p1', 'name': 'Breaker Test', 'description': ''},
+    'total_tracks': 1,
+    'tracks': [{'id': 't1', 'name': 'Song', 'artists': ['Artist'], 'audio_features': {}}]
+}
+
+def test_opens_after_error_rate_reached():
+    """Failures past the threshold open the breaker and reject calls"""
+    breaker = CircuitBreaker('openai', window=10, min_calls=4, error_rate=0.5, cooldown=60)
+
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == 'closed'  # not enough calls yet
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow_request()
+    assert breaker.stats()['rejected'] == 1
+    print("✅ Breaker opens once the error rate is reached")
+
+def test_half_open_probe_closes_on_success():
+    """After the cooldown one probe goes through and a success closes the breaker"""
+    breaker = CircuitBreaker('gemini', window=5, min_calls=2, error_rate=0.5, cooldown=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.state == 'half_open'
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow_request()
+    print("✅ Successful probe closes the breaker")
+
+def test_half_open_probe_reopens_on_failure():
+    """A failed probe opens the breaker for another cooldown"""
+    breaker = CircuitBreaker('openai', window=5, min_calls=1, error_rate=1.0, cooldown=0.05)
+    breaker.record_failure()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == 'open'
+    assert breaker.stats()['times_opened'] == 2
+    print("✅ Failed probe reopens the breaker")
+
+def test_analyzer_skips_open_provider():
+    """Once OpenAI's breaker opens, requests go straight to Gemini"""
+    openai_calls = []
+
+    async def failing_openai(playlist_data, prompt):
+        openai_calls.append(1)
+        raise Exception('quota exceeded')
+
+    async def gemini(playlist_data, prompt):
+        return {'suggestions': [{'mood': 'calming', 'confidence': 0.8, 'reasoning': 'test'}]}
+
+    analyzer = MoodAnalyzer()
+    analyzer.ai_provider = 'openai,gemini'
+    analyzer.hedge_mode = 'off'
+    analyzer.suggestion_cache.clear()
+    analyzer.breakers['openai'] = CircuitBreaker('openai', window=4, min_calls=2, error_rate=0.5, cooldown=60)
+    analyzer.providers['openai'] = StubProvider('openai', failing_openai)
+    analyzer.providers['gemini'] = StubProvider('gemini', gemini)
+
+    for _ in range(2):
+        analyzer.suggestion_cache.clear()
+        analyzer.get_ai_mood_suggestions_with_fallback(PLAYLIST)
+    assert len(openai_calls) == 2
+    assert analyzer.breakers['openai'].state == 'open'
+
+    analyzer.suggestion_cache.clear()
+    result = analyzer.get_ai_mood_suggestions_with_fallback(PLAYLIST)
+    assert result['suggestions'][0]['mood'] == 'calming'
+    assert len(openai_calls) == 2
+    print("✅ Open provider is skipped without a call")
+
+def main():
+    print("🧪 Testing Circuit Breaker")
+    print("=" * 40)
+    test_opens_after_error_rate_reached()
+    test_half_open_probe_closes_on_success()
+    test_half_open_probe_reopens_on_failure()
+    test_analyzer_skips_open_provider()
+    print("\n✅ All circuit breaker tests passed!")
+
+if __name__ == "__main__":
+    main()
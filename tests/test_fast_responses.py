@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test the pluggable JSON encoder and negotiated response compression
+"""
+
+import gzip
+import json
+from datetime import date
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import parse_accept_header
+from compression import available_encodings, choose_encoding, compress
+from config import Config
+from json_provider import OrjsonProvider, json_provider_class, orjson_available
+
+PAYLOAD = {
+    'playlist_info': {'id': 'p1', 'name': 'Café Müller', 'created': date(2024, 1, 2)},
+    'final_recommendations': [{'mood': 'calming', 'confidence': 0.84}, {'mood': 'dreamy', 'confidence': 0.4}]
+}
+
+def test_encoders_agree():
+    """The orjson provider decodes to exactly what the default provider produces"""
+    if not orjson_available():
+        print("⚠️  orjson not installed, skipping")
+        return
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app)
+
+    assert json.loads(fast.dumps(PAYLOAD)) == json.loads(stdlib.dumps(PAYLOAD))
+    assert list(json.loads(fast.dumps({'b': 1, 'a': 2}))) == ['a', 'b']  # keys still sorted
+    assert fast.dumps(PAYLOAD, indent=2) == stdlib.dumps(PAYLOAD, indent=2)
+    assert fast.loads(fast.dumps(PAYLOAD)) == stdlib.loads(stdlib.dumps(PAYLOAD))
+    print("✅ orjson output matches the default encoder")
+
+def test_provider_selection():
+    """JSON_ENCODER picks a provider class; unknown names are rejected"""
+    assert json_provider_class('stdlib') is DefaultJSONProvider
+    assert json_provider_class('auto') is (OrjsonProvider if orjson_available() else DefaultJSONProvider)
+    try:
+        json_provider_class('simplejson')
+        raise AssertionError('unknown encoder accepted')
+    except ValueError as e:
+        assert 'simplejson' in str(e)
+    print("✅ JSON encoder selected from configuration")
+
+def test_encoding_negotiation():
+    """The first preferred encoding the client accepts wins; q=0 and unsupported encodings are skipped"""
+    preferred = ['br', 'gzip']
+    best = available_encodings()[0]
+    assert choose_encoding(parse_accept_header('gzip, deflate, br'), preferred) == best
+    assert choose_encoding(parse_accept_header('gzip, br;q=0'), preferred) == 'gzip'
+    assert choose_encoding(parse_accept_header('*'), preferred) == best
+    assert choose_encoding(parse_accept_header('gzip;q=0, *'), preferred) == ('br' if best == 'br' else None)
+    assert choose_encoding(parse_accept_header('identity'), preferred) is None
+    assert choose_encoding(parse_accept_header(''), preferred) is None
+    assert gzip.decompress(compress(b'x' * 1000, 'gzip')) == b'x' * 1000
+    print("✅ Content-Encoding negotiated")
+
+def test_api_responses_compressed():
+    """Large JSON responses are compressed for clients that accept it and left alone otherwise"""
+    import app as flask_app
+    client = flask_app.app.test_client()
+    min_size = Config.COMPRESS_MIN_SIZE
+    try:
+        Config.COMPRESS_MIN_SIZE = 100
+        plain = client.get('/api/sample-playlists')
+        zipped = client.get('/api/sample-playlists', headers={'Accept-Encoding': 'gzip'})
+        Config.COMPRESS_MIN_SIZE = 100000
+        small = client.get('/api/sample-playlists', headers={'Accept-Encoding': 'gzip'})
+    finally:
+        Config.COMPRESS_MIN_SIZE = min_size
+
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+    assert zipped.headers['Content-Encoding'] == 'gzip' and 'Accept-Encoding' in zipped.headers['Vary']
+    assert zipped.content_length == len(zipped.get_data()) < plain.content_length
+    assert json.loads(gzip.decompress(zipped.get_data())) == plain.get_json()
+    assert 'Content-Encoding' not in small.headers
+    print(f"✅ {plain.content_length}-byte response sent as {zipped.content_length} gzip bytes")
+
+def test_incompressible_response_sent_as_is():
+    """A body gzip can't shrink goes out uncompressed and never lowers the bytes-saved counter"""
+    import os
+    import app as flask_app
+    from metrics import metrics
+
+    def saved():
+        return sum(metrics.snapshot()['counters'].get('http_response_bytes_saved_total', {}).values())
+
+    before = saved()
+    with flask_app.app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        body = os.urandom(Config.COMPRESS_MIN_SIZE + 1024)
+        response = flask_app.compress_response(flask_app.app.response_class(body, mimetype='text/plain'))
+
+    assert 'Content-Encoding' not in response.headers and 'Accept-Encoding' in response.headers['Vary']
+    assert response.get_data() == body
+    assert saved() == before
+    print("✅ Incompressible body sent as it is")
+
+def main():
+    print("🧪 Testing Fast Responses")
+    print("=" * 40)
+    test_encoders_agree()
+    test_provider_selection()
+    test_encoding_negotiation()
+    test_api_responses_compressed()
+    test_incompressible_response_sent_as_is()
+    print("\n✅ All fast response tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test shared keep-alive HTTP connection pools
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib3.util.retry import Retry
+from http_pool import PooledSessions
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    throttled = 0
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        if self.path == '/throttled':
+            KeepAliveHandler.throttled += 1
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_requests_session_reuses_connections():
+    """Sequential requests through the shared session use one socket"""
+    server = start_server()
+    pools = PooledSessions(pool_size=2, pool_hosts=2)
+    try:
+        session = pools.requests_session('spotify')
+        assert pools.requests_session('spotify') is session
+
+        url = f'http://127.0.0.1:{server.server_address[1]}/'
+        for _ in range(5):
+            assert session.get(url).json() == {'ok': True}
+
+        host_stats = pools.stats()['requests_sessions']['spotify']['127.0.0.1']
+        assert host_stats['requests'] == 5
+        assert host_stats['connections_opened'] == 1
+        assert host_stats['idle_connections'] == 1
+        print(f"✅ Pool stats: {host_stats}")
+    finally:
+        server.shutdown()
+
+def test_session_survives_client_close():
+    """SDK clients closing the shared session on teardown do not drop pooled sockets"""
+    server = start_server()
+    pools = PooledSessions(pool_size=2, pool_hosts=2)
+    try:
+        session = pools.requests_session('spotify')
+        url = f'http://127.0.0.1:{server.server_address[1]}/'
+        session.get(url)
+        session.close()
+        session.get(url)
+
+        host_stats = pools.stats()['requests_sessions']['spotify']['127.0.0.1']
+        assert host_stats['connections_opened'] == 1
+        print("✅ Shared session kept its connection after close()")
+    finally:
+        server.shutdown()
+
+def test_httpx_client_counts_requests():
+    """The shared httpx client counts every request it sends"""
+    server = start_server()
+    pools = PooledSessions(pool_size=2, pool_hosts=2)
+    try:
+        client = pools.httpx_client('openai')
+        assert pools.httpx_client('openai') is client
+
+        url = f'http://127.0.0.1:{server.server_address[1]}/'
+        for _ in range(3):
+            assert client.get(url).status_code == 200
+
+        assert pools.stats()['httpx_clients']['openai']['requests'] == 3
+        print("✅ httpx pool counted 3 requests")
+    finally:
+        server.shutdown()
+
+def test_retry_after_left_to_caller():
+    """Pooled sessions return a 429 at once even when their Retry policy would honour Retry-After"""
+    server = start_server()
+    pools = PooledSessions(pool_size=2, pool_hosts=2)
+    try:
+        session = pools.requests_session('throttled', max_retries=Retry(total=3, status_forcelist=(503,)))
+        KeepAliveHandler.throttled = 0
+        response = session.get(f'http://127.0.0.1:{server.server_address[1]}/throttled')
+
+        assert response.status_code == 429 and response.headers['Retry-After'] == '1'
+        assert KeepAliveHandler.throttled == 1
+        print("✅ 429 handed back to the caller without an adapter retry")
+    finally:
+        server.shutdown()
+
+def main():
+    print("🧪 Testing HTTP Connection Pools")
+    print("=" * 40)
+    test_requests_session_reuses_connections()
+    test_session_survives_client_close()
+    test_httpx_client_counts_requests()
+    test_retry_after_left_to_caller()
+    print("\n✅ All connection pool tests passed!")
+
+if __name__ == "__main__":
+    main()
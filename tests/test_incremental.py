@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test incremental playlist re-analysis against a fake Spotify API
+"""
+
+from benchmarks.fake_services import memory_cache
+from incremental import IncrementalAnalyzer
+from mood_analyzer import MoodAnalyzer
+from tests.fakes import FakeSpotify, fake_spotify_client
+
+def make_analyzers(fake):
+    spotify = fake_spotify_client(fake)
+    analyzer = MoodAnalyzer()
+    analyzer.ai_provider = 'none'  # demo suggestions only, no network
+    incremental = IncrementalAnalyzer(spotify, analyzer, maxsize=10, ttl=0)
+    incremental.states = memory_cache(incremental.states)  # never INCREMENTAL_STATE_DB
+    return spotify, analyzer, incremental
+
+def test_unchanged_snapshot_short_circuits():
+    """Re-analysis with the same snapshot_id only fetches playlist info"""
+    fake = FakeSpotify(range(150))
+    spotify, analyzer, incremental = make_analyzers(fake)
+
+    first = incremental.analyze('spotify:playlist:abc123')
+    calls_before = dict(fake.calls)
+    second = incremental.analyze('spotify:playlist:abc123')
+
+    assert second == first
+    assert fake.calls['playlist'] == calls_before['playlist'] + 1
+    assert fake.calls['playlist_tracks'] == calls_before['playlist_tracks']
+    assert fake.calls['audio_features'] == calls_before['audio_features']
+    assert incremental.stats()['unchanged'] == 1
+    print("✅ Unchanged snapshot served from stored state")
+
+def test_changes_match_full_analysis():
+    """Adding and removing tracks gives the same mood averages as a full re-analysis"""
+    fake = FakeSpotify(range(150))
+    spotify, analyzer, incremental = make_analyzers(fake)
+    incremental.analyze('abc123')
+
+    # Drop ten tracks, add five new ones and a duplicate of an existing one
+    fake.track_numbers = [i for i in range(150) if i % 15 != 0] + [200, 201, 202, 203, 204, 3]
+    fake.snapshot_id = 'snap2'
+    fake.track_requests = []
+    updated = incremental.analyze('abc123')
+
+    assert sorted(fake.track_requests) == ['track200', 'track201', 'track202', 'track203', 'track204']
+    assert incremental.stats()['incremental'] == 1
+
+    full = analyzer.analyze_playlist_mood(spotify.analyze_playlist('abc123', pipelined=False))
+    rule_based = updated['rule_based_analysis']
+    assert rule_based['total_tracks_analyzed'] == full['total_tracks_analyzed'] == 146
+    for mood, average in full['mood_averages'].items():
+        assert abs(rule_based['mood_averages'][mood] - average) < 1e-9
+    assert [mood for mood, _ in rule_based['top_moods']] == [mood for mood, _ in full['top_moods']]
+    print("✅ Incremental update matches a full analysis")
+
+def main():
+    print("🧪 Testing Incremental Re-analysis")
+    print("=" * 40)
+    test_unchanged_snapshot_short_circuits()
+    test_changes_match_full_analysis()
+    print("\n✅ All incremental analysis tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the background job queue used for async analysis requests
+"""
+
+import time
+import threading
+from jobs import JobQueue, QueueFullError
+
+def wait_for(job_queue, job_id, timeout=2.0):
+    """Poll a job until it finishes, like an API client would"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = job_queue.get(job_id)
+        if job.status in ('completed', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def test_job_completes():
+    """A submitted job runs in the background and exposes its result"""
+    job_queue = JobQueue(workers=1, max_queued=5)
+    job = job_queue.submit('analyze', lambda x: {'mood': x}, 'calming')
+
+    finished = wait_for(job_queue, job.id)
+    assert finished.to_dict()['result'] == {'mood': 'calming'}
+    print("✅ Job completed with result")
+
+def test_job_failure_is_reported():
+    """Exceptions become a failed status with an error message"""
+    job_queue = JobQueue(workers=1, max_queued=5)
+
+    def fail():
+        raise ValueError('Could not analyze playlist')
+
+    finished = wait_for(job_queue, job_queue.submit('analyze', fail).id)
+    assert finished.status == 'failed'
+    assert finished.to_dict()['error'] == 'Could not analyze playlist'
+    print("✅ Job failure reported")
+
+def test_backpressure_when_full():
+    """Submissions beyond the queue capacity are rejected instead of piling up"""
+    job_queue = JobQueue(workers=1, max_queued=1)
+    release = threading.Event()
+
+    job_queue.submit('analyze', release.wait)   # Occupies the only worker
+    time.sleep(0.05)
+    job_queue.submit('analyze', release.wait)   # Fills the queue
+
+    try:
+        job_queue.submit('analyze', release.wait)
+        raise AssertionError("Expected QueueFullError")
+    except QueueFullError:
+        pass
+    finally:
+        release.set()
+    print("✅ Full queue rejects new jobs")
+
+def main():
+    print("🧪 Testing Job Queue")
+    print("=" * 40)
+    test_job_completes()
+    test_job_failure_is_reported()
+    test_backpressure_when_full()
+    print("\n✅ All job queue tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test that AI provider SDKs load on first use and the startup report
+"""
+
+import os
+import subprocess
+import sys
+from config import Config
+from mood_analyzer import MoodAnalyzer
+from utils.check_startup import parse_import_times
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_app_import_skips_sdks():
+    """Importing the app leaves openai, google.generativeai and httpx unimported"""
+    code = "import sys, app; print('loaded:' + ','.join(m for m in ('openai', 'google.generativeai', 'httpx') if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-500:]
+    assert result.stdout.strip().splitlines()[-1] == 'loaded:', result.stdout
+    print("✅ App import skips AI SDKs")
+
+def test_app_import_skips_numpy():
+    """With the default Python scoring engine, numpy is never imported"""
+    code = "import sys, app; print('numpy' in sys.modules)"
+    env = {**os.environ, 'SCORING_ENGINE': 'python'}
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-500:]
+    assert result.stdout.strip().splitlines()[-1] == 'False', result.stdout
+    print("✅ App import skips numpy")
+
+def test_clients_created_on_first_use():
+    """A configured provider's client is built on first access; an unconfigured one stays None"""
+    original = Config.OPENAI_API_KEY, Config.GEMINI_API_KEY
+    Config.OPENAI_API_KEY, Config.GEMINI_API_KEY = 'sk-test', 'your_gemini_api_key_here'
+    try:
+        analyzer = MoodAnalyzer()
+        analyzer.ai_provider = 'auto'
+        assert analyzer.providers['openai']._client is None
+        client = analyzer.openai_client
+        assert client is not None and analyzer.openai_client is client
+        assert analyzer.gemini_model is None and not analyzer.gemini_available
+        assert analyzer.load_providers() == ['openai']
+    finally:
+        Config.OPENAI_API_KEY, Config.GEMINI_API_KEY = original
+    print("✅ Provider clients created on first use")
+
+def test_parse_import_times():
+    """Only the import tree of the measured module is kept, with nesting depth"""
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | encodings",
+        "import time:        50 |         50 |     json.decoder",
+        "import time:       200 |        250 |   json",
+        "import time:       300 |        550 | app",
+    ])
+    entries = parse_import_times(stderr, 'app')
+    assert [(name, depth) for name, _, _, depth in entries] == [('json.decoder', 2), ('json', 1), ('app', 0)]
+    print("✅ Import timings parsed")
+
+def main():
+    print("🧪 Testing Lazy SDK Imports")
+    print("=" * 40)
+    test_app_import_skips_sdks()
+    test_app_import_skips_numpy()
+    test_clients_created_on_first_use()
+    test_parse_import_times()
+    print("\n✅ All lazy import tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test the API load-test driver against the in-process app and stand-ins
+"""
+
+import argparse
+from benchmarks import synthetic
+from benchmarks.load_test import LoadDriver, parse_mix, serve_app
+
+def test_parse_mix():
+    """Request mixes parse into weights and reject unknown request kinds"""
+    assert parse_mix('analyze=6,batch=1,info=3') == {'analyze': 6.0, 'batch': 1.0, 'info': 3.0}
+    assert parse_mix('info') == {'info': 1.0}
+    try:
+        parse_mix('delete=1')
+        assert False, 'unknown kind accepted'
+    except argparse.ArgumentTypeError:
+        pass
+    print("✅ Request mixes parsed")
+
+def test_playlist_pool_is_deterministic():
+    """The same pool arguments give the same distinct playlists"""
+    pool = synthetic.playlist_pool(20, [10, 50], seed=3)
+    assert pool == synthetic.playlist_pool(20, [10, 50], seed=3)
+    assert len(set(pool)) == 20
+    assert pool != synthetic.playlist_pool(20, [10, 50], seed=4)
+    print("✅ Playlist pool is deterministic")
+
+def test_drives_every_endpoint():
+    """A fixed number of mixed requests all succeed and are counted per endpoint"""
+    playlists = synthetic.playlist_pool(4, [10, 30])
+    with serve_app() as (base_url, upstream):
+        driver = LoadDriver(base_url, playlists, {'analyze': 1, 'batch': 1, 'info': 1}, concurrency=3, batch_size=2)
+        report = driver.run(requests_total=24)
+
+    assert report['requests'] == 24
+    assert report['errors'] == 0
+    assert set(report['endpoints']) == {'analyze', 'batch', 'info'}
+    for stats in report['endpoints'].values():
+        assert sum(bucket['count'] for bucket in stats['histogram']) == stats['requests']
+        assert stats['p50_ms'] <= stats['p99_ms']
+    assert upstream.counts['spotify_playlist'] > 0
+    print("✅ Mixed load drove every endpoint without errors")
+
+def main():
+    print("🧪 Testing Load-Test Driver")
+    print("=" * 40)
+    test_parse_mix()
+    test_playlist_pool_is_deterministic()
+    test_drives_every_endpoint()
+    print("\n✅ All load-test driver tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test latency histograms and the Prometheus text output
+"""
+
+from metrics import MetricsRegistry
+
+def test_quantiles_and_counts():
+    """Histograms track count, sum and nearest-rank percentiles"""
+    registry = MetricsRegistry()
+    for ms in range(1, 101):
+        registry.observe('stage_duration_seconds', ms / 1000, stage='llm_call', provider='openai')
+
+    stats = registry.snapshot()['histograms']['stage_duration_seconds']['{provider="openai",stage="llm_call"}']
+    assert stats['count'] == 100
+    assert stats['p50'] == 0.05
+    assert stats['p95'] == 0.095
+    assert stats['p99'] == 0.099
+    print(f"✅ Percentiles: p50={stats['p50']} p95={stats['p95']} p99={stats['p99']}")
+
+def test_prometheus_rendering():
+    """Rendered output has typed families, cumulative buckets and counters"""
+    registry = MetricsRegistry()
+    with registry.time_stage('rule_scoring'):
+        pass
+    registry.inc('http_requests_total', endpoint='/api/analyze', method='POST', status='200')
+
+    text = registry.render()
+    assert '# TYPE mood_analyzer_stage_duration_seconds histogram' in text
+    assert 'mood_analyzer_stage_duration_seconds_bucket{stage="rule_scoring",le="+Inf"} 1' in text
+    assert 'mood_analyzer_stage_duration_seconds_count{stage="rule_scoring"} 1' in text
+    assert 'mood_analyzer_http_requests_total{endpoint="/api/analyze",method="POST",status="200"} 1' in text
+    print("✅ Prometheus text rendered")
+
+def main():
+    print("🧪 Testing Metrics")
+    print("=" * 40)
+    test_quantiles_and_counts()
+    test_prometheus_rendering()
+    print("\n✅ All metrics tests passed!")
+
+if __name__ == "__main__":
+    main()
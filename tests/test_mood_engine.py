@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test that the vectorized scoring engine matches the Python rule-based engine
+"""
+
+import math
+import random
+from mood_analyzer import MoodAnalyzer
+
+FEATURE_RANGES = {
+    'acousticness': (0.0, 1.0), 'danceability': (0.0, 1.0), 'energy': (0.0, 1.0),
+    'instrumentalness': (0.0, 1.0), 'liveness': (0.0, 1.0), 'loudness': (-30.0, 0.0),
+    'speechiness': (0.0, 1.0), 'tempo': (50.0, 210.0), 'valence': (0.0, 1.0)
+}
+
+def synthetic_playlist(track_count, seed=7):
+    """Deterministic playlist with random audio features"""
+    rng = random.Random(seed)
+    tracks = []
+    for i in range(track_count):
+        features = {name: rng.uniform(lo, hi) for name, (lo, hi) in FEATURE_RANGES.items()}
+        features['mode'] = rng.randint(0, 1)
+        if i % 11 == 0:
+            del features['tempo']  # Exercise missing features
+        tracks.append({'id': f't{i}', 'name': f'Track {i}', 'artists': ['A'], 'audio_features': features})
+    tracks.append({'id': 'nofeatures', 'name': 'Local file', 'artists': ['B'], 'audio_features': {}})
+    return {'playlist_info': {'id': 'p', 'name': 'Synthetic'}, 'tracks': tracks, 'total_tracks': len(tracks)}
+
+def analyze_with(engine, playlist):
+    analyzer = MoodAnalyzer()
+    analyzer.scoring_engine = engine
+    analyzer.compile_mood_rules()
+    return analyzer.analyze_playlist_mood(playlist)
+
+def assert_scores_close(expected, actual):
+    """Same moods with scores equal to within float rounding"""
+    assert expected.keys() == actual.keys()
+    for mood, score in expected.items():
+        assert math.isclose(score, actual[mood], rel_tol=1e-9, abs_tol=1e-12), (mood, score, actual[mood])
+
+def test_engines_match():
+    """Both engines produce the same averages, top moods and per-track scores (up to float rounding)"""
+    python_playlist = synthetic_playlist(500)
+    numpy_playlist = synthetic_playlist(500)
+
+    python_result = analyze_with('python', python_playlist)
+    numpy_result = analyze_with('numpy', numpy_playlist)
+
+    assert_scores_close(python_result['mood_averages'], numpy_result['mood_averages'])
+    assert_scores_close(dict(python_result['top_moods']), dict(numpy_result['top_moods']))
+    assert [mood for mood, _ in python_result['top_moods']] == [mood for mood, _ in numpy_result['top_moods']]
+    assert python_result['total_tracks_analyzed'] == numpy_result['total_tracks_analyzed']
+    for python_track, numpy_track in zip(python_playlist['tracks'], numpy_playlist['tracks']):
+        assert_scores_close(python_track.get('mood_scores', {}), numpy_track.get('mood_scores', {}))
+    print(f"✅ Engines match: top moods {numpy_result['top_moods']}")
+
+def test_exact_match_rule():
+    """Melancholic's exact 'mode': 0 rule scores 1.0 for minor keys only"""
+    analyzer = MoodAnalyzer()
+    minor = analyzer.analyze_track_mood({'energy': 0.2, 'valence': 0.1, 'tempo': 90, 'mode': 0})
+    major = analyzer.analyze_track_mood({'energy': 0.2, 'valence': 0.1, 'tempo': 90, 'mode': 1})
+
+    assert minor['melancholic'] == 1.0
+    assert major['melancholic'] == 0.75
+    print("✅ Exact-match rule scored correctly")
+
+def test_compiled_rules_match_reference():
+    """The compiled rule table scores tracks exactly like calculate_feature_score"""
+    analyzer = MoodAnalyzer()
+    for track in synthetic_playlist(200)['tracks']:
+        features = track['audio_features']
+        expected = {}
+        for mood, config in analyzer.mood_categories.items():
+            scores = [analyzer.calculate_feature_score(features[name], feature_range)
+                      for name, feature_range in config['audio_features'].items() if name in features]
+            expected[mood] = sum(scores) / len(scores) if scores else 0.0
+        assert analyzer.analyze_track_mood(features) == expected
+    print("✅ Compiled rules match reference scoring")
+
+def test_rules_recompile_on_change():
+    """Assigning new mood categories rebuilds the compiled rules"""
+    analyzer = MoodAnalyzer()
+    analyzer.mood_categories = {'sleepy': {'keywords': ['drowsy'], 'audio_features': {'energy': (0.0, 0.1)}}}
+
+    assert analyzer.analyze_track_mood({'energy': 0.05}) == {'sleepy': 1.0}
+    print("✅ Rules recompiled after category change")
+
+def main():
+    print("🧪 Testing Vectorized Mood Engine")
+    print("=" * 40)
+    test_engines_match()
+    test_exact_match_rule()
+    test_compiled_rules_match_reference()
+    test_rules_recompile_on_change()
+    print("\n✅ All mood engine tests passed!")
+
+if __name__ == "__main__":
+    main()
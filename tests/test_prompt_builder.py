@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the compact AI mood prompt builder
+"""
+
+from prompt_builder import MAX_SAMPLE_CANDIDATES, build_mood_prompt, estimate_tokens, sample_candidates, select_sample_tracks
+from track_table import TrackTable
+
+MOODS = ['calming', 'euphoric', 'introspective', 'energetic', 'melancholic', 'romantic']
+
+def make_track(i, energy=None, valence=None):
+    track = {'id': f't{i}', 'name': f'Song {i}', 'artists': [f'Artist {i}'], 'audio_features': {}}
+    if energy is not None:
+        track['audio_features'] = {'energy': energy, 'valence': valence, 'danceability': 0.5, 'acousticness': 0.5}
+    return track
+
+def make_playlist(tracks, description=''):
+    return {
+        'playlist_info': {'id': 'p1', 'name': 'Prompt Test', 'description': description},
+        'total_tracks': len(tracks),
+        'tracks': tracks
+    }
+
+def test_sample_spans_feature_space():
+    """Samples come from the extremes of the playlist, not just the first tracks"""
+    # Twenty near-identical calm tracks, then one very energetic and one very sad track
+    tracks = [make_track(i, 0.2, 0.5) for i in range(20)]
+    tracks += [make_track(20, 0.95, 0.9), make_track(21, 0.1, 0.05)]
+
+    sample = select_sample_tracks(tracks, 3)
+    ids = {track['id'] for track in sample}
+
+    assert ids >= {'t20', 't21'}
+    assert len(sample) == 3
+    print("✅ Sample includes the outlying tracks")
+
+def test_sample_without_features_spreads_evenly():
+    """Without audio features the sample is spread through the playlist"""
+    tracks = [make_track(i) for i in range(40)]
+    sample = select_sample_tracks(tracks, 4)
+    assert [track['id'] for track in sample] == ['t0', 't10', 't20', 't30']
+    print("✅ Featureless sample spread evenly")
+
+def test_large_playlist_sampled_from_bounded_pool():
+    """Long playlists are thinned before sampling without losing their outliers"""
+    tracks = [make_track(i, 0.2 + (i % 5) / 100, 0.5) for i in range(5000)]
+    tracks[2777] = make_track(2777, 0.99, 0.95)  # off the stride, so only the extremes keep it
+    tracks[4321] = make_track(4321, 0.01, 0.02)
+    table = TrackTable.from_dicts(tracks)
+
+    pool = sample_candidates(table, table.feature_indices(), MAX_SAMPLE_CANDIDATES)
+    sample = select_sample_tracks(table, 3)
+
+    assert len(pool) <= MAX_SAMPLE_CANDIDATES and {2777, 4321} <= set(pool)
+    assert {'t2777', 't4321'} <= {track['id'] for track in sample}
+    assert select_sample_tracks(table, 3) == sample  # stable, so prompts stay cacheable
+    print(f"✅ 5000 tracks sampled from a pool of {len(pool)}")
+
+def test_prompt_lists_moods_once_and_fits_budget():
+    """The prompt names each mood once and trims sample tracks to fit the budget"""
+    tracks = [make_track(i, (i % 10) / 10, (i % 7) / 7) for i in range(200)]
+    playlist = make_playlist(tracks, description='x' * 1000)
+
+    roomy = build_mood_prompt(playlist, MOODS, token_budget=1000, max_samples=8)
+    tight = build_mood_prompt(playlist, MOODS, token_budget=200, max_samples=8)
+
+    assert roomy.count('melancholic') == 1
+    assert roomy.count('. Song ') == 8
+    assert estimate_tokens(tight) <= 200
+    assert 0 < tight.count('. Song ') < 8
+    assert 'x' * 201 not in roomy
+    print(f"✅ Prompt sizes: {estimate_tokens(roomy)} and {estimate_tokens(tight)} tokens")
+
+def main():
+    print("🧪 Testing Prompt Builder")
+    print("=" * 40)
+    test_sample_spans_feature_space()
+    test_sample_without_features_spreads_evenly()
+    test_large_playlist_sampled_from_bounded_pool()
+    test_prompt_lists_moods_once_and_fits_budget()
+    print("\n✅ All prompt builder tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test hedged and raced AI provider calls
+"""
+
+import asyncio
+import time
+from mood_analyzer import MoodAnalyzer
+from tests.fakes import StubProvider
+
+PLAYLIST = {
+    'playlist_info': {'id': 'p1', 'name': 'Hedge Test', 'description': ''},
+    'total_tracks': 1,
+    'tracks': [{'id': 't1', 'name': 'Song', 'artists': ['Artist'], 'audio_features': {}}]
+}
+
+def answer(mood):
+    return {'suggestions': [{'mood': mood, 'confidence': 0.9, 'reasoning': 'test'}], 'overall_assessment': mood}
+
+def make_analyzer(mode, delay, openai_fn, gemini_fn):
+    analyzer = MoodAnalyzer()
+    analyzer.ai_provider = 'openai,gemini'
+    analyzer.hedge_mode = mode
+    analyzer.hedge_delay = delay
+    analyzer.suggestion_cache.clear()
+    analyzer.providers['openai'] = StubProvider('openai', openai_fn)
+    analyzer.providers['gemini'] = StubProvider('gemini', gemini_fn)
+    return analyzer
+
+
+def test_hedge_uses_backup_when_primary_is_slow():
+    """A slow primary triggers the backup, whose answer wins"""
+    cancelled = []
+
+    async def slow_openai(playlist_data, prompt):
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return answer('calming')
+
+    async def gemini(playlist_data, prompt):
+        return answer('euphoric')
+
+    analyzer = make_analyzer('hedge', 0.05, slow_openai, gemini)
+
+    start = time.monotonic()
+    result = analyzer.get_ai_mood_suggestions_with_fallback(PLAYLIST)
+    elapsed = time.monotonic() - start
+
+    assert result['suggestions'][0]['mood'] == 'euphoric'
+    assert elapsed < 0.5
+    time.sleep(0.05)
+    assert cancelled == [1]  # the losing call is cancelled rather than left running
+    print(f"✅ Backup answered in {elapsed:.2f}s")
+
+def test_hedge_skips_backup_when_primary_is_fast():
+    """A fast primary answers before the hedge delay, so the backup never runs"""
+    gemini_calls = []
+
+    async def openai(playlist_data, prompt):
+        return answer('calming')
+
+    async def gemini(playlist_data, prompt):
+        gemini_calls.append(1)
+        return answer('euphoric')
+
+    analyzer = make_analyzer('hedge', 0.5, openai, gemini)
+    result = analyzer.get_ai_mood_suggestions_with_fallback(PLAYLIST)
+
+    assert result['suggestions'][0]['mood'] == 'calming'
+    assert gemini_calls == []
+    print("✅ Fast primary wins without hedging")
+
+def test_race_skips_failing_provider():
+    """In race mode a provider error does not hide the other provider's answer"""
+    async def failing_openai(playlist_data, prompt):
+        raise Exception('rate limit exceeded')
+
+    async def slow_gemini(playlist_data, prompt):
+        await asyncio.sleep(0.05)
+        return answer('romantic')
+
+    analyzer = make_analyzer('race', 0, failing_openai, slow_gemini)
+    result = analyzer.get_ai_mood_suggestions_with_fallback(PLAYLIST)
+
+    assert result['suggestions'][0]['mood'] == 'romantic'
+    print("✅ Race mode returns the surviving provider's answer")
+
+def main():
+    print("🧪 Testing Provider Hedging")
+    print("=" * 40)
+    test_hedge_uses_backup_when_primary_is_slow()
+    test_hedge_skips_backup_when_primary_is_fast()
+    test_race_skips_failing_provider()
+    print("\n✅ All hedging tests passed!")
+
+if __name__ == "__main__":
+    main()
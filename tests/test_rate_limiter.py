@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the shared Spotify rate limiter
+"""
+
+import time
+import threading
+from rate_limiter import RateLimiter
+
+def test_token_bucket_paces_calls():
+    """Calls beyond the burst wait for tokens to refill"""
+    limiter = RateLimiter(rate=50, burst=5, max_concurrency=10)
+
+    start = time.monotonic()
+    for _ in range(10):
+        with limiter.slot():
+            pass
+    elapsed = time.monotonic() - start
+
+    # 5 calls come from the burst, the other 5 at 50/s
+    assert elapsed >= 0.08
+    assert limiter.stats()['calls'] == 10
+    print(f"✅ 10 calls paced in {elapsed:.2f}s")
+
+def test_concurrency_cap():
+    """No more than the concurrency cap run at once"""
+    limiter = RateLimiter(rate=0, max_concurrency=3)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def call():
+        with limiter.slot():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 3
+    print("✅ Concurrency capped at 3")
+
+def test_throttle_backs_off_and_recovers():
+    """A 429 halves concurrency and pauses callers; successes grow it back"""
+    limiter = RateLimiter(rate=0, max_concurrency=8)
+
+    limiter.record_throttled(retry_after=0.1)
+    assert limiter.concurrency == 4
+
+    start = time.monotonic()
+    with limiter.slot():
+        pass
+    assert time.monotonic() - start >= 0.09
+
+    for _ in range(4):
+        limiter.record_success()
+    assert limiter.concurrency == 5
+    assert limiter.stats()['throttled'] == 1
+    print("✅ Throttling backs off and recovers")
+
+def main():
+    print("🧪 Testing Rate Limiter")
+    print("=" * 40)
+    test_token_bucket_paces_calls()
+    test_concurrency_cap()
+    test_throttle_backs_off_and_recovers()
+    print("\n✅ All rate limiter tests passed!")
+
+if __name__ == "__main__":
+    main()
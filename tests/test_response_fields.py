@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test field selection and compact responses for analysis endpoints
+"""
+
+import copy
+from benchmarks import synthetic
+from benchmarks.fake_services import FakeUpstream, connect
+from response_fields import COMPACT_FIELDS, parse_fields, requested_fields, select_fields
+
+ANALYSIS = {
+    'playlist_info': {'id': 'p1', 'name': 'Fields Test', 'owner': 'tester'},
+    'rule_based_analysis': {
+        'playlist_info': {'id': 'p1', 'name': 'Fields Test', 'owner': 'tester'},
+        'mood_averages': {'calming': 0.8},
+        'top_moods': [['calming', 0.8]]
+    },
+    'ai_suggestions': {'suggestions': [{'mood': 'calming', 'confidence': 0.9, 'reasoning': 'soft'}]},
+    'final_recommendations': [
+        {'mood': 'calming', 'confidence': 0.84, 'reasoning': 'soft', 'keywords': ['peaceful']},
+        {'mood': 'dreamy', 'confidence': 0.4, 'reasoning': 'hazy', 'keywords': ['ethereal']}
+    ]
+}
+
+def test_select_nested_fields():
+    """Dotted paths select keys inside nested dicts and every item of a list"""
+    original = copy.deepcopy(ANALYSIS)
+
+    selected = select_fields(ANALYSIS, parse_fields('final_recommendations.mood, playlist_info'))
+    assert selected == {
+        'playlist_info': ANALYSIS['playlist_info'],
+        'final_recommendations': [{'mood': 'calming'}, {'mood': 'dreamy'}]
+    }
+    assert select_fields(ANALYSIS, ['final_recommendations', 'final_recommendations.mood']) == {
+        'final_recommendations': ANALYSIS['final_recommendations']
+    }
+    assert ANALYSIS == original
+    print("✅ Nested fields selected without touching the analysis")
+
+def test_default_keeps_full_analysis():
+    """With no fields requested the analysis is returned unchanged, nested playlist_info included"""
+    assert select_fields(ANALYSIS) == ANALYSIS
+    assert 'playlist_info' in select_fields(ANALYSIS)['rule_based_analysis']
+    assert requested_fields({}, {}) is None and requested_fields({'compact': 'false'}, {}) is None
+    print("✅ Full analysis returned by default")
+
+def test_request_parsing():
+    """Query string wins over the body; compact maps to COMPACT_FIELDS; typos are rejected"""
+    assert requested_fields({'fields': 'final_recommendations'}, {'fields': ['ai_suggestions']}) == ['final_recommendations']
+    assert requested_fields({}, {'include': ['ai_suggestions']}) == ['ai_suggestions']
+    assert requested_fields({'compact': '1'}, {}) == list(COMPACT_FIELDS)
+    assert requested_fields({'compact': 'false'}, {}) is None
+    assert requested_fields({}, {}) is None
+    try:
+        parse_fields('final_recomendations')
+        raise AssertionError('unknown field accepted')
+    except ValueError as e:
+        assert 'final_recomendations' in str(e)
+    for value in (5, {'final_recommendations': True}):
+        try:
+            parse_fields(value)
+            raise AssertionError(f'{value!r} accepted as fields')
+        except ValueError:
+            pass
+    print("✅ Field requests parsed")
+
+def test_endpoints_apply_fields():
+    """/api/analyze and /api/analyze-batch return only the requested fields"""
+    import app as flask_app
+    client = flask_app.app.test_client()
+    url = synthetic.playlist_url(30, seed=41)
+
+    with FakeUpstream() as upstream:
+        connect(flask_app.spotify_client, flask_app.mood_analyzer, upstream, flask_app.incremental_analyzer)
+        full = client.post('/api/analyze', json={'playlist_url': url}).get_json()['analysis']
+        compact = client.post('/api/analyze?compact=1', json={'playlist_url': url}).get_json()['analysis']
+        batch = client.post('/api/analyze-batch', json={
+            'playlist_urls': [url], 'fields': ['final_recommendations.mood']
+        }).get_json()
+        bad = client.post('/api/analyze?fields=tracks', json={'playlist_url': url})
+        wrong_type = client.post('/api/analyze-batch', json={'playlist_urls': [url], 'fields': 5})
+
+    assert set(full) == {'playlist_info', 'rule_based_analysis', 'ai_suggestions', 'final_recommendations'}
+    assert full['rule_based_analysis']['playlist_info'] == full['playlist_info']
+    assert set(compact) == {'playlist_info', 'final_recommendations'}
+    assert set(compact['playlist_info']) == {'id', 'name'}
+    assert all(set(r) == {'mood', 'confidence'} for r in compact['final_recommendations'])
+    assert batch['results'][0]['analysis'] == {
+        'final_recommendations': [{'mood': r['mood']} for r in full['final_recommendations']]
+    }
+    assert bad.status_code == 400
+    assert wrong_type.status_code == 400
+    print("✅ Endpoints return the requested fields")
+
+def main():
+    print("🧪 Testing Response Fields")
+    print("=" * 40)
+    test_select_nested_fields()
+    test_default_keeps_full_analysis()
+    test_request_parsing()
+    test_endpoints_apply_fields()
+    print("\n✅ All response field tests passed!")
+
+if __name__ == "__main__":
+    main()
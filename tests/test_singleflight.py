@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test request coalescing for concurrent identical analyses
+"""
+
+import time
+import threading
+from singleflight import SingleFlight
+
+def run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_concurrent_calls_share_one_execution():
+    """Callers arriving while a key is in flight get the leader's result"""
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def analyze(playlist_id):
+        calls.append(playlist_id)
+        time.sleep(0.1)
+        return {'playlist': playlist_id}
+
+    run_concurrently(8, lambda: results.append(flight.do('37i9dQZF1DX4sWSpwABIL4', analyze, '37i9dQZF1DX4sWSpwABIL4')))
+
+    assert len(calls) == 1
+    assert results == [{'playlist': '37i9dQZF1DX4sWSpwABIL4'}] * 8
+    assert flight.stats()['coalesced'] == 7
+    print(f"✅ 8 callers, 1 execution: {flight.stats()}")
+
+def test_errors_are_shared_and_not_cached():
+    """Followers see the leader's exception, and the next call runs again"""
+    flight = SingleFlight()
+    errors = []
+
+    def fail():
+        time.sleep(0.05)
+        raise RuntimeError('rate limit')
+
+    def call():
+        try:
+            flight.do('key', fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    run_concurrently(3, call)
+    assert errors == ['rate limit'] * 3
+    assert flight.do('key', lambda: 'ok') == 'ok'
+    print("✅ Errors shared, nothing cached afterwards")
+
+def main():
+    print("🧪 Testing Single-Flight Coalescing")
+    print("=" * 40)
+    test_concurrent_calls_share_one_execution()
+    test_errors_are_shared_and_not_cached()
+    print("\n✅ All single-flight tests passed!")
+
+if __name__ == "__main__":
+    main()
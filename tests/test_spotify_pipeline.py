@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test pipelined playlist fetching against a fake Spotify API
+"""
+
+from benchmarks import synthetic
+from benchmarks.fake_services import FakeUpstream, connect
+from mood_analyzer import MoodAnalyzer
+from rate_limiter import RateLimiter
+from spotify_client import SpotifyClient
+from tests.fakes import FakeSpotify, fake_spotify_client
+
+def test_pipelined_matches_serial():
+    """Pipelined and serial fetches return identical playlist data"""
+    serial = fake_spotify_client(FakeSpotify(range(1050))).analyze_playlist('spotify:playlist:abc123', pipelined=False)
+
+    client = fake_spotify_client(FakeSpotify(range(1050)))
+    pipelined = client.analyze_playlist('spotify:playlist:abc123', pipelined=True)
+
+    assert serial == pipelined
+    assert pipelined['total_tracks'] == 1050
+    assert pipelined['total_with_features'] == 1050
+    assert [t['id'] for t in pipelined['tracks']] == [f'track{i}' for i in range(1050)]
+    assert client.sp.calls['next'] == 0
+    assert client.sp.calls['playlist_tracks'] == 11
+    assert client.sp.calls['audio_features'] == 11
+    print("✅ Pipelined fetch matches serial fetch for 1050 tracks")
+
+def test_pipelined_single_page():
+    """Small playlists need only one page request"""
+    client = fake_spotify_client(FakeSpotify(range(12)))
+    data = client.analyze_playlist('abc123', pipelined=True)
+
+    assert data['total_tracks'] == 12
+    assert client.sp.calls['playlist_tracks'] == 1
+    print("✅ Single-page playlist fetched with one request")
+
+def test_audio_feature_cache():
+    """Repeat analyses only request audio features for unseen tracks"""
+    client = fake_spotify_client(FakeSpotify(range(250)))
+    client.analyze_playlist('abc123', pipelined=True)
+    assert client.sp.calls['audio_features'] == 3
+
+    client.sp = FakeSpotify(range(300))
+    data = client.analyze_playlist('abc123', pipelined=True)
+    assert data['total_with_features'] == 300
+    assert client.sp.calls['audio_features'] == 1  # Only the page with tracks 250-299 had misses
+    print(f"✅ Feature cache stats: {client.feature_cache.stats()}")
+
+def test_rate_limited_call_is_retried():
+    """A 429 over HTTP reaches the rate limiter once, is retried after Retry-After and shrinks concurrency"""
+    client = SpotifyClient()
+    throttled_before = client.rate_limiter.stats()['throttled']
+
+    with FakeUpstream() as upstream:
+        connect(client, MoodAnalyzer(), upstream)
+        upstream.throttle(1, retry_after=0)
+        info = client.get_playlist_info(synthetic.playlist_id(5))
+
+    assert info and info['total_tracks'] == 5
+    # The HTTP adapter must hand the 429 straight back instead of retrying it behind the limiter
+    assert upstream.counts['spotify_throttled'] == 1
+    assert upstream.counts['spotify_playlist'] == 1
+    assert client.rate_limiter.stats()['throttled'] == throttled_before + 1
+    print("✅ Rate-limited call retried after Retry-After")
+
+def test_server_errors_are_not_throttles():
+    """5xx responses that outlast the adapter's retries fail the call without backing off the rate limiter"""
+    client = SpotifyClient()
+    client.rate_limiter = RateLimiter(rate=1000, burst=20, max_concurrency=8)
+    before = client.rate_limiter.stats()
+
+    with FakeUpstream() as upstream:
+        connect(client, MoodAnalyzer(), upstream)
+        upstream.fail(100)
+        info = client.get_playlist_info(synthetic.playlist_id(5))
+
+    after = client.rate_limiter.stats()
+    assert info is None
+    assert upstream.counts['spotify_failed'] == 4  # one request plus three adapter retries, never repeated
+    assert after['throttled'] == before['throttled'] == 0
+    assert after['concurrency'] == before['concurrency'] and after['blocked_for'] == 0
+    assert after['tokens'] >= before['tokens'] - 1  # one limiter slot, bucket not drained
+    print("✅ Spotify outage reported as an error, not a throttle")
+
+def main():
+    print("🧪 Testing Pipelined Playlist Fetch")
+    print("=" * 40)
+    test_pipelined_matches_serial()
+    test_pipelined_single_page()
+    test_audio_feature_cache()
+    test_rate_limited_call_is_retried()
+    test_server_errors_are_not_throttles()
+    print("\n✅ All pipeline tests passed!")
+
+if __name__ == "__main__":
+    main()
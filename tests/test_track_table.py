@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the columnar track table used from Spotify fetch through mood scoring
+"""
+
+import copy
+import json
+from benchmarks import synthetic
+from mood_analyzer import MoodAnalyzer
+from track_table import TrackTable
+
+def track_dicts(count):
+    """Track dicts in the get_playlist_tracks shape, a few without audio features"""
+    tracks = synthetic.playlist_data(count, seed=3)['tracks'].to_dicts()
+    for track in tracks[::9]:
+        track['audio_features'] = {}
+    del tracks[1]['audio_features']['tempo']
+    return tracks
+
+def test_round_trips_track_dicts():
+    """Dicts come back out exactly as they went in, integer features included"""
+    tracks = track_dicts(40)
+    table = TrackTable.from_dicts(tracks)
+
+    assert len(table) == 40
+    assert table.to_dicts() == tracks
+    assert table[1] == tracks[1] and 'tempo' not in table[1]['audio_features']
+    assert isinstance(table[2]['audio_features']['mode'], int)
+    assert table[-1] == tracks[-1] and table[5:8] == tracks[5:8]
+    assert table.feature_count() == sum(1 for track in tracks if track['audio_features'])
+    print("✅ Track dicts round-trip through the table")
+
+def test_tracks_without_ids():
+    """Local and unavailable tracks with a None or missing id are kept, as the list path kept them"""
+    tracks = track_dicts(5)
+    tracks[1]['id'] = None
+    del tracks[3]['id']
+    table = TrackTable.from_dicts(tracks)
+
+    assert len(table) == 5
+    assert table[1]['id'] is None and table[3]['id'] is None
+    assert table[3]['name'] == tracks[3]['name']
+    assert not MoodAnalyzer().analyze_playlist_mood({'playlist_info': {'id': 'p'}, 'tracks': table}).get('error')
+    print("✅ Tracks without ids kept")
+
+def test_scoring_matches_track_dicts():
+    """Both engines score a table exactly as they score the equivalent track dicts"""
+    for engine in ('python', 'numpy'):
+        analyzer = MoodAnalyzer()
+        analyzer.scoring_engine = engine
+        analyzer.compile_mood_rules()
+
+        tracks = track_dicts(300)
+        table = TrackTable.from_dicts(copy.deepcopy(tracks))
+        from_dicts = analyzer.analyze_playlist_mood({'playlist_info': {'id': 'p'}, 'tracks': tracks})
+        from_table = analyzer.analyze_playlist_mood({'playlist_info': {'id': 'p'}, 'tracks': table})
+
+        assert from_dicts == from_table
+        assert [track.get('mood_scores') for track in tracks] == [track.get('mood_scores') for track in table]
+        assert table[0].get('mood_scores') is None  # no audio features, so not scored
+    print("✅ Table scoring matches dict scoring for both engines")
+
+def test_state_survives_json():
+    """to_state is JSON-serializable and restores the same tracks and mood scores"""
+    table = synthetic.playlist_data(120)['tracks']
+    MoodAnalyzer().score_tracks(table)
+
+    restored = TrackTable.from_state(json.loads(json.dumps(table.to_state())))
+    assert restored == table
+    assert restored.mood_totals() == table.mood_totals()
+    print("✅ Table state survives a JSON round trip")
+
+def test_take_and_concat_keep_scores():
+    """Rows gathered from several tables keep their features and mood scores"""
+    first = synthetic.playlist_data(10, seed=1)['tracks']
+    second = synthetic.playlist_data(10, seed=2)['tracks']
+    MoodAnalyzer().score_tracks(second)
+
+    combined = TrackTable.concat([first, second])
+    picked = combined.take([15, 2, 15])
+
+    assert combined.ids == first.ids + second.ids
+    assert picked.ids == [second.ids[5], first.ids[2], second.ids[5]]
+    assert picked[0]['mood_scores'] == second[5]['mood_scores']
+    assert 'mood_scores' not in picked[1] and picked[1]['audio_features'] == first[2]['audio_features']
+    print("✅ take and concat keep per-row data")
+
+def main():
+    print("🧪 Testing Track Table")
+    print("=" * 40)
+    test_round_trips_track_dicts()
+    test_tracks_without_ids()
+    test_scoring_matches_track_dicts()
+    test_state_survives_json()
+    test_take_and_concat_keep_scores()
+    print("\n✅ All track table tests passed!")
+
+if __name__ == "__main__":
+    main()
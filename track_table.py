@@ -0,0 +1,323 @@
+import base64
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Spotify audio features kept for every track, in column order
+FEATURE_NAMES = (
+    'acousticness', 'danceability', 'energy', 'instrumentalness', 'liveness', 'loudness',
+    'speechiness', 'tempo', 'valence', 'mode', 'key', 'time_signature'
+)
+
+# Features Spotify reports as integers; stored as floats and converted back at the boundary
+INTEGER_FEATURES = frozenset(('mode', 'key', 'time_signature'))
+
+# Marks a missing feature or an unscored mood in a float column
+MISSING = float('nan')
+
+
+def is_missing(value: float) -> bool:
+    return value != value
+
+
+def pack(column: array) -> str:
+    return base64.b64encode(column.tobytes()).decode('ascii')
+
+
+def unpack(typecode: str, data: str) -> array:
+    column = array(typecode)
+    column.frombytes(base64.b64decode(data))
+    return column
+
+
+class TrackTable:
+    """A playlist's tracks stored column by column.
+
+    Numeric metadata, audio features and mood scores live in flat arrays (NaN
+    where a track has no value), and artist and album names are interned, so a
+    10,000-track playlist is a few dozen objects instead of tens of thousands
+    of small dicts. It still behaves as a sequence of the track dicts
+    get_playlist_tracks used to return: indexing or iterating builds them on
+    demand, which is what the API boundary and older callers rely on. Those
+    dicts are copies, so unlike with a list of tracks, changing table[i] does
+    not change the table; use set_row_features or mood_columns instead.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.names = []
+        self.artists = []  # tuple of interned artist names per track
+        self.albums = []
+        self.duration_ms = array('q')
+        self.popularity = array('i')  # -1 when Spotify gave none
+        self.preview_urls = []
+        self.spotify_urls = []
+        self.features = {name: array('d') for name in FEATURE_NAMES}
+        self.has_features = bytearray()
+        self.mood_names = ()
+        self.mood_scores = {}  # mood -> array of scores, NaN for unscored tracks
+
+    # Building
+
+    def append(self, track_id: str, name: str, artists: Iterable[str], album: str, duration_ms: int = 0,
+               popularity: Optional[int] = None, preview_url: Optional[str] = None, spotify_url: Optional[str] = None):
+        """Add a track without audio features or mood scores"""
+        self.ids.append(track_id)
+        self.names.append(name)
+        self.artists.append(tuple(sys.intern(artist) for artist in artists))
+        self.albums.append(sys.intern(album) if album else album)
+        self.duration_ms.append(duration_ms or 0)
+        self.popularity.append(-1 if popularity is None else popularity)
+        self.preview_urls.append(preview_url)
+        self.spotify_urls.append(spotify_url)
+        for column in self.features.values():
+            column.append(MISSING)
+        self.has_features.append(0)
+        for column in self.mood_scores.values():
+            column.append(MISSING)
+
+    def extend_items(self, items: Iterable[Dict]):
+        """Add raw playlist_tracks items, skipping local and unavailable tracks"""
+        for item in items:
+            track = item['track']
+            if track and track['id']:
+                self.append(
+                    track['id'],
+                    track['name'],
+                    (artist['name'] for artist in track['artists']),
+                    track['album']['name'],
+                    track['duration_ms'],
+                    track['popularity'],
+                    track['preview_url'],
+                    track['external_urls'].get('spotify')
+                )
+
+    @classmethod
+    def from_items(cls, items: Iterable[Dict]) -> 'TrackTable':
+        table = cls()
+        table.extend_items(items)
+        return table
+
+    @classmethod
+    def from_dicts(cls, tracks: Iterable[Dict]) -> 'TrackTable':
+        """Table from track dicts in the get_playlist_tracks shape, with any audio_features and mood_scores.
+
+        Tracks without an id (local files, unavailable tracks) are kept with an id of None.
+        """
+        table = cls()
+        scored = []
+        for track in tracks:
+            table.append(
+                track.get('id'),
+                track.get('name', ''),
+                track.get('artists', ()),
+                track.get('album', ''),
+                track.get('duration_ms', 0),
+                track.get('popularity'),
+                track.get('preview_url'),
+                (track.get('external_urls') or {}).get('spotify')
+            )
+            index = len(table) - 1
+            if track.get('audio_features'):
+                table.set_row_features(index, track['audio_features'])
+            if track.get('mood_scores'):
+                scored.append((index, track['mood_scores']))
+
+        if scored:
+            moods = tuple(scored[0][1])
+            columns = table.mood_columns(moods)
+            for index, scores in scored:
+                for mood, column in zip(moods, columns):
+                    column[index] = scores.get(mood, 0.0)
+        return table
+
+    @classmethod
+    def of(cls, tracks) -> 'TrackTable':
+        """tracks itself if it is already a table, otherwise a table built from track dicts"""
+        return tracks if isinstance(tracks, cls) else cls.from_dicts(tracks)
+
+    def take(self, indices: Iterable[int]) -> 'TrackTable':
+        """New table of the given rows, in the given order"""
+        return TrackTable.gather([(self, index) for index in indices])
+
+    @classmethod
+    def concat(cls, tables: Sequence['TrackTable']) -> 'TrackTable':
+        """Rows of several tables, one after another"""
+        return cls.gather([(table, index) for table in tables for index in range(len(table))])
+
+    @classmethod
+    def gather(cls, rows: List[Tuple['TrackTable', int]]) -> 'TrackTable':
+        """New table of (table, row index) pairs, which may come from different tables"""
+        table = cls()
+        table.mood_names = next((source.mood_names for source, _ in rows if source.mood_names), ())
+        table.mood_scores = {mood: array('d') for mood in table.mood_names}
+
+        for source, i in rows:
+            table.ids.append(source.ids[i])
+            table.names.append(source.names[i])
+            table.artists.append(source.artists[i])
+            table.albums.append(source.albums[i])
+            table.duration_ms.append(source.duration_ms[i])
+            table.popularity.append(source.popularity[i])
+            table.preview_urls.append(source.preview_urls[i])
+            table.spotify_urls.append(source.spotify_urls[i])
+            for name, column in table.features.items():
+                column.append(source.features[name][i])
+            table.has_features.append(source.has_features[i])
+            for mood, column in table.mood_scores.items():
+                source_column = source.mood_scores.get(mood)
+                column.append(source_column[i] if source_column is not None else MISSING)
+        return table
+
+    # Audio features and mood scores
+
+    def set_row_features(self, index: int, features: Dict):
+        for name, column in self.features.items():
+            value = features.get(name)
+            column[index] = MISSING if value is None else value
+        self.has_features[index] = 1
+
+    def set_features(self, features_by_id: Dict[str, Dict]) -> int:
+        """Fill in audio features from a {track_id: features} mapping; returns how many tracks got them"""
+        filled = 0
+        for index, track_id in enumerate(self.ids):
+            features = features_by_id.get(track_id)
+            if features:
+                self.set_row_features(index, features)
+                filled += 1
+        return filled
+
+    def feature_indices(self) -> List[int]:
+        """Rows that have audio features"""
+        return [index for index, flag in enumerate(self.has_features) if flag]
+
+    def feature_count(self) -> int:
+        return sum(self.has_features)
+
+    def row_features(self, index: int) -> Dict:
+        """A track's audio features as the dict Spotify returns, or {} if it has none"""
+        if not self.has_features[index]:
+            return {}
+        features = {'id': self.ids[index]}
+        for name, column in self.features.items():
+            value = column[index]
+            if not is_missing(value):
+                features[name] = int(value) if name in INTEGER_FEATURES else value
+        return features
+
+    def mood_columns(self, moods: Sequence[str]) -> List[array]:
+        """Score columns for moods, in that order, for a scorer to fill in; cleared if the moods changed"""
+        moods = tuple(moods)
+        if moods != self.mood_names:
+            self.mood_names = moods
+            self.mood_scores = {mood: array('d', [MISSING]) * len(self) for mood in moods}
+        return [self.mood_scores[mood] for mood in moods]
+
+    def row_mood_scores(self, index: int) -> Optional[Dict[str, float]]:
+        """A track's mood scores, or None if it was not scored"""
+        if not self.mood_names or is_missing(self.mood_scores[self.mood_names[0]][index]):
+            return None
+        return {mood: self.mood_scores[mood][index] for mood in self.mood_names}
+
+    def mood_totals(self) -> Tuple[Dict[str, float], int]:
+        """Per-mood sums of the scored tracks' scores, and how many tracks were scored"""
+        if not self.mood_names:
+            return {}, 0
+        first = self.mood_scores[self.mood_names[0]]
+        scored = [index for index in range(len(self)) if not is_missing(first[index])]
+        totals = {}
+        for mood in self.mood_names:
+            column = self.mood_scores[mood]
+            total = 0.0
+            for index in scored:
+                total += column[index]
+            totals[mood] = total
+        return totals, len(scored)
+
+    def total_duration_ms(self) -> int:
+        return sum(self.duration_ms)
+
+    # Track dicts, for the API boundary and callers that expect them
+
+    def track(self, index: int) -> Dict:
+        """One track in the get_playlist_tracks dict shape, as a new dict that does not write back to the table"""
+        popularity = self.popularity[index]
+        spotify_url = self.spotify_urls[index]
+        track = {
+            'id': self.ids[index],
+            'name': self.names[index],
+            'artists': list(self.artists[index]),
+            'album': self.albums[index],
+            'duration_ms': self.duration_ms[index],
+            'popularity': None if popularity < 0 else popularity,
+            'preview_url': self.preview_urls[index],
+            'external_urls': {'spotify': spotify_url} if spotify_url else {},
+            'audio_features': self.row_features(index)
+        }
+        mood_scores = self.row_mood_scores(index)
+        if mood_scores is not None:
+            track['mood_scores'] = mood_scores
+        return track
+
+    def to_dicts(self) -> List[Dict]:
+        return [self.track(index) for index in range(len(self))]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.track(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('track index out of range')
+        return self.track(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.track(index)
+
+    def __eq__(self, other):
+        if isinstance(other, (TrackTable, list)):
+            return self.to_dicts() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"TrackTable({len(self)} tracks, {self.feature_count()} with audio features)"
+
+    # Persistence
+
+    def to_state(self) -> Dict:
+        """JSON-serializable form, with numeric columns packed as base64 bytes"""
+        return {
+            'ids': self.ids,
+            'names': self.names,
+            'artists': [list(artists) for artists in self.artists],
+            'albums': self.albums,
+            'duration_ms': pack(self.duration_ms),
+            'popularity': pack(self.popularity),
+            'preview_urls': self.preview_urls,
+            'spotify_urls': self.spotify_urls,
+            'features': {name: pack(column) for name, column in self.features.items()},
+            'has_features': pack(array('B', self.has_features)),
+            'mood_names': list(self.mood_names),
+            'mood_scores': {mood: pack(column) for mood, column in self.mood_scores.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'TrackTable':
+        table = cls()
+        table.ids = list(state['ids'])
+        table.names = list(state['names'])
+        table.artists = [tuple(sys.intern(artist) for artist in artists) for artists in state['artists']]
+        table.albums = [sys.intern(album) if album else album for album in state['albums']]
+        table.duration_ms = unpack('q', state['duration_ms'])
+        table.popularity = unpack('i', state['popularity'])
+        table.preview_urls = list(state['preview_urls'])
+        table.spotify_urls = list(state['spotify_urls'])
+        table.features = {name: unpack('d', state['features'][name]) for name in FEATURE_NAMES}
+        table.has_features = bytearray(unpack('B', state['has_features']))
+        table.mood_names = tuple(state['mood_names'])
+        table.mood_scores = {mood: unpack('d', state['mood_scores'][mood]) for mood in table.mood_names}
+        return table
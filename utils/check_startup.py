@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Report how long importing the app takes, module by module, and check it against a cold-start budget
+
+Usage:
+    python utils/check_startup.py
+    python utils/check_startup.py --budget 800 --top 15
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# SDKs that should only be imported when a provider is first used
+LAZY_MODULES = ('openai', 'google.generativeai', 'httpx', 'httpx2')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (.*)$')
+
+MEASURE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+try:
+    import resource
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kb //= 1024
+except ImportError:
+    peak_kb = None
+print(json.dumps({{'seconds': seconds, 'peak_kb': peak_kb, 'lazy_loaded': [m for m in {lazy!r} if m in sys.modules]}}))
+'''
+
+
+def run_python(args, module):
+    """Import module in a fresh interpreter and return (measurements, stderr)"""
+    code = MEASURE.format(module=module, lazy=LAZY_MODULES)
+    result = subprocess.run([sys.executable, *args, '-c', code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_import_times(stderr, module):
+    """(name, self_us, cumulative_us, depth) for every import made while importing module"""
+    entries, pending = [], []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        raw = match.group(3)
+        depth = (len(raw) - len(raw.lstrip())) // 2
+        entry = (raw.strip(), int(match.group(1)), int(match.group(2)), depth)
+        pending.append(entry)
+        if depth == 0:
+            # Interpreter startup imports also appear at depth 0; keep only the tree ending in module
+            if entry[0] == module:
+                entries = pending
+            pending = []
+    return entries
+
+
+def startup_report(module='app', top=10):
+    measured, _ = run_python([], module)
+    _, stderr = run_python(['-X', 'importtime'], module)
+    entries = parse_import_times(stderr, module)
+
+    packages = {}
+    for name, self_us, _, _ in entries:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    return {
+        'module': module,
+        'import_ms': round(measured['seconds'] * 1000, 1),
+        'peak_memory_mb': round(measured['peak_kb'] / 1024, 1) if measured['peak_kb'] else None,
+        'lazy_loaded': measured['lazy_loaded'],
+        'slowest_imports': [
+            {'module': name, 'cumulative_ms': round(cumulative / 1000, 1)}
+            for name, _, cumulative, depth in sorted(entries, key=lambda e: -e[2]) if depth == 1
+        ][:top],
+        'packages': [
+            {'package': package, 'self_ms': round(us / 1000, 1)}
+            for package, us in sorted(packages.items(), key=lambda item: -item[1])
+        ][:top]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report app import time per module against a cold-start budget")
+    parser.add_argument('--module', default='app', help='module to import (default: app)')
+    parser.add_argument('--budget', type=float, default=1000, help='allowed import time in ms (default: 1000)')
+    parser.add_argument('--top', type=int, default=10, help='modules and packages to list (default: 10)')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = startup_report(args.module, args.top)
+    within_budget = report['import_ms'] <= args.budget
+
+    if args.json:
+        print(json.dumps({**report, 'budget_ms': args.budget, 'within_budget': within_budget}, indent=2))
+    else:
+        print(f"🚀 Startup report for 'import {args.module}'")
+        print(f"   {'✅' if within_budget else '❌'} Import time: {report['import_ms']} ms (budget {args.budget:g} ms)")
+        if report['peak_memory_mb'] is not None:
+            print(f"   Peak memory: {report['peak_memory_mb']} MB")
+        print(f"   {'❌' if report['lazy_loaded'] else '✅'} SDKs loaded at startup: "
+              f"{', '.join(report['lazy_loaded']) or 'none'}")
+        print("\n   Slowest imports (cumulative):")
+        for entry in report['slowest_imports']:
+            print(f"   {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+        print("\n   Import time by package (self):")
+        for entry in report['packages']:
+            print(f"   {entry['self_ms']:>9.1f} ms  {entry['package']}")
+
+    return 0 if within_budget and not report['lazy_loaded'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,6 @@ echo Demo will be available at: http://localhost:5000
 echo Press Ctrl+C to stop the server
 echo.
 
-python app.py
+python serve.py
 
 pause 
\ No newline at end of file
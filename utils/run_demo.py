@@ -69,14 +69,13 @@ def main():
             sys.exit(1)
     
     print("\n🚀 Starting demo server...")
-    print("📱 Demo will be available at: http://localhost:5000")
     print("🔧 Press Ctrl+C to stop the server")
     print("-" * 40)
     
     try:
-        # Start the Flask app
-        from app import app
-        app.run(debug=True, host='0.0.0.0', port=5000)
+        # Start the app under the production server (preloaded clients, worker threads, no debugger)
+        from serve import serve
+        serve()
     except KeyboardInterrupt:
         print("\n\n✅ Demo server stopped")
     except Exception as e:
@@ -9,6 +9,10 @@ urls = [
 ]
 
 # Assuming your Flask app is running on http://localhost:5000
-response = requests.post('http://localhost:5000/api/analyze-batch', json={'playlist_urls': urls})
+# Stream results as NDJSON so each playlist prints as soon as it is analyzed
+response = requests.post('http://localhost:5000/api/analyze-batch',
+                         json={'playlist_urls': urls, 'stream': True}, stream=True)
 
-print(json.dumps(response.json(), indent=2))
\ No newline at end of file
+for line in response.iter_lines(decode_unicode=True):
+    if line:
+        print(json.dumps(json.loads(line), indent=2))